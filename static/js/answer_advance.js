@@ -0,0 +1,102 @@
+document.addEventListener('DOMContentLoaded', () => {
+  const form = document.getElementById('answerForm');
+  if (!form || !window.fetch) return;
+
+  function getCookie(name) {
+    const value = `; ${document.cookie}`;
+    const parts = value.split(`; ${name}=`);
+    if (parts.length === 2) return parts.pop().split(';').shift();
+  }
+
+  function formatPercentage(value) {
+    return Number(value).toFixed(1).replace('.', ',');
+  }
+
+  function showQuestion(question) {
+    document.getElementById('questionText').textContent = question.text;
+    const link = document.getElementById('questionLink');
+    if (link) {
+      link.href = question.url;
+      link.textContent = `#${question.id}`;
+    }
+    form.action = question.url;
+    const idInput = form.querySelector('input[name="question_id"]');
+    if (idInput) idInput.value = question.id;
+    document.querySelectorAll('[data-stat]').forEach(cell => {
+      const key = cell.dataset.stat;
+      cell.textContent = key === 'agree_ratio' ?
+        `${formatPercentage(question.agree_ratio)}%` : question[key];
+    });
+  }
+
+  // The answered question goes to the top of "My answers". Its edit and
+  // remove buttons appear after a reload; until then the title links to
+  // the question page where the answer can be changed.
+  function addMyAnswer(question) {
+    const body = document.getElementById('myAnswersBody');
+    if (!body || !question.my_answer) return;
+    const old = body.querySelector(`tr[data-question-id="${question.id}"]`);
+    if (old) old.remove();
+    const labels = Array.from(
+      body.closest('table').querySelectorAll('thead th'),
+      th => th.textContent.replace(/ [\u2191\u2193]$/, '').trim()
+    );
+    const row = document.createElement('tr');
+    row.dataset.questionId = question.id;
+    const link = document.createElement('a');
+    link.href = question.url;
+    link.textContent = question.text;
+    const cells = [
+      ['', new Date().toISOString().slice(0, 10)],
+      ['', link],
+      ['total-answers', question.total],
+      ['agree-ratio', `${formatPercentage(question.agree_ratio)}%`],
+      ['text-end', '']
+    ];
+    cells.forEach(([className, content], index) => {
+      const cell = document.createElement('td');
+      if (className) cell.className = className;
+      cell.dataset.label = labels[index] || '';
+      cell.append(content);
+      row.appendChild(cell);
+    });
+    body.prepend(row);
+    document.getElementById('myAnswersSection').hidden = false;
+  }
+
+  // Answers are sent as JSON requests so the next question is shown
+  // without loading the whole page. Any failure falls back to a normal
+  // form submission.
+  form.addEventListener('submit', event => {
+    const button = event.submitter;
+    if (!button || button.name !== 'answer') return;
+    event.preventDefault();
+    const formData = new FormData(form);
+    formData.set('answer', button.value);
+    const buttons = form.querySelectorAll('button');
+    buttons.forEach(b => { b.disabled = true; });
+    fetch(form.action, {
+      method: 'POST',
+      headers: {
+        'Accept': 'application/json',
+        'X-CSRFToken': getCookie('csrftoken') || ''
+      },
+      body: formData
+    }).then(resp => resp.ok ? resp.json() : Promise.reject()).then(data => {
+      addMyAnswer(data.answered);
+      if (!data.next) {
+        window.location.href = form.dataset.doneUrl;
+        return;
+      }
+      showQuestion(data.next);
+      buttons.forEach(b => { b.disabled = false; });
+    }).catch(() => {
+      const input = document.createElement('input');
+      input.type = 'hidden';
+      input.name = 'answer';
+      input.value = button.value;
+      form.appendChild(input);
+      form.submit();
+    });
+  });
+});
@@ -0,0 +1,67 @@
+document.addEventListener('DOMContentLoaded', () => {
+  const form = document.getElementById('question-search');
+  const table = document.getElementById('question-search-results');
+  const status = document.getElementById('question-search-status');
+  if (!form || !table || !status) return;
+
+  const input = form.querySelector('input[name="q"]');
+  const tbody = table.tBodies[0];
+  const labels = Array.from(table.tHead.rows[0].cells).map(cell => cell.textContent);
+  let timer = null;
+  let controller = null;
+
+  function formatPercentage(yes, total) {
+    if (!total) return '0,0%';
+    return `${(100 * yes / total).toFixed(1).replace('.', ',')}%`;
+  }
+
+  function addRow(item) {
+    const tr = document.createElement('tr');
+    const link = document.createElement('a');
+    link.href = `${item.url}?next=${encodeURIComponent(window.location.pathname)}`;
+    link.textContent = item.text;
+    const answer = item.answer === 'yes' ? form.dataset.yes : item.answer === 'no' ? form.dataset.no : '';
+    [item.id, link, item.total, formatPercentage(item.yes, item.total), answer].forEach((value, i) => {
+      const td = document.createElement('td');
+      td.dataset.label = labels[i];
+      td.append(value);
+      tr.append(td);
+    });
+    tbody.append(tr);
+  }
+
+  function load(page) {
+    const text = input.value.trim();
+    if (controller) controller.abort();
+    if (page === 1) tbody.replaceChildren();
+    status.replaceChildren();
+    if (!text) {
+      table.style.display = 'none';
+      return;
+    }
+    controller = new AbortController();
+    const params = new URLSearchParams({q: text, page: page});
+    fetch(`${form.dataset.url}?${params}`, {signal: controller.signal})
+      .then(resp => resp.json())
+      .then(data => {
+        data.results.forEach(addRow);
+        table.style.display = tbody.rows.length ? '' : 'none';
+        if (!tbody.rows.length) {
+          status.textContent = form.dataset.none;
+        } else if (data.has_next) {
+          const more = document.createElement('button');
+          more.type = 'button';
+          more.className = 'btn btn-sm btn-outline-secondary';
+          more.textContent = form.dataset.more;
+          more.addEventListener('click', () => load(data.page + 1));
+          status.append(more);
+        }
+      })
+      .catch(() => {});
+  }
+
+  input.addEventListener('input', () => {
+    clearTimeout(timer);
+    timer = setTimeout(() => load(1), 250);
+  });
+});
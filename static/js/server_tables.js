@@ -0,0 +1,80 @@
+function initServerTables(selector) {
+    document.querySelectorAll(selector).forEach(table => {
+        const body = table.tBodies ? table.tBodies[0] : table;
+        const headers = Array.from(table.querySelectorAll('th[data-sort]'));
+        const baseTexts = headers.map(h => h.textContent.trim());
+        const mobileButtons = [];
+        let sort = table.dataset.sort;
+        let direction = table.dataset.dir;
+        let next = table.dataset.next || '';
+        let loading = false;
+
+        const more = document.createElement('button');
+        more.type = 'button';
+        more.className = 'btn btn-outline-secondary btn-sm mb-3';
+        more.textContent = table.dataset.more;
+        (table.closest('.table-responsive') || table).after(more);
+
+        function updateLabels() {
+            headers.forEach((h, i) => {
+                let arrow = '';
+                if (h.dataset.sort === sort) arrow = direction === 'asc' ? ' ↑' : ' ↓';
+                h.textContent = baseTexts[i] + arrow;
+                if (mobileButtons[i]) mobileButtons[i].textContent = baseTexts[i] + arrow;
+            });
+            more.style.display = next ? '' : 'none';
+        }
+
+        function load(append) {
+            if (loading) return;
+            loading = true;
+            const params = new URLSearchParams({
+                sort: sort,
+                dir: direction,
+                next: window.location.pathname + window.location.search
+            });
+            if (append) params.set('after', next);
+            fetch(`${table.dataset.url}?${params}`, {
+                headers: {'X-Requested-With': 'XMLHttpRequest'}
+            }).then(resp => resp.ok ? resp.json() : Promise.reject()).then(data => {
+                if (!append) body.innerHTML = '';
+                body.insertAdjacentHTML('beforeend', data.html);
+                next = data.next || '';
+                updateLabels();
+                body.dispatchEvent(new CustomEvent('tables:rows', {bubbles: true}));
+            }).catch(() => window.location.reload()).finally(() => {
+                loading = false;
+            });
+        }
+
+        function toggleSort(i) {
+            const key = headers[i].dataset.sort;
+            direction = key === sort && direction === 'asc' ? 'desc' : 'asc';
+            sort = key;
+            load(false);
+        }
+
+        if (headers.length) {
+            const container = document.createElement('div');
+            container.className = 'mobile-sort mb-2';
+            headers.forEach((header, i) => {
+                header.style.cursor = 'pointer';
+                header.addEventListener('click', () => toggleSort(i));
+                const btn = document.createElement('button');
+                btn.type = 'button';
+                btn.className = 'btn btn-outline-secondary btn-sm me-2';
+                btn.addEventListener('click', () => toggleSort(i));
+                container.appendChild(btn);
+                mobileButtons.push(btn);
+            });
+            table.parentNode.insertBefore(container, table);
+        }
+
+        more.addEventListener('click', () => load(true));
+        updateLabels();
+    });
+}
+if (typeof window !== 'undefined') {
+    window.initServerTables = initServerTables;
+    document.addEventListener('DOMContentLoaded', () => initServerTables('.server-table'));
+}
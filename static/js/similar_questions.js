@@ -0,0 +1,48 @@
+document.addEventListener('DOMContentLoaded', () => {
+  const input = document.getElementById('id_text');
+  const container = document.getElementById('similar-questions');
+  if (!input || !container) return;
+
+  let timer = null;
+  let controller = null;
+
+  function render(questions) {
+    container.replaceChildren();
+    if (!questions.length) return;
+    const title = document.createElement('p');
+    title.className = 'mb-1 text-muted';
+    title.textContent = container.dataset.title;
+    const list = document.createElement('ul');
+    questions.forEach(q => {
+      const item = document.createElement('li');
+      const link = document.createElement('a');
+      link.href = q.url;
+      link.target = '_blank';
+      link.textContent = q.text;
+      item.append(link, ` (${container.dataset.yes} ${q.yes}, ${container.dataset.no} ${q.no})`);
+      list.append(item);
+    });
+    container.append(title, list);
+  }
+
+  function lookup() {
+    const text = input.value.trim();
+    if (controller) controller.abort();
+    if (text.length < 3) {
+      render([]);
+      return;
+    }
+    controller = new AbortController();
+    const params = new URLSearchParams({q: text});
+    if (container.dataset.exclude) params.set('exclude', container.dataset.exclude);
+    fetch(`${container.dataset.url}?${params}`, {signal: controller.signal})
+      .then(response => response.json())
+      .then(data => render(data.questions))
+      .catch(() => {});
+  }
+
+  input.addEventListener('input', () => {
+    clearTimeout(timer);
+    timer = setTimeout(lookup, 250);
+  });
+});
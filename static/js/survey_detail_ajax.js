@@ -63,7 +63,7 @@ document.addEventListener('DOMContentLoaded', () => {
   }
 
 
-  document.querySelectorAll('form.ajax-answer-form').forEach(form => {
+  function attachAnswerForm(form) {
     form.addEventListener('change', event => {
       if (event.target.name !== 'answer') return;
       const formData = new FormData(form);
@@ -91,7 +91,7 @@ document.addEventListener('DOMContentLoaded', () => {
         }
       }).catch(() => window.location.reload());
     });
-  });
+  }
 
   function attachDeleteAnswer(link) {
     link.addEventListener('click', ev => {
@@ -181,6 +181,7 @@ document.addEventListener('DOMContentLoaded', () => {
               delLink.className = 'btn btn-sm btn-danger ajax-delete-question';
               delLink.textContent = data.remove_label;
               tdActions.appendChild(delLink);
+              delLink.dataset.bound = 'true';
               attachDeleteQuestion(delLink);
             }
             tr.appendChild(tdActions);
@@ -200,6 +201,18 @@ document.addEventListener('DOMContentLoaded', () => {
     });
   }
 
-  document.querySelectorAll('a.ajax-delete-answer').forEach(attachDeleteAnswer);
-  document.querySelectorAll('a.ajax-delete-question').forEach(attachDeleteQuestion);
+  function attachRows(root) {
+    const attach = (selector, attachFn) => root.querySelectorAll(selector).forEach(el => {
+      if (el.dataset.bound) return;
+      el.dataset.bound = 'true';
+      attachFn(el);
+    });
+    attach('form.ajax-answer-form', attachAnswerForm);
+    attach('a.ajax-delete-answer', attachDeleteAnswer);
+    attach('a.ajax-delete-question', attachDeleteQuestion);
+  }
+
+  attachRows(document);
+  // Rows fetched by server_tables.js replace or extend the table body
+  document.addEventListener('tables:rows', ev => attachRows(ev.target));
 });
@@ -31,6 +31,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -92,9 +93,23 @@ STATIC_URL = '/static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 # Allow the development server to find project level static assets
 STATICFILES_DIRS = [BASE_DIR / 'static']
+# collectstatic writes content hashed, precompressed copies which WhiteNoise
+# serves with far future, immutable caching headers
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'wikikysely_project.storage.StaticStorage'},
+}
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Strategy for picking the next question in answer_survey. Use
+# ``wikikysely_project.survey.sampling.UniformSampler`` to pick uniformly.
+SURVEY_QUESTION_SAMPLER = 'wikikysely_project.survey.sampling.AdaptiveSampler'
+
+# Warm up caches, imports and templates when a web worker starts, see
+# ``wikikysely_project/survey/warmup.py``
+SURVEY_WARM_UP = os.environ.get("SURVEY_WARM_UP") == "1"
+
 # After logging in, redirect users based on unanswered questions. ``reverse_lazy``
 # allows resolving the URL without importing the root URL configuration during
 # settings initialization.
@@ -0,0 +1,17 @@
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class StaticStorage(CompressedManifestStaticFilesStorage):
+    """Content hashed static files with gzip and Brotli variants.
+
+    ``collectstatic`` writes ``name.<hash>.ext`` copies together with
+    ``.gz`` and, when the ``brotli`` package is installed, ``.br`` files.
+    WhiteNoise serves the hashed names with ``Cache-Control: immutable``.
+    Before ``collectstatic`` has been run, for example in development and
+    in tests, the original names are used.
+    """
+
+    def stored_name(self, name):
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
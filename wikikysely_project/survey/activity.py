@@ -0,0 +1,118 @@
+"""Survey-wide activity rollups per day and per hour.
+
+New answers, new participants (users answering their first question in the
+survey) and new questions are counted into ``ActivityRollup`` buckets as
+they happen. ``backfill_activity`` recomputes the buckets from the stored
+answers and questions. Buckets are UTC aligned.
+"""
+from collections import defaultdict
+from datetime import timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import Count, F, Min
+from django.db.models.functions import TruncDay, TruncHour
+
+from .models import ActivityRollup, Answer
+
+DAY = ActivityRollup.DAY
+HOUR = ActivityRollup.HOUR
+
+PERIODS = {DAY: timedelta(days=1), HOUR: timedelta(hours=1)}
+
+# Longest range one request may ask for, in buckets
+MAX_BUCKETS = {DAY: 366, HOUR: 24 * 31}
+
+COUNTERS = ("answers", "participants", "questions")
+
+
+def bucket_start(moment, period):
+    """Return the start of the ``period`` bucket containing ``moment``."""
+    moment = moment.astimezone(dt_timezone.utc)
+    if period == DAY:
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def record_activity(survey_id, moment, **counts):
+    """Add ``counts`` to the day and hour buckets containing ``moment``."""
+    counts = {name: value for name, value in counts.items() if value}
+    if not counts:
+        return
+    changes = {name: F(name) + value for name, value in counts.items()}
+    for period in PERIODS:
+        start = bucket_start(moment, period)
+        rows = ActivityRollup.objects.filter(
+            survey_id=survey_id, period=period, start=start
+        )
+        if rows.update(**changes):
+            continue
+        _, created = ActivityRollup.objects.get_or_create(
+            survey_id=survey_id, period=period, start=start, defaults=counts
+        )
+        if not created:
+            rows.update(**changes)
+
+
+def backfill_activity(survey):
+    """Recompute all activity buckets of the survey from stored data."""
+    answers = Answer.objects.filter(question__survey=survey)
+    first_answers = list(
+        answers.values("user").annotate(first=Min("created_at")).values_list(
+            "first", flat=True
+        )
+    )
+    buckets = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+    for period, trunc in ((DAY, TruncDay), (HOUR, TruncHour)):
+        for name, qs in (
+            ("answers", answers),
+            ("questions", survey.questions.all()),
+        ):
+            rows = (
+                qs.annotate(bucket=trunc("created_at"))
+                .values("bucket")
+                .annotate(count=Count("pk"))
+                .values_list("bucket", "count")
+            )
+            for start, count in rows:
+                buckets[(period, start)][name] = count
+        for first in first_answers:
+            buckets[(period, bucket_start(first, period))]["participants"] += 1
+    with transaction.atomic():
+        ActivityRollup.objects.filter(survey=survey).delete()
+        ActivityRollup.objects.bulk_create(
+            (
+                ActivityRollup(survey=survey, period=period, start=start, **counts)
+                for (period, start), counts in buckets.items()
+            ),
+            batch_size=1000,
+        )
+    return len(buckets)
+
+
+def get_activity(survey, period, start, end):
+    """Return zero-filled buckets of ``period`` from ``start`` up to ``end``.
+
+    ``start`` is rounded down to a bucket start and at most
+    ``MAX_BUCKETS[period]`` buckets are returned.
+    """
+    step = PERIODS[period]
+    start = bucket_start(start, period)
+    end = min(end, start + step * MAX_BUCKETS[period])
+    rows = {
+        row["start"]: row
+        for row in ActivityRollup.objects.filter(
+            survey=survey, period=period, start__gte=start, start__lt=end
+        ).values("start", *COUNTERS)
+    }
+    buckets = []
+    current = start
+    while current < end:
+        row = rows.get(current)
+        buckets.append(
+            {
+                "start": current.isoformat(),
+                **{name: row[name] if row else 0 for name in COUNTERS},
+            }
+        )
+        current += step
+    return buckets
@@ -1,18 +1,217 @@
-from django.contrib import admin
-from .models import Survey, Question, Answer
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Max
+from django.forms.models import BaseInlineFormSet
+from django.template.response import TemplateResponse
+from django.utils.functional import cached_property
+from django.utils.translation import gettext, gettext_lazy as _
+
+from .forms import QuestionImportForm
+from .importing import import_questions, read_question_texts
+from .models import Survey, Question, Answer, Job, delete_questions, remove_answer
+
+# Unfiltered tables with more rows than this show an estimated count
+ESTIMATE_COUNT_THRESHOLD = 100000
+
+
+def estimate_row_count(model):
+    """Return a cheap estimate of the number of rows in ``model``'s table."""
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE relname = %s", [table]
+            )
+            row = cursor.fetchone()
+            if row and row[0] >= 0:
+                return int(row[0])
+        elif connection.vendor == "mysql":
+            cursor.execute(
+                "SELECT table_rows FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = %s",
+                [table],
+            )
+            row = cursor.fetchone()
+            if row and row[0] is not None:
+                return int(row[0])
+    # Auto-increment keys give an upper bound from one index lookup
+    return model._default_manager.aggregate(n=Max("pk"))["n"] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that estimates the size of big unfiltered tables.
+
+    The exact ``COUNT(*)`` is still used for filtered lists and small tables.
+    """
+
+    @cached_property
+    def count(self):
+        if self.object_list.query.where:
+            return super().count
+        estimate = estimate_row_count(self.object_list.model)
+        if estimate < ESTIMATE_COUNT_THRESHOLD:
+            return super().count
+        return estimate
+
+
+class PaginatedInlineFormSet(BaseInlineFormSet):
+    """Inline formset that shows one page of the related objects."""
+
+    per_page = 50
+    page_number = 1
+
+    def get_queryset(self):
+        if not hasattr(self, "_queryset"):
+            queryset = super().get_queryset()
+            paginator = Paginator(
+                queryset.values_list("pk", flat=True), self.per_page
+            )
+            self.page = paginator.get_page(self.page_number)
+            self._queryset = queryset.filter(pk__in=list(self.page.object_list))
+        return self._queryset
 
 
 class QuestionInline(admin.TabularInline):
     model = Question
     extra = 0
+    formset = PaginatedInlineFormSet
+    template = "admin/survey/paginated_tabular.html"
+    fields = ("text", "creator", "visible", "answer_count", "agree_ratio")
+    # A raw-id widget would look up the creator of every row separately
+    readonly_fields = ("creator", "answer_count", "agree_ratio")
+    show_change_link = True
+    per_page = 50
+    page_param = "questions_page"
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("creator")
+
+    def get_formset(self, request, obj=None, **kwargs):
+        formset = super().get_formset(request, obj, **kwargs)
+        formset.per_page = self.per_page
+        formset.page_number = request.GET.get(self.page_param, 1)
+        return formset
+
+
+@admin.action(description=_("Import questions from a file"))
+def import_questions_action(modeladmin, request, queryset):
+    """Import questions from an uploaded CSV or JSON file into one survey."""
+    if queryset.count() != 1:
+        modeladmin.message_user(
+            request, gettext("Select exactly one survey."), messages.ERROR
+        )
+        return None
+    survey = queryset.get()
+    if "apply" in request.POST:
+        form = QuestionImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data["file"]
+            try:
+                texts = read_question_texts(upload, upload.name)
+            except ValueError as e:
+                modeladmin.message_user(
+                    request,
+                    gettext("Could not read the file: %(error)s") % {"error": e},
+                    messages.ERROR,
+                )
+                return None
+            result = import_questions(survey, texts, request.user)
+            modeladmin.message_user(
+                request,
+                gettext(
+                    "Imported %(created)d questions, skipped %(duplicates)d "
+                    "duplicates and %(invalid)d invalid rows."
+                )
+                % {
+                    "created": len(result.created),
+                    "duplicates": len(result.duplicates),
+                    "invalid": len(result.invalid),
+                },
+            )
+            return None
+    else:
+        form = QuestionImportForm()
+    return TemplateResponse(
+        request,
+        "admin/survey/survey/import_questions.html",
+        {
+            **modeladmin.admin_site.each_context(request),
+            "title": gettext("Import questions"),
+            "opts": modeladmin.model._meta,
+            "survey": survey,
+            "form": form,
+        },
+    )
 
 
 class SurveyAdmin(admin.ModelAdmin):
     inlines = [QuestionInline]
     list_display = ('title', 'state', 'deleted')
     list_filter = ('state', 'deleted')
+    list_select_related = ('creator',)
+    raw_id_fields = ('creator', 'secretaries')
+    actions = [import_questions_action]
+
+    def save_formset(self, request, form, formset, change):
+        for question in formset.save(commit=False):
+            if question.creator_id is None:
+                question.creator = request.user
+            question.save()
+        delete_questions(formset.deleted_objects)
+        formset.save_m2m()
+
+
+class QuestionAdmin(admin.ModelAdmin):
+    list_display = (
+        'text', 'survey', 'creator', 'visible', 'answer_count', 'created_at'
+    )
+    list_filter = ('visible',)
+    list_select_related = ('survey', 'creator')
+    raw_id_fields = ('survey', 'creator')
+    readonly_fields = Question.TALLY_FIELDS
+    search_fields = ('text',)
+    ordering = ('-pk',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # Deletes go through the service so participation counts stay current
+    def delete_model(self, request, obj):
+        delete_questions([obj])
+
+    def delete_queryset(self, request, queryset):
+        delete_questions(queryset)
+
+
+class AnswerAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'question', 'user', 'answer', 'created_at')
+    list_filter = ('answer',)
+    list_select_related = ('question', 'user')
+    raw_id_fields = ('question', 'user')
+    ordering = ('-pk',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_readonly_fields(self, request, obj=None):
+        # Moving an answer would bypass the tally and participation updates
+        return ('question', 'user') if obj else ()
+
+    # Deletes go through the service so tallies and counts stay current
+    def delete_model(self, request, obj):
+        remove_answer(obj)
+
+    def delete_queryset(self, request, queryset):
+        for answer in queryset.select_related('question'):
+            remove_answer(answer)
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('name', 'status', 'attempts', 'user', 'created_at', 'finished_at')
+    list_filter = ('status', 'name')
+    raw_id_fields = ('user',)
 
 
 admin.site.register(Survey, SurveyAdmin)
-admin.site.register(Question)
-admin.site.register(Answer)
+admin.site.register(Question, QuestionAdmin)
+admin.site.register(Answer, AnswerAdmin)
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,65 @@
+"""How often users side with the majority answers of a survey.
+
+The ``agreed`` and ``disagreed`` counts of ``Participation`` are kept
+current as answers change and when a question's majority flips, see
+``agreement_change`` and ``shift_agreement`` in ``models.py``.
+``recompute_agreement`` rebuilds them and the stored majorities from the
+answers in bulk with vectorized operations on the answer matrix.
+"""
+import numpy as np
+
+from django.db import transaction
+
+from .analysis import load_answer_matrix
+from .models import Participation, Question
+
+# Majority answer for the sign of a question's answer code sum
+MAJORITY_BY_SIGN = {1: "yes", -1: "no", 0: ""}
+
+
+def recompute_agreement(survey):
+    """Recompute the survey's majorities and participation agreement counts.
+
+    Only rows that differ are written. Returns a dict with the number of
+    ``users`` who answered, ``majorities`` changed and ``participations``
+    changed.
+    """
+    user_ids, question_ids, matrix = load_answer_matrix(survey)
+    # +1 where yes answers are more common, -1 for no and 0 for a split
+    majority = np.sign(np.asarray(matrix.sum(axis=0, dtype=np.int64)).ravel())
+    # +1 for answers siding with the majority, -1 against, 0 otherwise
+    sided = matrix.multiply(majority.reshape(1, -1)).tocsr()
+    agreed = np.asarray((sided > 0).sum(axis=1)).ravel()
+    disagreed = np.asarray((sided < 0).sum(axis=1)).ravel()
+
+    expected_majority = dict(
+        zip(question_ids.tolist(), (MAJORITY_BY_SIGN[s] for s in majority.tolist()))
+    )
+    changed_majority = {}
+    for pk, stored in survey.questions.filter(visible=True).values_list(
+        "pk", "majority"
+    ):
+        value = expected_majority.get(pk, "")
+        if value != stored:
+            changed_majority.setdefault(value, []).append(pk)
+
+    counts = dict(zip(user_ids.tolist(), zip(agreed.tolist(), disagreed.tolist())))
+    changed_rows = [
+        Participation(pk=pk, agreed=expected[0], disagreed=expected[1])
+        for pk, user_id, *stored in Participation.objects.filter(
+            survey=survey
+        ).values_list("pk", "user_id", "agreed", "disagreed")
+        if (expected := counts.get(user_id, (0, 0))) != tuple(stored)
+    ]
+
+    with transaction.atomic():
+        for value, pks in changed_majority.items():
+            Question.objects.filter(pk__in=pks).update(majority=value)
+        Participation.objects.bulk_update(
+            changed_rows, ["agreed", "disagreed"], batch_size=1000
+        )
+    return {
+        "users": len(user_ids),
+        "majorities": sum(len(pks) for pks in changed_majority.values()),
+        "participations": len(changed_rows),
+    }
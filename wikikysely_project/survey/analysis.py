@@ -0,0 +1,203 @@
+"""Opinion group analysis over the user × question answer matrix.
+
+Answers are loaded into a sparse matrix where yes is +1, no is -1 and a
+missing answer is 0. Respondents are projected on the main principal
+components of the matrix and grouped with k-means. For each group the
+questions it agrees on most (consensus) and the questions where it differs
+most from everyone else (divisive) are reported.
+"""
+from array import array
+import time
+
+from django.core.cache import cache
+import numpy as np
+from scipy import sparse
+from scipy.cluster.vq import kmeans2
+from scipy.sparse.linalg import LinearOperator, svds
+
+from .export import ANSWER_CODES
+from .models import Answer
+
+# Seconds an analysis is reused while new answers arrive. Keying on the
+# data version would recompute on almost every visit to an active survey.
+ANALYSIS_REFRESH_INTERVAL = 10 * 60
+
+
+def load_answer_matrix(survey, chunk_size=10000):
+    """Return ``(user_ids, question_ids, matrix)`` for the visible questions.
+
+    ``matrix`` is a ``users × questions`` CSR matrix of int8 answer codes and
+    the id arrays map its rows and columns back to database ids.
+    """
+    users = array("q")
+    questions = array("q")
+    values = array("b")
+    rows = (
+        Answer.objects.filter(question__survey=survey, question__visible=True)
+        .values_list("user_id", "question_id", "answer")
+        .iterator(chunk_size=chunk_size)
+    )
+    for user_id, question_id, answer in rows:
+        users.append(user_id)
+        questions.append(question_id)
+        values.append(ANSWER_CODES.get(answer, 0))
+    user_ids, user_index = np.unique(
+        np.frombuffer(users, dtype=np.int64), return_inverse=True
+    )
+    question_ids, question_index = np.unique(
+        np.frombuffer(questions, dtype=np.int64), return_inverse=True
+    )
+    matrix = sparse.csr_matrix(
+        (np.frombuffer(values, dtype=np.int8), (user_index, question_index)),
+        shape=(len(user_ids), len(question_ids)),
+        dtype=np.int8,
+    )
+    return user_ids, question_ids, matrix
+
+
+def _principal_components(matrix, n_components):
+    """Project rows of ``matrix`` on its top column-centred components.
+
+    The centred matrix is never built: a ``LinearOperator`` applies the
+    centring on the fly so the input stays sparse.
+    """
+    n_users, n_questions = matrix.shape
+    mean = np.asarray(matrix.mean(axis=0)).ravel()
+    total_variance = float(matrix.multiply(matrix).sum() - n_users * (mean @ mean))
+    if min(n_users, n_questions) <= n_components + 1:
+        dense = matrix.toarray() - mean
+        u, s, _ = np.linalg.svd(dense, full_matrices=False)
+        u, s = u[:, :n_components], s[:n_components]
+    else:
+        def matvec(v):
+            v = np.ravel(v)
+            return matrix @ v - mean @ v
+
+        def rmatvec(v):
+            v = np.ravel(v)
+            return matrix.T @ v - mean * v.sum()
+
+        operator = LinearOperator(
+            (n_users, n_questions), matvec=matvec, rmatvec=rmatvec, dtype=np.float64
+        )
+        u, s, _ = svds(operator, k=n_components, random_state=0)
+        order = np.argsort(s)[::-1]
+        u, s = u[:, order], s[order]
+    projections = u * s
+    if projections.shape[1] < n_components:
+        projections = np.pad(
+            projections, ((0, 0), (0, n_components - projections.shape[1]))
+        )
+    explained = (s ** 2 / total_variance).tolist() if total_variance > 0 else []
+    return projections, explained
+
+
+def _top_questions(scores, mask, question_ids, yes, no, limit):
+    candidates = np.flatnonzero(mask)
+    if not len(candidates):
+        return []
+    order = candidates[np.argsort(-scores[candidates], kind="stable")][:limit]
+    return [
+        {
+            "question_id": int(question_ids[i]),
+            "yes": int(yes[i]),
+            "no": int(no[i]),
+            "score": round(float(scores[i]), 3),
+        }
+        for i in order
+    ]
+
+
+def analyze_matrix(
+    matrix,
+    question_ids,
+    n_groups=3,
+    n_components=2,
+    min_votes=3,
+    limit=5,
+    max_points=2000,
+):
+    """Return opinion groups for an answer matrix as a JSON serializable dict."""
+    matrix = sparse.csr_matrix(matrix, dtype=np.float64)
+    n_users, n_questions = matrix.shape
+    result = {
+        "user_count": n_users,
+        "question_count": n_questions,
+        "explained_variance": [],
+        "groups": [],
+        "points": [],
+    }
+    if n_users < 2 or n_questions < 1:
+        return result
+
+    projections, explained = _principal_components(matrix, n_components)
+    result["explained_variance"] = [round(v, 4) for v in explained]
+
+    n_groups = max(1, min(n_groups, n_users))
+    _, labels = kmeans2(projections, n_groups, minit="++", seed=0)
+
+    membership = sparse.csr_matrix(
+        (np.ones(n_users), (labels, np.arange(n_users))),
+        shape=(n_groups, n_users),
+    )
+    yes_matrix = (matrix > 0).astype(np.float64)
+    no_matrix = (matrix < 0).astype(np.float64)
+    group_yes = np.asarray((membership @ yes_matrix).todense())
+    group_no = np.asarray((membership @ no_matrix).todense())
+    total_yes = group_yes.sum(axis=0)
+    total_no = group_no.sum(axis=0)
+    sizes = np.bincount(labels, minlength=n_groups)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for g in range(n_groups):
+            yes, no = group_yes[g], group_no[g]
+            votes = yes + no
+            rest_yes, rest_no = total_yes - yes, total_no - no
+            rest_votes = rest_yes + rest_no
+            agreement = np.nan_to_num(np.maximum(yes, no) / votes)
+            difference = np.nan_to_num(
+                np.abs(yes / votes - rest_yes / rest_votes)
+            )
+            enough = votes >= min_votes
+            result["groups"].append(
+                {
+                    "size": int(sizes[g]),
+                    "consensus": _top_questions(
+                        agreement, enough, question_ids, yes, no, limit
+                    ),
+                    "divisive": _top_questions(
+                        difference,
+                        enough & (rest_votes >= min_votes),
+                        question_ids,
+                        yes,
+                        no,
+                        limit,
+                    ),
+                }
+            )
+
+    step = max(1, n_users // max_points)
+    result["points"] = [
+        [round(float(p[0]), 3), round(float(p[1]) if len(p) > 1 else 0.0, 3), int(g)]
+        for p, g in zip(projections[::step], labels[::step])
+    ]
+    return result
+
+
+def get_survey_analysis(survey, n_groups=3):
+    """Return the cached analysis of the survey.
+
+    The analysis is recomputed when the questions change and otherwise at
+    most once per ``ANALYSIS_REFRESH_INTERVAL``, so it may leave out the
+    latest answers.
+    """
+    period = int(time.time() // ANALYSIS_REFRESH_INTERVAL)
+    key = (
+        f"survey:{survey.pk}:analysis:{survey.catalog_version}:{period}:{n_groups}"
+    )
+
+    def compute():
+        _, question_ids, matrix = load_answer_matrix(survey)
+        return analyze_matrix(matrix, question_ids, n_groups=n_groups)
+
+    return cache.get_or_set(key, compute, ANALYSIS_REFRESH_INTERVAL)
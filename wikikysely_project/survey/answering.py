@@ -0,0 +1,92 @@
+"""Recording an answer and choosing the user's next question.
+
+``answer_and_advance`` is shared by the answer views. ``record_answer``
+and ``skip_question`` return the user's skipped question ids along with
+their writes. Beyond them it reads the answered question ids once, lets
+the configured sampler pick from the rest and loads the answered and the
+next question in one query, so the number of queries does not grow with
+the survey.
+"""
+from collections import namedtuple
+
+from django.urls import reverse
+
+from .models import (
+    Answer,
+    Question,
+    clear_skips,
+    record_answer,
+    skip_question,
+)
+from .sampling import get_sampler
+
+AnswerStep = namedtuple("AnswerStep", "question next_question has_skipped")
+
+
+def pick_question(survey, exclude=()):
+    """Return the next visible question chosen by the configured sampler."""
+    pk = get_sampler().pick(survey, exclude)
+    if pk is None:
+        return None
+    return survey.questions.filter(pk=pk, visible=True).first()
+
+
+def save_answer(user, question, answer_value):
+    """Store ``answer_value`` for ``question`` or skip it when it is empty.
+
+    Returns the ids of the questions the user has skipped in the survey.
+    """
+    if answer_value:
+        return record_answer(user, question, answer_value)
+    return skip_question(user, question)
+
+
+def advance(user, question, skipped):
+    """Pick the user's next question after ``question`` was answered.
+
+    ``skipped`` holds the ids returned by :func:`save_answer`. The returned
+    ``question`` is reloaded with its updated tallies. When no question is
+    left the user's skips are cleared and ``next_question`` is ``None``;
+    ``has_skipped`` tells whether there were skips to return to.
+    """
+    survey = question.survey
+    answered = set(
+        Answer.objects.filter(user=user, question__survey=survey).values_list(
+            "question_id", flat=True
+        )
+    )
+    exclude = answered | skipped | {question.pk}
+    next_pk = get_sampler().pick(survey, exclude)
+    questions = {
+        q.pk: q
+        for q in Question.objects.filter(pk__in=[question.pk, next_pk], survey=survey)
+    }
+    next_question = questions.get(next_pk)
+    if next_question is not None and not next_question.visible:
+        # Hidden after the sampler's last rebuild
+        next_question = pick_question(survey, exclude)
+    if next_question is None:
+        clear_skips(user, survey)
+    return AnswerStep(
+        questions.get(question.pk, question), next_question, bool(skipped)
+    )
+
+
+def answer_and_advance(user, question, answer_value):
+    """Store the answer to ``question`` and return the next :class:`AnswerStep`."""
+    return advance(user, question, save_answer(user, question, answer_value))
+
+
+def question_data(question, my_answer=None):
+    """Return the JSON form of ``question`` with its stored answer tallies."""
+    return {
+        "id": question.pk,
+        "text": question.text,
+        "url": reverse("survey:answer_question", args=[question.pk]),
+        "published": question.created_at.date().isoformat(),
+        "yes": question.yes_count,
+        "no": question.answer_count - question.yes_count,
+        "total": question.answer_count,
+        "agree_ratio": question.agree_ratio,
+        "my_answer": my_answer,
+    }
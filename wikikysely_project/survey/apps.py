@@ -7,6 +7,8 @@ class SurveyConfig(AppConfig):
     name = 'wikikysely_project.survey'
 
     def ready(self):
+        from . import signals  # noqa: F401
+
         def create_default_survey(sender, **kwargs):
             if kwargs.get('plan') is None:
                 # Skip post_migrate calls from flush
@@ -25,3 +27,10 @@ class SurveyConfig(AppConfig):
                 pass
 
         post_migrate.connect(create_default_survey, sender=self, weak=False)
+
+        def create_search_index(sender, using, **kwargs):
+            from .search import ensure_search_index
+
+            ensure_search_index(using)
+
+        post_migrate.connect(create_search_index, sender=self, weak=False)
@@ -1,41 +1,53 @@
 from django.conf import settings
-from .models import Survey, Answer
-from .views import can_edit_survey
+from django.utils.functional import SimpleLazyObject
+from .models import Answer
+from .views import get_main_survey, request_can_edit
 
 
 def unanswered_count(request):
-    """Return unanswered question count and latest question data."""
+    """Return unanswered question count and latest question data.
 
-    survey = Survey.get_main_survey()
-    latest_question = (
+    The values are lazy and evaluated only when a template uses them. They
+    are built once per request and share the view's survey and permission
+    lookups.
+    """
+    if not hasattr(request, "_survey_context"):
+        request._survey_context = {
+            "unanswered_count": SimpleLazyObject(lambda: _unanswered(request)),
+            "local_login_enabled": settings.LOCAL_LOGIN_ENABLED,
+            "can_edit": SimpleLazyObject(lambda: _can_edit(request)),
+            "latest_question": SimpleLazyObject(lambda: _latest_question(request)),
+        }
+    return request._survey_context
+
+
+def _latest_question(request):
+    survey = get_main_survey(request)
+    if survey is None:
+        return None
+    return (
         survey.questions.filter(visible=True)
         .order_by("-created_at", "-id")
         .first()
-        if survey
-        else None
     )
 
+
+def _unanswered(request):
+    survey = get_main_survey(request)
     if survey is None:
-        count = 0
-        can_edit = False
-    elif request.user.is_authenticated:
+        return 0
+    questions = survey.questions.filter(visible=True)
+    if request.user.is_authenticated:
         answered_ids = Answer.objects.filter(
             user=request.user,
             question__survey=survey,
         ).values_list("question_id", flat=True)
-        count = (
-            survey.questions.filter(visible=True)
-            .exclude(id__in=answered_ids)
-            .count()
-        )
-        can_edit = can_edit_survey(request.user, survey)
-    else:
-        count = survey.questions.filter(visible=True).count()
-        can_edit = False
-
-    return {
-        "unanswered_count": count,
-        "local_login_enabled": settings.LOCAL_LOGIN_ENABLED,
-        "can_edit": can_edit,
-        "latest_question": latest_question,
-    }
+        questions = questions.exclude(id__in=answered_ids)
+    return questions.count()
+
+
+def _can_edit(request):
+    survey = get_main_survey(request)
+    if survey is None or not request.user.is_authenticated:
+        return False
+    return request_can_edit(request, survey)
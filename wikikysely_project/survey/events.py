@@ -0,0 +1,190 @@
+"""Answer history and analytics from the append-only ``AnswerEvent`` log.
+
+Every answer write appends one event, but the log is not the write path:
+``Answer`` stays the authoritative current state, written with a
+``select_for_update`` read-modify-write, and the stored tallies are kept
+from it. Writes therefore cost one extra INSERT instead of becoming
+contention-free appends, in exchange for reads that never replay the log.
+What the log adds is history: ``opinion_changes`` answers how often users
+change their minds, and ``derive_tallies`` projects the current answers and
+tallies from the events to check the stored ones.
+
+Events are replayed in ``(created_at, pk)`` order. ``answer`` and
+``change`` events set the user's answer to a question, ``retract`` removes
+it and ``skip`` does not change it.
+"""
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+
+from .models import Answer, AnswerEvent, Question
+
+EVENT_FIELDS = ("user_id", "question_id", "kind", "answer", "created_at")
+SET_KINDS = (AnswerEvent.ANSWER, AnswerEvent.CHANGE)
+
+
+def iter_answer_events(survey, before=None, chunk_size=10000):
+    """Yield ``(user_id, question_id, kind, answer, created_at)`` in log order."""
+    events = AnswerEvent.objects.filter(survey=survey)
+    if before is not None:
+        events = events.filter(created_at__lt=before)
+    return (
+        events.order_by("created_at", "pk")
+        .values_list(*EVENT_FIELDS)
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def replay_answer_events(events):
+    """Return ``{(user_id, question_id): (answer, created_at)}`` after ``events``.
+
+    ``created_at`` is the time of the last event that set the answer.
+    """
+    state = {}
+    for user_id, question_id, kind, answer, created_at in events:
+        if kind in (AnswerEvent.ANSWER, AnswerEvent.CHANGE):
+            state[(user_id, question_id)] = (answer, created_at)
+        elif kind == AnswerEvent.RETRACT:
+            state.pop((user_id, question_id), None)
+    return state
+
+
+def derive_tallies(survey):
+    """Return ``{question_id: (yes, total)}`` projected from the event log."""
+    yes = Counter()
+    total = Counter()
+    for (_user_id, question_id), (answer, _created_at) in replay_answer_events(
+        iter_answer_events(survey)
+    ).items():
+        total[question_id] += 1
+        if answer == "yes":
+            yes[question_id] += 1
+    return {pk: (yes[pk], count) for pk, count in total.items()}
+
+
+def tally_mismatches(survey):
+    """Return how many questions' stored tallies differ from the event log."""
+    derived = derive_tallies(survey)
+    return sum(
+        1
+        for pk, yes, total in survey.questions.values_list(
+            "pk", "yes_count", "answer_count"
+        ).iterator()
+        if derived.get(pk, (0, 0)) != (yes, total)
+    )
+
+
+def opinion_changes(survey):
+    """Return ``{question_id: (changed, answered)}`` user counts in one query.
+
+    ``answered`` counts the users who ever answered the question and
+    ``changed`` those who have given both answers, also when the first one
+    was retracted in between.
+    """
+    answers = AnswerEvent.objects.filter(survey=survey, kind__in=SET_KINDS)
+    said_no = answers.filter(
+        question=OuterRef("question"), user=OuterRef("user"), answer="no"
+    )
+    rows = (
+        answers.order_by()
+        .values("question_id")
+        .annotate(
+            answered=Count("user", distinct=True),
+            changed=Count(
+                "user", distinct=True, filter=Q(Exists(said_no), answer="yes")
+            ),
+        )
+        .values_list("question_id", "changed", "answered")
+    )
+    return {pk: (changed, answered) for pk, changed, answered in rows}
+
+
+def snapshot_answers(survey):
+    """Log an ``answer`` event for stored answers that have no history yet.
+
+    Returns the number of events written.
+    """
+    history = AnswerEvent.objects.filter(
+        question=OuterRef("question"), user=OuterRef("user")
+    )
+    missing = (
+        Answer.objects.filter(question__survey=survey)
+        .filter(~Exists(history))
+        .values_list("user_id", "question_id", "answer", "created_at")
+    )
+    events = [
+        AnswerEvent(
+            survey=survey,
+            user_id=user_id,
+            question_id=question_id,
+            kind=AnswerEvent.ANSWER,
+            answer=answer,
+            created_at=created_at,
+        )
+        for user_id, question_id, answer, created_at in missing.iterator()
+    ]
+    AnswerEvent.objects.bulk_create(events, batch_size=1000)
+    return len(events)
+
+
+def compact_answer_events(survey, before):
+    """Collapse the events logged before ``before`` into one per answer.
+
+    Each answer standing at ``before`` is kept as a single ``answer`` event.
+    When the user had given the other answer before, that answer is kept
+    in front of it so ``opinion_changes`` still counts the change.
+    Retracted answers and skips are dropped, so ``opinion_changes`` no
+    longer counts those users. Newer events are kept as they are. Returns
+    ``(deleted, written)`` event counts.
+    """
+    with transaction.atomic():
+        old = AnswerEvent.objects.filter(survey=survey, created_at__lt=before)
+        state = replay_answer_events(iter_answer_events(survey, before=before))
+        changed = set(
+            old.filter(kind__in=SET_KINDS)
+            .order_by()
+            .values("user_id", "question_id")
+            .annotate(answers=Count("answer", distinct=True))
+            .filter(answers__gt=1)
+            .values_list("user_id", "question_id")
+        )
+        events = []
+        for (user_id, question_id), (answer, created_at) in state.items():
+            answers = [answer]
+            if (user_id, question_id) in changed:
+                answers.insert(0, "no" if answer == "yes" else "yes")
+            events.extend(
+                AnswerEvent(
+                    survey=survey,
+                    user_id=user_id,
+                    question_id=question_id,
+                    kind=AnswerEvent.ANSWER if i == 0 else AnswerEvent.CHANGE,
+                    answer=value,
+                    created_at=created_at,
+                )
+                for i, value in enumerate(answers)
+            )
+        deleted, _ = old.delete()
+        # In order, so the kept answer replays after the earlier one
+        AnswerEvent.objects.bulk_create(events, batch_size=1000)
+    return deleted, len(events)
+
+
+def answer_mismatches(survey):
+    """Return how many stored answers differ from the replayed event log."""
+    derived = {
+        key: answer
+        for key, (answer, _) in replay_answer_events(
+            iter_answer_events(survey)
+        ).items()
+    }
+    stored = {
+        (user_id, question_id): answer
+        for user_id, question_id, answer in Answer.objects.filter(
+            question__survey=survey
+        ).values_list("user_id", "question_id", "answer").iterator()
+    }
+    return len(derived.keys() ^ stored.keys()) + sum(
+        1 for key in derived.keys() & stored.keys() if derived[key] != stored[key]
+    )
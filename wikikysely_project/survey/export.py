@@ -0,0 +1,110 @@
+"""Compact columnar export of all answers of a survey.
+
+The stream starts with ``MAGIC``, followed by a little-endian ``uint32``
+header length and a UTF-8 JSON header describing the survey, the questions
+and the columns. Answer rows follow in blocks: each block is a ``uint32`` row
+count and then every column as a contiguous little-endian array. A block
+with zero rows ends the stream. Users are replaced by integer codes in the
+order they first appear, so the file contains no user names or ids.
+"""
+import json
+import struct
+
+import numpy as np
+
+from .models import Answer
+
+MAGIC = b"WKSA1\n"
+
+ANSWER_CODES = {"yes": 1, "no": -1}
+
+COLUMNS = [
+    ("user", "<i4"),
+    ("question", "<i4"),
+    ("answer", "<i1"),
+    ("created_at", "<i8"),
+]
+
+
+def _header(survey):
+    questions = survey.questions.filter(visible=True).order_by("pk")
+    return {
+        "format": "wikikysely-answers",
+        "version": 1,
+        "survey": {"id": survey.pk, "title": survey.title},
+        "answer_codes": ANSWER_CODES,
+        "columns": [{"name": name, "dtype": dtype} for name, dtype in COLUMNS],
+        "questions": [
+            {"id": q.pk, "text": q.text, "created_at": int(q.created_at.timestamp())}
+            for q in questions
+        ],
+    }
+
+
+def _encode_block(rows, user_codes):
+    user_ids, question_ids, answers, created = zip(*rows)
+    columns = [
+        np.array(
+            [user_codes.setdefault(u, len(user_codes)) for u in user_ids],
+            dtype=COLUMNS[0][1],
+        ),
+        np.array(question_ids, dtype=COLUMNS[1][1]),
+        np.array([ANSWER_CODES.get(a, 0) for a in answers], dtype=COLUMNS[2][1]),
+        np.array([int(c.timestamp()) for c in created], dtype=COLUMNS[3][1]),
+    ]
+    return b"".join(
+        [struct.pack("<I", len(rows))] + [column.tobytes() for column in columns]
+    )
+
+
+def iter_answer_export(survey, chunk_size=50000):
+    """Yield the export of the survey's visible answers as byte strings.
+
+    Rows are read with a server side iterator and encoded one block at a
+    time, so memory use is bounded by ``chunk_size``.
+    """
+    header = json.dumps(_header(survey), ensure_ascii=False).encode("utf-8")
+    yield MAGIC + struct.pack("<I", len(header)) + header
+
+    rows = (
+        Answer.objects.filter(question__survey=survey, question__visible=True)
+        .order_by("pk")
+        .values_list("user_id", "question_id", "answer", "created_at")
+        .iterator(chunk_size=chunk_size)
+    )
+    user_codes = {}
+    block = []
+    for row in rows:
+        block.append(row)
+        if len(block) >= chunk_size:
+            yield _encode_block(block, user_codes)
+            block = []
+    if block:
+        yield _encode_block(block, user_codes)
+    yield struct.pack("<I", 0)
+
+
+def read_answer_export(fileobj):
+    """Read an export stream and return ``(header, columns)``.
+
+    ``columns`` maps column names to NumPy arrays, ready for
+    ``numpy.savez`` or analysis.
+    """
+    if fileobj.read(len(MAGIC)) != MAGIC:
+        raise ValueError("Not a wikikysely answer export")
+    (length,) = struct.unpack("<I", fileobj.read(4))
+    header = json.loads(fileobj.read(length).decode("utf-8"))
+    dtypes = [(c["name"], np.dtype(c["dtype"])) for c in header["columns"]]
+    chunks = {name: [] for name, _ in dtypes}
+    while True:
+        (count,) = struct.unpack("<I", fileobj.read(4))
+        if not count:
+            break
+        for name, dtype in dtypes:
+            data = fileobj.read(count * dtype.itemsize)
+            chunks[name].append(np.frombuffer(data, dtype=dtype))
+    columns = {
+        name: np.concatenate(chunks[name]) if chunks[name] else np.empty(0, dtype)
+        for name, dtype in dtypes
+    }
+    return header, columns
@@ -51,3 +51,7 @@ class AnswerForm(BootstrapMixin, forms.ModelForm):
     class Meta:
         model = Answer
         fields = ['answer']
+
+
+class QuestionImportForm(forms.Form):
+    file = forms.FileField(label=_("CSV or JSON file"))
@@ -0,0 +1,102 @@
+"""Bulk import of questions from CSV or JSON files.
+
+Texts are compared in the normalized form used by the duplicate check of
+``question_add``. One set of the existing visible questions' normalized
+texts catches duplicates against the survey and within the file in a single
+pass, and the new questions are inserted with ``bulk_create``.
+"""
+from collections import namedtuple
+import csv
+import io
+import json
+
+from django.db import transaction
+from django.utils import timezone
+
+from .activity import record_activity
+from .models import Question, SurveyLog, bump_catalog_version, survey_log_entry
+from .similarity import normalize
+
+ImportResult = namedtuple("ImportResult", "created duplicates invalid")
+
+
+def read_question_texts(file, name=""):
+    """Return the question texts of an uploaded CSV or JSON file.
+
+    JSON files hold a list of texts or of objects with a ``text`` key; other
+    items and non-string texts are returned as they are and counted as
+    invalid by ``import_questions``. CSV files have the text in the first
+    column, or in a column named ``text`` when the first row is a header.
+    """
+    data = file.read()
+    if isinstance(data, bytes):
+        data = data.decode("utf-8-sig")
+    if name.lower().endswith(".json"):
+        items = json.loads(data)
+        if not isinstance(items, list):
+            raise ValueError("JSON file must contain a list")
+        return [
+            item.get("text", "") if isinstance(item, dict) else item
+            for item in items
+        ]
+    rows = [row for row in csv.reader(io.StringIO(data)) if row]
+    column = 0
+    if rows and "text" in (cell.strip().lower() for cell in rows[0]):
+        column = [cell.strip().lower() for cell in rows[0]].index("text")
+        rows = rows[1:]
+    return [row[column] if column < len(row) else "" for row in rows]
+
+
+def import_questions(survey, texts, user):
+    """Add the new questions among ``texts`` to ``survey`` in one transaction.
+
+    Whitespace in texts is collapsed. Texts whose normalized form matches a
+    visible question or an earlier text are returned as ``duplicates``, and
+    empty or too long texts and items that are not strings as ``invalid``.
+    """
+    max_length = Question._meta.get_field("text").max_length
+    seen = {
+        normalize(text)
+        for text in survey.questions.filter(visible=True)
+        .values_list("text", flat=True)
+        .iterator()
+    }
+    questions = []
+    duplicates = []
+    invalid = []
+    for raw in texts:
+        if not isinstance(raw, str):
+            invalid.append(raw)
+            continue
+        text = " ".join(raw.split())
+        key = normalize(text)
+        if not key or len(text) > max_length:
+            invalid.append(raw)
+        elif key in seen:
+            duplicates.append(text)
+        else:
+            seen.add(key)
+            questions.append(Question(survey=survey, text=text, creator=user))
+    if not questions:
+        return ImportResult([], duplicates, invalid)
+    with transaction.atomic():
+        created = Question.objects.bulk_create(questions, batch_size=1000)
+        SurveyLog.objects.bulk_create(
+            (
+                SurveyLog(
+                    data=survey_log_entry(
+                        user,
+                        survey,
+                        "question_add",
+                        question_id=question.pk,
+                        question_text=question.text,
+                    )
+                )
+                for question in created
+            ),
+            batch_size=1000,
+        )
+        # bulk_create skips the post_save handlers of single questions
+        bump_catalog_version(survey.pk)
+        record_activity(survey.pk, timezone.now(), questions=len(created))
+    return ImportResult(created, duplicates, invalid)
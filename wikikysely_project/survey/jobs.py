@@ -0,0 +1,149 @@
+"""Small database backed job queue for work that is too slow for a request."""
+from datetime import timedelta
+import traceback
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone, translation
+
+from .models import Job
+
+JOB_HANDLERS = {}
+
+# Seconds to wait before retrying a failed job, multiplied per attempt.
+RETRY_DELAY = 30
+
+# Seconds after which a running job is assumed to belong to a worker that
+# died. It is claimed again, or failed once its attempts are used up.
+RUNNING_LEASE = 30 * 60
+
+# Jobs whose results hold a user's personal data. They are only shown to
+# their user and to holders of the job token, or to superusers.
+USER_JOBS = {"userinfo_download", "user_data_delete"}
+
+
+def register_job(name):
+    """Register ``func(job)`` as the handler for jobs called ``name``."""
+
+    def decorator(func):
+        JOB_HANDLERS[name] = func
+        return func
+
+    return decorator
+
+
+def enqueue_job(name, user=None, max_attempts=3, **params):
+    """Store a new job and return it. The worker picks it up later."""
+    if name not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job: {name}")
+    return Job.objects.create(
+        name=name, user=user, params=params, max_attempts=max_attempts
+    )
+
+
+def claim_jobs(limit=1):
+    """Mark up to ``limit`` due jobs as running and return them.
+
+    Jobs left running for longer than ``RUNNING_LEASE`` count as due again.
+    Rows are locked with ``SELECT ... FOR UPDATE SKIP LOCKED`` where the
+    database supports it. The conditional update makes sure only one worker
+    claims a job also on SQLite, where row locks are not available.
+    """
+    now = timezone.now()
+    lease_start = now - timedelta(seconds=RUNNING_LEASE)
+    stale = Q(status=Job.RUNNING, started_at__lt=lease_start)
+    claimed = []
+    with transaction.atomic():
+        candidates = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=Job.QUEUED, run_after__lte=now) | stale)
+            .order_by("run_after", "pk")[:limit]
+        )
+        for job in candidates:
+            current = Job.objects.filter(
+                pk=job.pk, status=job.status, started_at=job.started_at
+            )
+            if job.status == Job.RUNNING and job.attempts >= job.max_attempts:
+                current.update(
+                    status=Job.FAILED,
+                    error="The worker stopped while running the job.",
+                    finished_at=now,
+                )
+                continue
+            updated = current.update(
+                status=Job.RUNNING,
+                started_at=now,
+                attempts=F("attempts") + 1,
+            )
+            if updated:
+                job.refresh_from_db()
+                claimed.append(job)
+    return claimed
+
+
+def run_job(job):
+    """Run a claimed job and store its result, scheduling a retry on error."""
+    handler = JOB_HANDLERS.get(job.name)
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job: {job.name}")
+        with translation.override(job.params.get("language")):
+            result = handler(job)
+    except Exception:
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            job.run_after = timezone.now() + timedelta(
+                seconds=RETRY_DELAY * job.attempts
+            )
+        else:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+    else:
+        job.status = Job.DONE
+        job.result = result
+        job.error = ""
+        job.finished_at = timezone.now()
+    # Update by primary key: the handler may have deleted ``job.user``
+    Job.objects.filter(pk=job.pk).update(
+        status=job.status,
+        result=job.result,
+        error=job.error,
+        run_after=job.run_after,
+        finished_at=job.finished_at,
+    )
+    return job
+
+
+@register_job("userinfo_download")
+def userinfo_download_job(job):
+    from .views import get_user_data
+
+    return get_user_data(job.user)
+
+
+@register_job("user_data_delete")
+def user_data_delete_job(job):
+    from .views import delete_user_data, user_data_delete_lines
+
+    user = job.user
+    summary = delete_user_data(user)
+    lines = [str(line) for line in user_data_delete_lines(summary)]
+    if not summary["has_questions"]:
+        # Keep the job when the account goes; its token still allows polling
+        Job.objects.filter(pk=job.pk).update(user=None)
+        user.delete()
+        lines.append(str(translation.gettext("Account removed.")))
+    return {**summary, "messages": lines}
+
+
+@register_job("survey_answers_wikitext")
+def survey_answers_wikitext_job(job):
+    from .models import Survey
+    from .views import build_wikitext_export
+
+    survey = Survey.objects.get(pk=job.params["survey_id"])
+    wiki_text, json_text = build_wikitext_export(
+        survey, job.user, job.params.get("include_personal", False)
+    )
+    return {"wiki_text": wiki_text, "json_text": json_text}
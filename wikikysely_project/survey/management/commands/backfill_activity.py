@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from wikikysely_project.survey.activity import backfill_activity
+from wikikysely_project.survey.models import Survey
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily and hourly activity rollups of every survey "
+        "from the stored answers and questions."
+    )
+
+    def handle(self, *args, **options):
+        for survey in Survey.objects.all():
+            buckets = backfill_activity(survey)
+            self.stdout.write(f"{survey}: {buckets} activity buckets")
+        self.stdout.write(self.style.SUCCESS("Activity rollups rebuilt."))
@@ -0,0 +1,94 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+import time
+
+from wikikysely_project.survey.models import Survey, Question, Answer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure Django admin pages of the Answer and Question tables on a "
+        "large synthetic survey. All created data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10000)
+        parser.add_argument("--questions", type=int, default=100)
+        parser.add_argument("--max-queries", type=int, default=12)
+        parser.add_argument("--max-ms", type=float, default=2000)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        over_budget = []
+        try:
+            with transaction.atomic():
+                admin_user = User.objects.create_superuser(
+                    username="benchmark_admin"
+                )
+                survey = Survey.objects.create(
+                    title="Benchmark", creator=admin_user, state="running"
+                )
+                users = User.objects.bulk_create(
+                    User(username=f"benchmark_user_{i}")
+                    for i in range(options["users"])
+                )
+                questions = Question.objects.bulk_create(
+                    Question(
+                        survey=survey, text=f"Question {i}?", creator=admin_user
+                    )
+                    for i in range(options["questions"])
+                )
+                for question in questions:
+                    Answer.objects.bulk_create(
+                        (
+                            Answer(question=question, user=user, answer="yes")
+                            for user in users
+                        ),
+                        batch_size=5000,
+                    )
+                self.stdout.write(
+                    f"{len(users) * len(questions)} answers, "
+                    f"{len(questions)} questions"
+                )
+
+                factory = RequestFactory()
+                answer_pk = Answer.objects.values_list("pk", flat=True).first()
+                pages = [
+                    ("answer list", Answer, "changelist_view", (), {}),
+                    ("yes answers", Answer, "changelist_view", (), {"answer": "yes"}),
+                    ("question list", Question, "changelist_view", (), {}),
+                    ("answer change", Answer, "change_view", (str(answer_pk),), {}),
+                    ("survey change", Survey, "change_view", (str(survey.pk),), {}),
+                ]
+                for label, model, view_name, args, params in pages:
+                    request = factory.get("/admin/", params)
+                    request.user = admin_user
+                    view = getattr(admin.site._registry[model], view_name)
+                    with CaptureQueriesContext(connection) as queries:
+                        start = time.perf_counter()
+                        view(request, *args).render()
+                        elapsed = (time.perf_counter() - start) * 1000
+                    ok = (
+                        len(queries) <= options["max_queries"]
+                        and elapsed <= options["max_ms"]
+                    )
+                    if not ok:
+                        over_budget.append(label)
+                    self.stdout.write(
+                        f"{label}: {elapsed:.1f} ms, {len(queries)} queries"
+                        f"{'' if ok else ' (over budget)'}"
+                    )
+                raise Rollback
+        except Rollback:
+            pass
+        if over_budget:
+            raise CommandError(f"Over budget: {', '.join(over_budget)}")
+        self.stdout.write(self.style.SUCCESS("All admin pages within budget."))
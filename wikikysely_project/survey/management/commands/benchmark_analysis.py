@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+import time
+
+import numpy as np
+from scipy import sparse
+
+from wikikysely_project.survey.analysis import analyze_matrix
+
+
+class Command(BaseCommand):
+    help = "Measure opinion group analysis on a synthetic answer matrix."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100000)
+        parser.add_argument("--questions", type=int, default=5000)
+        parser.add_argument(
+            "--density",
+            type=float,
+            default=0.02,
+            help="Share of questions each user has answered.",
+        )
+        parser.add_argument("--groups", type=int, default=3)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(0)
+        users, questions = options["users"], options["questions"]
+        count = int(users * questions * options["density"])
+        rows = rng.integers(0, users, count)
+        cols = rng.integers(0, questions, count)
+        # Users in the same planted group mostly answer alike
+        planted = np.where(cols % options["groups"] == rows % options["groups"], 1, -1)
+        values = np.where(rng.random(count) < 0.2, -planted, planted)
+        matrix = sparse.csr_matrix(
+            (values, (rows, cols)), shape=(users, questions)
+        )
+        matrix.data = np.sign(matrix.data).astype(np.int8)
+
+        start = time.perf_counter()
+        result = analyze_matrix(
+            matrix, np.arange(questions), n_groups=options["groups"]
+        )
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{users} users x {questions} questions, {matrix.nnz} answers: "
+            f"{elapsed:.2f} s, group sizes "
+            f"{[g['size'] for g in result['groups']]}"
+        )
@@ -0,0 +1,68 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Run in a fresh interpreter: load the WSGI application like a web worker
+# and time the first request to the front page.
+SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+from wikikysely_project.wsgi import application
+ready = time.perf_counter()
+environ = {"PATH_INFO": sys.argv[1], "HTTP_HOST": sys.argv[2]}
+setup_testing_defaults(environ)
+status = []
+body = b"".join(application(environ, lambda s, h, e=None: status.append(s)))
+done = time.perf_counter()
+print(json.dumps(
+    {"ready": ready - start, "first": done - ready, "status": status[0]}
+))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the time from web worker start to the first response with "
+        "and without SURVEY_WARM_UP."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--path", default="/fi/")
+
+    def _run(self, warm_up, path):
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": os.environ.get(
+                "DJANGO_SETTINGS_MODULE", "wikikysely_project.settings"
+            ),
+            "SURVEY_WARM_UP": "1" if warm_up else "0",
+        }
+        output = subprocess.run(
+            [sys.executable, "-c", SCRIPT, path, settings.ALLOWED_HOSTS[0]],
+            capture_output=True,
+            check=True,
+            cwd=settings.BASE_DIR,
+            env=env,
+            text=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        for warm_up in (False, True):
+            runs = [
+                self._run(warm_up, options["path"]) for _ in range(options["runs"])
+            ]
+            ready = statistics.median(run["ready"] for run in runs) * 1000
+            first = statistics.median(run["first"] for run in runs) * 1000
+            self.stdout.write(
+                f"{'warm-up' if warm_up else 'cold'}: "
+                f"worker ready {ready:.1f} ms, "
+                f"first response {first:.1f} ms ({runs[0]['status']}), "
+                f"total {ready + first:.1f} ms"
+            )
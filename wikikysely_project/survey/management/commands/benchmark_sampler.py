@@ -0,0 +1,105 @@
+from django.core.management.base import BaseCommand
+import random
+import statistics
+import time
+
+from wikikysely_project.survey.sampling import FenwickTree, question_weight
+from wikikysely_project.survey.stats import wilson_interval
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate a campaign with the uniform and the adaptive sampler and "
+        "compare how fast question results settle."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=30)
+        parser.add_argument("--answers-per-day", type=int, default=2000)
+        parser.add_argument("--initial-questions", type=int, default=200)
+        parser.add_argument(
+            "--added-questions",
+            type=int,
+            default=300,
+            help="Questions added at random times during the campaign.",
+        )
+        parser.add_argument(
+            "--target-width",
+            type=float,
+            default=0.25,
+            help="Wilson interval width at which a result counts as settled.",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(0)
+        days = options["days"]
+        created = [0.0] * options["initial_questions"] + sorted(
+            rng.uniform(0, days) for _ in range(options["added_questions"])
+        )
+        shares = [rng.uniform(0.05, 0.95) for _ in created]
+        for name in ("uniform", "adaptive"):
+            start = time.perf_counter()
+            settled, errors, answers = self._simulate(
+                name, created, shares, options, random.Random(1)
+            )
+            elapsed = time.perf_counter() - start
+            late = [
+                d for d, c in zip(settled, created) if c > days / 2 and d is not None
+            ]
+            unsettled = sum(1 for d in settled if d is None)
+            done = [d for d in settled if d is not None]
+            self.stdout.write(
+                f"{name:>8}: {answers} answers in {elapsed:.2f} s, "
+                f"days to settle median {statistics.median(done):.2f} "
+                f"p90 {_percentile(done, 0.9):.2f}, "
+                f"late questions median {statistics.median(late) if late else 0:.2f}, "
+                f"unsettled {unsettled}, "
+                f"mean error {statistics.mean(errors):.3f}"
+            )
+
+    def _simulate(self, name, created, shares, options, rng):
+        days = options["days"]
+        per_day = options["answers_per_day"]
+        target = options["target_width"]
+        yes = [0] * len(created)
+        total = [0] * len(created)
+        settled = [None] * len(created)
+        visible = 0
+        tree = FenwickTree()
+        refreshed = 0.0
+        for step in range(days * per_day):
+            now = step / per_day
+            while visible < len(created) and created[visible] <= now:
+                tree.append(question_weight(0, 0, 0.0))
+                visible += 1
+            if name == "adaptive" and now - refreshed >= 1 / 24:
+                # Ages change the weights, refresh them hourly
+                tree = FenwickTree(
+                    question_weight(yes[i], total[i], now - created[i])
+                    for i in range(visible)
+                )
+                refreshed = now
+            if name == "uniform":
+                index = rng.randrange(visible)
+            else:
+                index = tree.pick(rng)
+            total[index] += 1
+            yes[index] += rng.random() < shares[index]
+            if name == "adaptive":
+                tree[index] = question_weight(
+                    yes[index], total[index], now - created[index]
+                )
+            if settled[index] is None:
+                low, high = wilson_interval(yes[index], total[index])
+                if high - low <= target:
+                    settled[index] = now - created[index]
+        errors = [
+            abs(y / t - s) if t else abs(0.5 - s)
+            for y, t, s in zip(yes, total, shares)
+        ]
+        return settled, errors, sum(total)
+
+
+def _percentile(values, share):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(share * len(values)))] if values else 0.0
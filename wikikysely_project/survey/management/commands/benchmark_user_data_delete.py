@@ -0,0 +1,65 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+import time
+
+from wikikysely_project.survey.models import Survey, Question, Answer
+from wikikysely_project.survey.views import delete_user_data
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure user data deletion for a prolific question author. "
+        "All created data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--questions", type=int, default=10000)
+        parser.add_argument(
+            "--answered-ratio",
+            type=float,
+            default=0.5,
+            help="Share of the questions answered by another user.",
+        )
+
+    def handle(self, *args, **options):
+        count = options["questions"]
+        User = get_user_model()
+        try:
+            with transaction.atomic():
+                author = User.objects.create(username="benchmark_author")
+                other = User.objects.create(username="benchmark_other")
+                survey = Survey.objects.create(
+                    title="Benchmark", creator=other, state="running"
+                )
+                questions = Question.objects.bulk_create(
+                    Question(survey=survey, text=f"Question {i}?", creator=author)
+                    for i in range(count)
+                )
+                answered = questions[: int(count * options["answered_ratio"])]
+                Answer.objects.bulk_create(
+                    Answer(question=q, user=other, answer="yes") for q in answered
+                )
+                Answer.objects.bulk_create(
+                    Answer(question=q, user=author, answer="no") for q in questions
+                )
+
+                for dry_run in (True, False):
+                    with CaptureQueriesContext(connection) as queries:
+                        start = time.perf_counter()
+                        summary = delete_user_data(author, dry_run=dry_run)
+                        elapsed = time.perf_counter() - start
+                    self.stdout.write(
+                        f"{'dry-run' if dry_run else 'delete'}: "
+                        f"{elapsed * 1000:.1f} ms, {len(queries)} queries, "
+                        f"removed {summary['removed_questions']}/"
+                        f"{summary['total_questions']} questions"
+                    )
+                raise Rollback
+        except Rollback:
+            pass
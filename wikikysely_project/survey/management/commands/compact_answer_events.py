@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from wikikysely_project.survey.events import (
+    answer_mismatches,
+    compact_answer_events,
+    snapshot_answers,
+    tally_mismatches,
+)
+from wikikysely_project.survey.models import Survey
+
+
+class Command(BaseCommand):
+    help = (
+        "Log answers that have no history yet, optionally collapse old answer "
+        "events into one event per answer and check that replaying the log "
+        "gives the stored answers and tallies."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            metavar="DAYS",
+            help="Collapse events older than this many days.",
+        )
+
+    def handle(self, *args, **options):
+        before = None
+        if options["older_than"] is not None:
+            before = timezone.now() - timedelta(days=options["older_than"])
+        for survey in Survey.objects.all():
+            written = snapshot_answers(survey)
+            self.stdout.write(f"{survey}: {written} answers added to the log")
+            if before is not None:
+                deleted, kept = compact_answer_events(survey, before)
+                self.stdout.write(
+                    f"{survey}: {deleted} old events collapsed into {kept}"
+                )
+            mismatches = answer_mismatches(survey)
+            if mismatches:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"{survey}: {mismatches} answers differ from the log"
+                    )
+                )
+            mismatches = tally_mismatches(survey)
+            if mismatches:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"{survey}: {mismatches} question tallies differ from "
+                        "the log"
+                    )
+                )
+        self.stdout.write(self.style.SUCCESS("Answer events compacted."))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+import io
+import os
+import struct
+import time
+
+import numpy as np
+
+from wikikysely_project.survey.export import iter_answer_export, read_answer_export
+from wikikysely_project.survey.models import Survey
+
+
+class Command(BaseCommand):
+    help = "Export all answers of the main survey as a compact columnar file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="File to write.")
+        parser.add_argument(
+            "--format",
+            choices=["binary", "npz"],
+            default="binary",
+            help=(
+                "Chunked binary stream with bounded memory use (default) or a "
+                "compressed NumPy .npz archive built in memory."
+            ),
+        )
+        parser.add_argument("--chunk-size", type=int, default=50000)
+
+    def handle(self, *args, **options):
+        survey = Survey.get_main_survey()
+        if survey is None:
+            raise CommandError("No survey found.")
+        output = options["output"]
+        start = time.perf_counter()
+        chunks = iter_answer_export(survey, chunk_size=options["chunk_size"])
+        if options["format"] == "npz":
+            _, columns = read_answer_export(io.BytesIO(b"".join(chunks)))
+            with open(output, "wb") as f:
+                np.savez_compressed(f, **columns)
+            rows = len(columns["answer"])
+        else:
+            rows = 0
+            with open(output, "wb") as f:
+                f.write(next(chunks))
+                for chunk in chunks:
+                    rows += struct.unpack_from("<I", chunk)[0]
+                    f.write(chunk)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Exported {rows} answers to {output} "
+                f"({os.path.getsize(output)} bytes) in {elapsed:.2f} s."
+            )
+        )
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from wikikysely_project.survey.importing import import_questions, read_question_texts
+from wikikysely_project.survey.models import Survey
+
+
+class Command(BaseCommand):
+    help = (
+        "Import questions into the main survey from a CSV or JSON file, "
+        "skipping duplicates of visible questions and of earlier rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("file", help="CSV or JSON file to read.")
+        parser.add_argument(
+            "--user",
+            help="Username of the question creator. Defaults to the survey creator.",
+        )
+
+    def handle(self, *args, **options):
+        survey = Survey.get_main_survey()
+        if survey is None:
+            raise CommandError("No survey found.")
+        user = survey.creator
+        if options["user"]:
+            try:
+                user = get_user_model().objects.get(username=options["user"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"User {options['user']} not found.")
+        elif user is None:
+            raise CommandError("The survey has no creator; give --user.")
+        try:
+            with open(options["file"], "rb") as f:
+                texts = read_question_texts(f, options["file"])
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        result = import_questions(survey, texts, user)
+        for text in result.duplicates:
+            self.stdout.write(f"Duplicate: {text}")
+        for text in result.invalid:
+            self.stdout.write(self.style.WARNING(f"Invalid: {text!r}"))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {len(result.created)} questions, skipped "
+                f"{len(result.duplicates)} duplicates and "
+                f"{len(result.invalid)} invalid rows."
+            )
+        )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from wikikysely_project.survey.events import opinion_changes
+from wikikysely_project.survey.models import Survey
+
+
+class Command(BaseCommand):
+    help = (
+        "Print per question how many users have changed their answer, from "
+        "the answer event log."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("survey", type=int, help="Survey id.")
+
+    def handle(self, *args, **options):
+        try:
+            survey = Survey.objects.get(pk=options["survey"])
+        except Survey.DoesNotExist:
+            raise CommandError(f"Survey {options['survey']} does not exist.")
+        changes = opinion_changes(survey)
+        for pk, text in survey.questions.order_by("pk").values_list("pk", "text"):
+            changed, answered = changes.get(pk, (0, 0))
+            rate = changed / answered if answered else 0
+            self.stdout.write(f"{pk}\t{changed}/{answered}\t{rate:.1%}\t{text}")
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from wikikysely_project.survey.models import SkippedQuestion, pack_skipped_questions
+
+
+class Command(BaseCommand):
+    help = (
+        "Move skips stored in the old per question SkippedQuestion table into "
+        "the packed SkipSet rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--drop-table",
+            action="store_true",
+            help="Drop the old table after moving its rows.",
+        )
+
+    def handle(self, *args, **options):
+        moved = pack_skipped_questions()
+        if moved is None:
+            self.stdout.write("No SkippedQuestion table, nothing to move.")
+            return
+        self.stdout.write(f"{moved} skips moved into SkipSet")
+        if options["drop_table"]:
+            with connection.schema_editor() as editor:
+                editor.delete_model(SkippedQuestion)
+            self.stdout.write("SkippedQuestion table dropped")
+        self.stdout.write(self.style.SUCCESS("Skips packed."))
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import translation
+
+from wikikysely_project.survey.models import Survey
+from wikikysely_project.survey.publish import DEFAULT_PAGE_SIZE, publish_results
+
+
+class Command(BaseCommand):
+    help = (
+        "Write the results of the main survey as page-sized wikitext tables "
+        "and JSON, together with a diff of the rows changed since the "
+        "previous run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output", help="Directory to write.")
+        parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+        parser.add_argument(
+            "--language",
+            default=settings.LANGUAGE_CODE,
+            choices=[code for code, _ in settings.LANGUAGES],
+        )
+
+    def handle(self, *args, **options):
+        survey = Survey.get_main_survey()
+        if survey is None:
+            raise CommandError("No survey found.")
+        if options["page_size"] < 1:
+            raise CommandError("--page-size must be positive.")
+        with translation.override(options["language"]):
+            stats = publish_results(
+                survey, options["output"], page_size=options["page_size"]
+            )
+        self.stdout.write(
+            f"{stats['rows']} rows, {stats['changed']} changed, "
+            f"{stats['removed']} removed"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Wrote {stats['pages_written']} of {stats['pages']} pages to "
+                f"{options['output']}."
+            )
+        )
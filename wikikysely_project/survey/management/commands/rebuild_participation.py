@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from wikikysely_project.survey.models import (
+    Survey,
+    rebuild_participation,
+    refresh_question_tallies,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute per user answer and skip counts and the stored question "
+        "tallies from stored answers."
+    )
+
+    def handle(self, *args, **options):
+        for survey in Survey.objects.all():
+            # The rebuilt agreement counts use the refreshed majorities
+            refresh_question_tallies(survey.questions.values("pk"))
+            rebuild_participation(survey)
+            self.stdout.write(
+                f"{survey}: {survey.participations.count()} participants"
+            )
+        self.stdout.write(self.style.SUCCESS("Participation rebuilt."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from wikikysely_project.survey.agreement import recompute_agreement
+from wikikysely_project.survey.models import Survey
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the majority answers of the questions and how often each "
+        "user agrees with them from the stored answers."
+    )
+
+    def handle(self, *args, **options):
+        for survey in Survey.objects.all():
+            result = recompute_agreement(survey)
+            self.stdout.write(
+                f"{survey}: {result['users']} users, "
+                f"{result['majorities']} majorities and "
+                f"{result['participations']} agreement counts corrected"
+            )
+        self.stdout.write(self.style.SUCCESS("Agreement recomputed."))
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand
+from pathlib import Path
+import gzip
+import re
+
+from wikikysely_project.survey.vendor import VENDOR_ASSETS
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+TAG = re.compile(
+    r"{%\s*(static|vendor_static|extends|include)\s+['\"]([^'\"]+)['\"]"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the static asset weight of every page template, uncompressed "
+        "and as served with gzip and Brotli."
+    )
+
+    def handle(self, *args, **options):
+        self.template_dirs = [Path(d) for d in settings.TEMPLATES[0]["DIRS"]]
+        self.sizes = {}
+        rows = []
+        for directory in self.template_dirs:
+            for path in sorted(directory.rglob("*.html")):
+                name = path.relative_to(directory).as_posix()
+                assets = self._assets(name, set())
+                if not assets:
+                    continue
+                totals = [0, 0, 0]
+                for asset in assets:
+                    for i, size in enumerate(self._size(asset)):
+                        totals[i] += size
+                missing = [a for a in assets if finders.find(a) is None]
+                rows.append((name, len(assets), missing, totals))
+
+        self.stdout.write(
+            f"{'template':<40} {'files':>5} {'missing':>7} "
+            f"{'raw kB':>8} {'gzip kB':>8} {'br kB':>8}"
+        )
+        for name, count, missing, (raw, gz, br) in rows:
+            self.stdout.write(
+                f"{name:<40} {count:>5} {len(missing):>7} "
+                f"{raw / 1024:>8.1f} {gz / 1024:>8.1f} {br / 1024:>8.1f}"
+            )
+        if any(missing for _name, _count, missing, _totals in rows):
+            self.stdout.write(
+                "missing files are not counted, run manage.py vendor_assets"
+            )
+        if brotli is None:
+            self.stdout.write("brotli is not installed, br sizes are zero")
+
+    def _find_template(self, name):
+        for directory in self.template_dirs:
+            if (directory / name).exists():
+                return directory / name
+        return None
+
+    def _assets(self, name, seen):
+        """Return the static paths used by a template."""
+        assets = set()
+        path = self._find_template(name)
+        if path is None or name in seen:
+            return assets
+        seen.add(name)
+        for tag, value in TAG.findall(path.read_text()):
+            if tag == "static":
+                assets.add(value)
+            elif tag == "vendor_static":
+                assets.add(VENDOR_ASSETS[value][0])
+            else:
+                assets |= self._assets(value, seen)
+        return assets
+
+    def _size(self, asset):
+        if asset not in self.sizes:
+            source = finders.find(asset)
+            if source is None:
+                self.sizes[asset] = (0, 0, 0)
+            else:
+                data = Path(source).read_bytes()
+                self.sizes[asset] = (
+                    len(data),
+                    len(gzip.compress(data, 9)),
+                    len(brotli.compress(data)) if brotli else 0,
+                )
+        return self.sizes[asset]
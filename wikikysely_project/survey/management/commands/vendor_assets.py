@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from pathlib import Path
+from urllib.request import urlopen
+
+from wikikysely_project.survey.vendor import VENDOR_ASSETS
+
+
+class Command(BaseCommand):
+    help = "Download the pinned third party browser libraries to static/vendor."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true", help="Download files that already exist."
+        )
+
+    def handle(self, *args, **options):
+        root = Path(settings.STATICFILES_DIRS[0])
+        for name, (path, url) in VENDOR_ASSETS.items():
+            target = root / path
+            if target.exists() and not options["force"]:
+                self.stdout.write(f"{name}: {path} exists")
+                continue
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with urlopen(url, timeout=30) as response:
+                target.write_bytes(response.read())
+            self.stdout.write(f"{name}: downloaded {path}")
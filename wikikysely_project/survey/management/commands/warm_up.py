@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from wikikysely_project.survey.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-import modules, warm the question catalog and result caches and "
+        "render the main pages in every language, reporting each step's time."
+    )
+
+    def handle(self, *args, **options):
+        for name, seconds in warm_up():
+            self.stdout.write(f"{name}: {seconds * 1000:.1f} ms")
+        self.stdout.write(self.style.SUCCESS("Warm-up done."))
@@ -1,5 +1,23 @@
+import secrets
+import struct
+
 from django.conf import settings
-from django.db import models
+from django.contrib.auth import get_user_model
+from django.db import connection, models, transaction
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    F,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest, Round
+from django.db.models.lookups import Exact, GreaterThan, LessThan
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
@@ -23,7 +41,21 @@ class Survey(models.Model):
     state = models.CharField(_('State'), max_length=7, choices=STATE_CHOICES, default='paused')
     deleted = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Incremented whenever answers or questions change, used in cache keys
+    data_version = models.PositiveIntegerField(default=0, editable=False)
+    # Incremented whenever questions are added, edited, hidden or removed
+    catalog_version = models.PositiveIntegerField(default=0, editable=False)
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # The version counters are only changed by their bump functions
+            kwargs["update_fields"] = [
+                f.name
+                for f in self._meta.concrete_fields
+                if not f.primary_key
+                and f.name not in ("data_version", "catalog_version")
+            ]
+        super().save(*args, **kwargs)
 
     @classmethod
     def get_main_survey(cls):
@@ -45,6 +77,40 @@ class Question(models.Model):
     creator = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.PROTECT)
     created_at = models.DateTimeField(auto_now_add=True)
     visible = models.BooleanField(default=True)
+    # Answer tallies kept up to date by change_question_tallies() and
+    # refresh_question_tallies() so
+    # question tables can be sorted and paginated with indexes
+    answer_count = models.PositiveIntegerField(default=0, editable=False)
+    yes_count = models.PositiveIntegerField(default=0, editable=False)
+    agree_ratio = models.PositiveSmallIntegerField(default=0, editable=False)
+    # "yes" or "no" when more than half of the answers agree, else empty
+    majority = models.CharField(max_length=3, blank=True, default="", editable=False)
+
+    TALLY_FIELDS = ("answer_count", "yes_count", "agree_ratio", "majority")
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["survey", "visible", "created_at"]),
+            models.Index(fields=["survey", "visible", "answer_count"]),
+            models.Index(fields=["survey", "visible", "agree_ratio"]),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            # The tallies are only changed by the tally functions
+            kwargs["update_fields"] = [
+                f.name
+                for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.TALLY_FIELDS
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Compared with the saved visibility by the post_save handler
+        instance._loaded_visible = instance.__dict__.get("visible")
+        return instance
 
     def __str__(self):
         return self.text
@@ -62,29 +128,734 @@ class Answer(models.Model):
 
     class Meta:
         unique_together = ('question', 'user')
+        indexes = [models.Index(fields=["user", "answer"])]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Compared with the new answer by the post_save handler
+        instance._loaded_answer = instance.__dict__.get("answer")
+        return instance
 
-class SkippedQuestion(models.Model):
-    """Store questions a user has chosen to skip."""
 
+class AnswerEvent(models.Model):
+    """Append-only history of answers, changes, retractions and skips.
+
+    ``Answer`` stays the authoritative current state and the tallies are
+    kept from it; the log adds the history used by ``events.opinion_changes``.
+    Replaying the events gives the same answers and tallies, which
+    ``events.answer_mismatches`` and ``events.tally_mismatches`` check.
+    """
+
+    ANSWER = "answer"
+    CHANGE = "change"
+    RETRACT = "retract"
+    SKIP = "skip"
+    KIND_CHOICES = [
+        (ANSWER, _("Answer")),
+        (CHANGE, _("Change")),
+        (RETRACT, _("Retract")),
+        (SKIP, _("Skip")),
+    ]
+    survey = models.ForeignKey(
+        Survey, related_name="answer_events", on_delete=models.CASCADE
+    )
     question = models.ForeignKey(
-        Question, related_name="skips", on_delete=models.CASCADE
+        Question, related_name="events", on_delete=models.CASCADE
+    )
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=7, choices=KIND_CHOICES)
+    answer = models.CharField(max_length=3, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["survey", "created_at"]),
+            models.Index(fields=["question", "user"]),
+        ]
+
+
+def log_answer_event(user_id, question, kind, answer=""):
+    """Append one event to the answer history."""
+    return AnswerEvent.objects.create(
+        survey_id=question.survey_id,
+        question_id=question.pk,
+        user_id=user_id,
+        kind=kind,
+        answer=answer,
+    )
+
+
+class SkipSet(models.Model):
+    """Questions a user has skipped in a survey, packed into one row.
+
+    ``data`` holds the sorted question ids as little-endian ``uint32``
+    values, see ``pack_ids`` and ``unpack_ids``.
+    """
+
+    survey = models.ForeignKey(
+        Survey, related_name="skip_sets", on_delete=models.CASCADE
     )
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE
     )
+    data = models.BinaryField(default=b"")
+
+    class Meta:
+        unique_together = ("survey", "user")
+
+
+def pack_ids(ids):
+    """Return question ids packed as sorted little-endian ``uint32`` values."""
+    ids = sorted(ids)
+    return struct.pack(f"<{len(ids)}I", *ids)
+
+
+def unpack_ids(data):
+    """Return the set of question ids packed by ``pack_ids``."""
+    data = bytes(data)
+    return set(struct.unpack(f"<{len(data) // 4}I", data))
+
+
+class SkippedQuestion(models.Model):
+    """A skip stored as its own row before ``SkipSet`` existed.
+
+    The model is unmanaged so upgrading does not drop the table of older
+    databases before ``pack_skipped_questions`` has moved its rows into
+    ``SkipSet``. New databases never have the table.
+    """
+
+    question = models.ForeignKey(
+        Question, related_name="+", on_delete=models.DO_NOTHING
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, related_name="+", on_delete=models.DO_NOTHING
+    )
 
     class Meta:
+        managed = False
+        db_table = "survey_skippedquestion"
         unique_together = ("question", "user")
 
 
+def pack_skipped_questions():
+    """Move the rows of the old ``SkippedQuestion`` table into ``SkipSet``.
+
+    Skips of answered questions and of deleted users are dropped and the
+    participation counts of the affected surveys are rebuilt. Returns the number of moved skips, or
+    ``None`` when the database has no ``SkippedQuestion`` table.
+    """
+    if SkippedQuestion._meta.db_table not in connection.introspection.table_names():
+        return None
+    skips = {}
+    users = get_user_model().objects.all()
+    rows = SkippedQuestion.objects.filter(user__in=users).exclude(
+        Exists(
+            Answer.objects.filter(
+                question_id=OuterRef("question_id"), user_id=OuterRef("user_id")
+            )
+        )
+    ).values_list("question__survey_id", "user_id", "question_id")
+    for survey_id, user_id, question_id in rows.iterator():
+        skips.setdefault((survey_id, user_id), set()).add(question_id)
+    with transaction.atomic():
+        for (survey_id, user_id), ids in skips.items():
+            row, _created = SkipSet.objects.select_for_update().get_or_create(
+                survey_id=survey_id, user_id=user_id
+            )
+            row.data = pack_ids(unpack_ids(row.data) | ids)
+            row.save(update_fields=["data"])
+        for survey in Survey.objects.filter(pk__in={key[0] for key in skips}):
+            rebuild_participation(survey)
+    return sum(len(ids) for ids in skips.values())
+
+
+class Participation(models.Model):
+    """Per user answer and skip counts over the visible questions of a survey.
+
+    ``agreed`` and ``disagreed`` count the answers that side with or against
+    the question's majority; answers to evenly split questions are in
+    neither.
+    """
+
+    survey = models.ForeignKey(
+        Survey, related_name="participations", on_delete=models.CASCADE
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE
+    )
+    answered = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)
+    agreed = models.PositiveIntegerField(default=0)
+    disagreed = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("survey", "user")
+        indexes = [models.Index(fields=["survey", "answered"])]
+
+    @property
+    def split(self):
+        """Answers to questions without a majority."""
+        return max(self.answered - self.agreed - self.disagreed, 0)
+
+    @property
+    def agreement_score(self):
+        """Percentage of answers with a majority that side with it, or None."""
+        decided = self.agreed + self.disagreed
+        if not decided:
+            return None
+        return round(self.agreed * 100 / decided)
+
+
+class ActivityRollup(models.Model):
+    """Survey activity per day or hour, maintained by ``activity.py``."""
+
+    DAY = "day"
+    HOUR = "hour"
+    PERIOD_CHOICES = [
+        (DAY, _("Day")),
+        (HOUR, _("Hour")),
+    ]
+    survey = models.ForeignKey(
+        Survey, related_name="activity", on_delete=models.CASCADE
+    )
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    start = models.DateTimeField()
+    answers = models.PositiveIntegerField(default=0)
+    participants = models.PositiveIntegerField(default=0)
+    questions = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ("survey", "period", "start")
+
+
+def bump_data_version(survey_id=None):
+    """Mark survey results as changed so cached derived data is recomputed.
+
+    Without ``survey_id`` all surveys are bumped.
+    """
+    surveys = Survey.objects.all()
+    if survey_id is not None:
+        surveys = surveys.filter(pk=survey_id)
+    surveys.update(data_version=F("data_version") + 1)
+
+
+def bump_catalog_version(survey_id=None):
+    """Mark survey questions as changed so question indexes are rebuilt.
+
+    Without ``survey_id`` all surveys are bumped. Question changes also
+    change results, so the data version is bumped too.
+    """
+    surveys = Survey.objects.all()
+    if survey_id is not None:
+        surveys = surveys.filter(pk=survey_id)
+    surveys.update(
+        data_version=F("data_version") + 1,
+        catalog_version=F("catalog_version") + 1,
+    )
+
+
+def adjust_participation(
+    survey_id, user_id, answered=0, skipped=0, agreed=0, disagreed=0
+):
+    """Add the given deltas to a user's participation counts."""
+    counts = {
+        "answered": answered,
+        "skipped": skipped,
+        "agreed": agreed,
+        "disagreed": disagreed,
+    }
+    changes = {
+        name: Greatest(F(name) + value, 0) for name, value in counts.items() if value
+    }
+    if not changes:
+        return
+    rows = Participation.objects.filter(survey_id=survey_id, user_id=user_id)
+    if rows.update(**changes):
+        return
+    _, created = Participation.objects.get_or_create(
+        survey_id=survey_id,
+        user_id=user_id,
+        defaults={name: max(value, 0) for name, value in counts.items()},
+    )
+    if not created:
+        rows.update(**changes)
+
+
+def agreement_counts(answer, majority):
+    """Return ``(agreed, disagreed)`` of one answer to a question."""
+    if not answer or not majority:
+        return 0, 0
+    return (1, 0) if answer == majority else (0, 1)
+
+
+def agreement_change(question_id, old_answer, new_answer):
+    """Return the agreement deltas of a user changing their answer.
+
+    Uses the majority stored before the question's tallies are refreshed;
+    ``change_question_tallies`` then applies any majority flip to everyone
+    who answered. Answers to hidden questions are not counted.
+    """
+    majority = (
+        Question.objects.filter(pk=question_id, visible=True)
+        .values_list("majority", flat=True)
+        .first()
+    )
+    if majority is None:
+        return {}
+    old = agreement_counts(old_answer, majority)
+    new = agreement_counts(new_answer, majority)
+    return {"agreed": new[0] - old[0], "disagreed": new[1] - old[1]}
+
+
+def shift_agreement(flips):
+    """Update the agreement counts after question majorities changed.
+
+    ``flips`` holds ``(question_id, survey_id, old, new)`` majorities. Each
+    flip moves the users who answered the question with two UPDATEs.
+    """
+    for question_id, survey_id, old, new in flips:
+        for answer in ("yes", "no"):
+            before = agreement_counts(answer, old)
+            after = agreement_counts(answer, new)
+            if before == after:
+                continue
+            voters = Answer.objects.filter(question_id=question_id, answer=answer)
+            Participation.objects.filter(
+                survey_id=survey_id, user__in=voters.values("user")
+            ).update(
+                agreed=Greatest(F("agreed") + after[0] - before[0], 0),
+                disagreed=Greatest(F("disagreed") + after[1] - before[1], 0),
+            )
+
+
+def adjust_question_participation(question, delta):
+    """Add ``delta`` to the counts of everyone who answered or skipped a question.
+
+    Used when a question is hidden (``-1``) or shown again (``+1``).
+    """
+    adjust_questions_participation(question.survey_id, [question.pk], delta)
+
+
+def adjust_questions_participation(survey_id, question_ids, delta):
+    """Like ``adjust_question_participation`` for many questions at once.
+
+    Each count changes by ``delta`` times the number of the questions the
+    user answered or skipped.
+    """
+    rows = Participation.objects.filter(survey_id=survey_id)
+    answers = Answer.objects.filter(question_id__in=question_ids)
+
+    def per_user(name, answers):
+        count = (
+            answers.filter(user=OuterRef("user"))
+            .order_by()
+            .values("user")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return Greatest(
+            F(name)
+            + delta
+            * Coalesce(Subquery(count, output_field=models.IntegerField()), 0),
+            0,
+        )
+
+    rows.filter(user__in=answers.values("user")).update(
+        answered=per_user("answered", answers),
+        agreed=per_user("agreed", answers.filter(answer=F("question__majority"))),
+        disagreed=per_user(
+            "disagreed",
+            answers.exclude(question__majority="").exclude(
+                answer=F("question__majority")
+            ),
+        ),
+    )
+    question_ids = set(question_ids)
+    skipped_by = {}
+    for row in _skip_sets(survey_id):
+        count = len(unpack_ids(row.data) & question_ids)
+        if count:
+            skipped_by.setdefault(count, []).append(row.user_id)
+    for count, users in skipped_by.items():
+        for start in range(0, len(users), 500):
+            rows.filter(user__in=users[start:start + 500]).update(
+                skipped=Greatest(F("skipped") + delta * count, 0)
+            )
+
+
+def set_questions_visible(survey, question_ids, visible):
+    """Show or hide questions of ``survey`` with one UPDATE.
+
+    Participation counts and the catalog version are updated once. Returns
+    ``(pk, text)`` pairs of the questions whose visibility changed.
+    """
+    with transaction.atomic():
+        changed = list(
+            survey.questions.select_for_update()
+            .filter(pk__in=question_ids, visible=not visible)
+            .order_by("pk")
+            .values_list("pk", "text")
+        )
+        if not changed:
+            return []
+        ids = [pk for pk, text in changed]
+        Question.objects.filter(pk__in=ids).update(visible=visible)
+        adjust_questions_participation(survey.pk, ids, 1 if visible else -1)
+        bump_catalog_version(survey.pk)
+    return changed
+
+
+def delete_questions(questions):
+    """Delete unanswered ``questions`` and drop them from the skip sets.
+
+    Answers protect their question, so answered questions raise
+    ``ProtectedError`` and nothing is changed.
+    """
+    questions = Question.objects.filter(pk__in=[q.pk for q in questions])
+    survey_ids = set(questions.values_list("survey_id", flat=True))
+    with transaction.atomic():
+        discard_skips(questions.values_list("pk", flat=True))
+        questions.delete()
+        for survey_id in survey_ids:
+            bump_catalog_version(survey_id)
+
+
+def rebuild_participation(survey):
+    """Recompute all participation rows of a survey from answers and skips."""
+    counts = {}
+    answered = (
+        Answer.objects.filter(question__survey=survey, question__visible=True)
+        .values("user")
+        .annotate(
+            count=Count("id"),
+            agreed=Count("id", filter=Q(answer=F("question__majority"))),
+            disagreed=Count(
+                "id",
+                filter=~Q(question__majority="")
+                & ~Q(answer=F("question__majority")),
+            ),
+        )
+    )
+    for row in answered:
+        counts[row["user"]] = [row["count"], 0, row["agreed"], row["disagreed"]]
+    visible = set(
+        survey.questions.filter(visible=True).values_list("pk", flat=True)
+    )
+    for row in _skip_sets(survey.pk):
+        skipped = len(unpack_ids(row.data) & visible)
+        if skipped:
+            counts.setdefault(row.user_id, [0, 0, 0, 0])[1] = skipped
+    with transaction.atomic():
+        Participation.objects.filter(survey=survey).delete()
+        Participation.objects.bulk_create(
+            Participation(
+                survey=survey,
+                user_id=user_id,
+                answered=a,
+                skipped=sk,
+                agreed=ag,
+                disagreed=dis,
+            )
+            for user_id, (a, sk, ag, dis) in counts.items()
+        )
+
+
+def majority_of(yes, total):
+    """Return the stored ``majority`` of a question with these tallies."""
+    if yes * 2 > total:
+        return "yes"
+    if yes * 2 < total:
+        return "no"
+    return ""
+
+
+def _derived_tallies(yes, total):
+    """Return ``agree_ratio`` and ``majority`` expressions of the tallies."""
+    no = total - yes
+    return {
+        "agree_ratio": Case(
+            When(Exact(total, 0), then=0),
+            default=Round(
+                Greatest(yes, no) * 100.0 / total,
+                output_field=models.IntegerField(),
+            ),
+        ),
+        "majority": Case(
+            When(GreaterThan(yes, no), then=Value("yes")),
+            When(LessThan(yes, no), then=Value("no")),
+            default=Value(""),
+        ),
+    }
+
+
+def change_question_tallies(question_id, old_answer, new_answer):
+    """Move one user's answer from ``old_answer`` to ``new_answer`` in the tallies.
+
+    Either answer may be ``None``. Unlike ``refresh_question_tallies`` the
+    answers are not counted: the counters change by one in a single UPDATE
+    and the result is read back. Agreement counts are shifted when the
+    majority of a visible question flips. Returns the question's
+    ``(yes_count, answer_count)`` afterwards.
+    """
+    yes_delta = (new_answer == "yes") - (old_answer == "yes")
+    total_delta = bool(new_answer) - bool(old_answer)
+    questions = Question.objects.filter(pk=question_id)
+    if yes_delta or total_delta:
+        yes = F("yes_count") + yes_delta
+        total = F("answer_count") + total_delta
+        questions.update(
+            yes_count=yes, answer_count=total, **_derived_tallies(yes, total)
+        )
+    survey_id, visible, yes, total, majority = questions.values_list(
+        "survey_id", "visible", "yes_count", "answer_count", "majority"
+    ).get()
+    before = majority_of(yes - yes_delta, total - total_delta)
+    if visible and before != majority:
+        shift_agreement([(question_id, survey_id, before, majority)])
+    return yes, total
+
+
+def refresh_question_tallies(questions):
+    """Recompute the stored answer tallies of ``questions``.
+
+    ``questions`` is a queryset or a list of question ids. Agreement counts
+    are shifted for visible questions whose majority changes.
+    """
+    visible = Question.objects.filter(pk__in=questions, visible=True)
+    before = dict(visible.values_list("pk", "majority"))
+    answers = Answer.objects.filter(question=OuterRef("pk")).order_by()
+    Question.objects.filter(pk__in=questions).update(
+        answer_count=Coalesce(
+            Subquery(
+                answers.values("question").annotate(c=Count("pk")).values("c")
+            ),
+            0,
+        ),
+        yes_count=Coalesce(
+            Subquery(
+                answers.filter(answer="yes")
+                .values("question")
+                .annotate(c=Count("pk"))
+                .values("c")
+            ),
+            0,
+        ),
+    )
+    Question.objects.filter(pk__in=questions).update(
+        **_derived_tallies(F("yes_count"), F("answer_count"))
+    )
+    shift_agreement(
+        (pk, survey_id, before[pk], majority)
+        for pk, survey_id, majority in visible.values_list(
+            "pk", "survey_id", "majority"
+        )
+        if before.get(pk, majority) != majority
+    )
+
+
+def record_answer(user, question, answer_value):
+    """Store an answer and drop a pending skip of the same question.
+
+    Returns the ids of the questions the user has still skipped in the
+    survey, like :func:`skip_question`.
+    """
+    with transaction.atomic():
+        answer = (
+            Answer.objects.select_for_update()
+            .filter(user=user, question=question)
+            .first()
+        )
+        if answer is None:
+            answer = Answer.objects.create(
+                user=user, question=question, answer=answer_value
+            )
+            log_answer_event(user.pk, question, AnswerEvent.ANSWER, answer_value)
+        elif answer.answer != answer_value:
+            answer.answer = answer_value
+            answer.save(update_fields=["answer"])
+            log_answer_event(user.pk, question, AnswerEvent.CHANGE, answer_value)
+        row = (
+            SkipSet.objects.select_for_update()
+            .filter(survey_id=question.survey_id, user=user)
+            .first()
+        )
+        if row is None:
+            return set()
+        ids = unpack_ids(row.data)
+        if question.pk in ids:
+            ids.discard(question.pk)
+            row.data = pack_ids(ids)
+            row.save(update_fields=["data"])
+            if question.visible:
+                adjust_participation(question.survey_id, user.pk, skipped=-1)
+    return ids
+
+
+def remove_answer(answer):
+    """Delete an answer and update the participation counts."""
+    question = answer.question
+    with transaction.atomic():
+        answer.delete()
+        log_answer_event(answer.user_id, question, AnswerEvent.RETRACT)
+        if question.visible:
+            adjust_participation(
+                question.survey_id,
+                answer.user_id,
+                answered=-1,
+                **agreement_change(question.pk, answer.answer, None),
+            )
+        change_question_tallies(question.pk, answer.answer, None)
+        bump_data_version(question.survey_id)
+
+
+def get_skipped_ids(user, survey):
+    """Return the ids of the questions the user has skipped in the survey."""
+    data = (
+        SkipSet.objects.filter(survey=survey, user=user)
+        .values_list("data", flat=True)
+        .first()
+    )
+    return unpack_ids(data) if data else set()
+
+
+def skip_question(user, question):
+    """Add ``question`` to the user's skipped questions.
+
+    Returns the ids of all questions the user has skipped in the survey.
+    """
+    with transaction.atomic():
+        row, _ = SkipSet.objects.select_for_update().get_or_create(
+            survey_id=question.survey_id, user=user
+        )
+        ids = unpack_ids(row.data)
+        if question.pk in ids:
+            return ids
+        ids.add(question.pk)
+        row.data = pack_ids(ids)
+        row.save(update_fields=["data"])
+        log_answer_event(user.pk, question, AnswerEvent.SKIP)
+        if question.visible:
+            adjust_participation(question.survey_id, user.pk, skipped=1)
+    return ids
+
+
+def clear_skips(user, survey):
+    """Empty the user's skips in the survey and return how many there were."""
+    cleared = len(get_skipped_ids(user, survey))
+    if cleared:
+        SkipSet.objects.filter(survey=survey, user=user).update(data=b"")
+        Participation.objects.filter(survey=survey, user=user).update(skipped=0)
+    return cleared
+
+
+def discard_skips(question_ids):
+    """Remove questions from every skip set before the questions are deleted.
+
+    Skip counts are decremented for the visible ones.
+    """
+    questions = Question.objects.filter(pk__in=question_ids)
+    removed = set(questions.values_list("pk", flat=True))
+    visible = set(questions.filter(visible=True).values_list("pk", flat=True))
+    survey_ids = set(questions.values_list("survey_id", flat=True))
+    for survey_id in survey_ids:
+        for row in list(_skip_sets(survey_id)):
+            ids = unpack_ids(row.data)
+            if not ids & removed:
+                continue
+            row.data = pack_ids(ids - removed)
+            row.save(update_fields=["data"])
+            dropped = len(ids & visible)
+            if dropped:
+                adjust_participation(survey_id, row.user_id, skipped=-dropped)
+
+
+def _skip_sets(survey_id):
+    return (
+        SkipSet.objects.filter(survey_id=survey_id)
+        .exclude(data=b"")
+        .only("user_id", "survey_id", "data")
+        .iterator()
+    )
+
+
+def get_participant_counts(survey, question_count):
+    """Return respondent total and users who answered every visible question.
+
+    Both come from ``Participation``, which counts answers to visible
+    questions only. A user whose answers are all on hidden questions is not
+    a respondent.
+    """
+    participants = Participation.objects.filter(survey=survey, answered__gt=0)
+    total_users = participants.count()
+    full_users = (
+        participants.filter(answered=question_count).count() if question_count else 0
+    )
+    return total_users, full_users
+
+
 class SurveyLog(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     data = models.JSONField()
 
 
+def new_job_token():
+    return secrets.token_urlsafe(32)
+
+
+class Job(models.Model):
+    """Background job stored in the database and run by ``run_jobs``.
+
+    ``token`` is part of the job's status URL. It lets the requester poll a
+    job that no longer has a user, for example after deleting the account.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, _("Queued")),
+        (RUNNING, _("Running")),
+        (DONE, _("Done")),
+        (FAILED, _("Failed")),
+    ]
+    name = models.CharField(max_length=100)
+    params = models.JSONField(default=dict, blank=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="jobs",
+    )
+    token = models.CharField(max_length=43, default=new_job_token, editable=False)
+    status = models.CharField(
+        max_length=7, choices=STATUS_CHOICES, default=QUEUED
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
 def log_survey_action(user, survey, action, **extra):
     """Store survey edit actions in a JSON based log."""
+    SurveyLog.objects.create(data=survey_log_entry(user, survey, action, **extra))
+
+
+def survey_log_entry(user, survey, action, **extra):
+    """Return the ``SurveyLog`` data of a survey edit action."""
     entry = {
         "action": action,
         "user_id": getattr(user, "id", None),
@@ -95,4 +866,4 @@ def log_survey_action(user, survey, action, **extra):
         "survey_state": getattr(survey, "state", ""),
     }
     entry.update(extra)
-    SurveyLog.objects.create(data=entry)
+    return entry
@@ -0,0 +1,48 @@
+"""Survey editor checks that do not query the database on every call.
+
+The secretary ids of a survey are loaded once per catalog version and kept
+in process memory. Changing the secretaries bumps the catalog version, so
+every process sees the change on its next lookup.
+"""
+import threading
+
+# (survey pk, catalog version) -> frozenset of secretary user ids
+_secretaries = {}
+# Guards changes to _secretaries; lookups read it without locking
+_lock = threading.Lock()
+
+
+def secretary_ids(survey):
+    """Return the ids of the survey's secretaries as a frozenset."""
+    key = (survey.pk, survey.catalog_version)
+    ids = _secretaries.get(key)
+    if ids is None:
+        ids = frozenset(survey.secretaries.values_list("pk", flat=True))
+        with _lock:
+            _forget(survey.pk)
+            _secretaries[key] = ids
+    return ids
+
+
+def _forget(survey_id):
+    # Callers hold _lock
+    for key in list(_secretaries):
+        if survey_id is None or key[0] == survey_id:
+            _secretaries.pop(key, None)
+
+
+def forget_secretaries(survey_id=None):
+    """Drop loaded secretary ids of one survey, or of all surveys."""
+    with _lock:
+        _forget(survey_id)
+
+
+def can_edit_survey(user, survey):
+    """Return whether ``user`` may edit ``survey``."""
+    if not user.is_authenticated:
+        return False
+    return (
+        user.pk == survey.creator_id
+        or user.is_superuser
+        or user.pk in secretary_ids(survey)
+    )
@@ -0,0 +1,153 @@
+"""Offline publication of survey results as wikitext and JSON files.
+
+``publish_results`` streams the result rows of the visible questions into
+page-sized wikitext tables and a JSON file. The rows of the previous run are
+kept in a snapshot file, so each run also writes a diff of the changed and
+removed rows and only rewrites the pages whose text changed.
+"""
+import json
+from itertools import islice
+from pathlib import Path
+
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.translation import gettext
+
+from .models import get_participant_counts
+from .stats import EMPTY_RESULT, get_question_results
+
+SNAPSHOT_FILE = "snapshot.json"
+RESULTS_FILE = "results.json"
+DIFF_JSON_FILE = "diff.json"
+DIFF_WIKI_FILE = "diff.wiki"
+PAGE_FILE = "table-{:04d}.wiki"
+
+# Rows per wikitext table page
+DEFAULT_PAGE_SIZE = 500
+
+
+def iter_result_rows(survey, chunk_size=2000):
+    """Yield result rows of the survey's visible questions in id order.
+
+    Rows have the shape the wikitext table template expects.
+    """
+    results = get_question_results(survey)
+    questions = (
+        survey.questions.filter(visible=True)
+        .order_by("pk")
+        .values_list("pk", "text", "created_at")
+        .iterator(chunk_size=chunk_size)
+    )
+    for pk, text, created_at in questions:
+        yield {
+            "question": {"pk": pk, "text": text},
+            "published": created_at,
+            **results.get(pk, EMPTY_RESULT),
+        }
+
+
+def json_row(row):
+    """Return the JSON export form of a result row."""
+    return {
+        "id": row["question"]["pk"],
+        **{k: v for k, v in row.items() if k != "question"},
+        "question": row["question"]["text"],
+        "published": row["published"].isoformat(),
+    }
+
+
+def _read_snapshot(path):
+    if not path.exists():
+        return {}
+    with path.open(encoding="utf-8") as f:
+        return {int(pk): row for pk, row in json.load(f).items()}
+
+
+def _write_if_changed(path, text):
+    if path.exists() and path.read_text(encoding="utf-8") == text:
+        return False
+    path.write_text(text, encoding="utf-8")
+    return True
+
+
+def publish_results(survey, output_dir, page_size=DEFAULT_PAGE_SIZE):
+    """Write the results of ``survey`` to ``output_dir``.
+
+    Returns a dict with the number of ``rows``, ``changed`` and ``removed``
+    rows compared to the previous snapshot, ``pages`` and ``pages_written``.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    snapshot_path = output_dir / SNAPSHOT_FILE
+    previous = _read_snapshot(snapshot_path)
+
+    question_count = survey.questions.filter(visible=True).count()
+    total_users, full_users = get_participant_counts(survey, question_count)
+    generated_at = timezone.localtime()
+    table = get_template("survey/wikitext_table.txt")
+    context = {
+        "yes_label": gettext("Yes"),
+        "no_label": gettext("No"),
+        "include_personal": False,
+    }
+
+    current = {}
+    changed = []
+    pages = pages_written = 0
+    rows = iter_result_rows(survey)
+    with (output_dir / RESULTS_FILE).open("w", encoding="utf-8") as results:
+        header = {
+            "survey": {"title": survey.title, "description": survey.description},
+            "generated_at": generated_at.isoformat(),
+            "total_users": total_users,
+            "full_users": full_users,
+        }
+        # The header object is left open for the streamed data list
+        results.write(json.dumps(header, ensure_ascii=False)[:-1] + ', "data": [')
+        while page := list(islice(rows, page_size)):
+            pages += 1
+            text = table.render({**context, "rows": page})
+            pages_written += _write_if_changed(
+                output_dir / PAGE_FILE.format(pages), text
+            )
+            for row in page:
+                item = json_row(row)
+                if current:
+                    results.write(",")
+                results.write("\n" + json.dumps(item, ensure_ascii=False))
+                current[item["id"]] = item
+                if previous.get(item["id"]) != item:
+                    changed.append(row)
+        results.write("\n]}\n")
+
+    # Pages left over from a longer table
+    stale = pages + 1
+    while (output_dir / PAGE_FILE.format(stale)).exists():
+        (output_dir / PAGE_FILE.format(stale)).unlink()
+        stale += 1
+
+    removed = sorted(previous.keys() - current.keys())
+    with (output_dir / DIFF_JSON_FILE).open("w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "generated_at": generated_at.isoformat(),
+                "changed": [json_row(row) for row in changed],
+                "removed": removed,
+            },
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    (output_dir / DIFF_WIKI_FILE).write_text(
+        table.render({**context, "rows": changed}) if changed else "",
+        encoding="utf-8",
+    )
+    with snapshot_path.open("w", encoding="utf-8") as f:
+        json.dump(current, f, ensure_ascii=False)
+    return {
+        "rows": len(current),
+        "changed": len(changed),
+        "removed": len(removed),
+        "pages": pages,
+        "pages_written": pages_written,
+    }
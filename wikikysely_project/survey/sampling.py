@@ -0,0 +1,211 @@
+"""Strategies for picking the next question to answer.
+
+``answer_survey`` asks the sampler named in ``SURVEY_QUESTION_SAMPLER`` for
+a question. ``UniformSampler`` picks uniformly at random.
+``AdaptiveSampler`` favours questions whose result is still uncertain,
+measured by the width of the Wilson interval of the yes share, and
+questions added recently. Its weights live in a Fenwick tree so a pick and
+a weight update both take O(log n).
+"""
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Question
+from .stats import wilson_interval
+
+DEFAULT_SAMPLER = "wikikysely_project.survey.sampling.AdaptiveSampler"
+
+# Every question keeps at least this weight so settled questions still
+# get answers.
+MIN_WEIGHT = 0.05
+# New questions get up to this much extra weight, halving every
+# NEW_QUESTION_HALF_LIFE days.
+NEW_QUESTION_BOOST = 1.0
+NEW_QUESTION_HALF_LIFE = 3.0
+
+
+def question_weight(yes, total, age_days):
+    """Return the sampling weight of a question with the given tally."""
+    low, high = wilson_interval(yes, total)
+    freshness = 1 + NEW_QUESTION_BOOST * 0.5 ** (age_days / NEW_QUESTION_HALF_LIFE)
+    return MIN_WEIGHT + (high - low) * freshness
+
+
+class FenwickTree:
+    """Prefix sums over non-negative weights for weighted random picks."""
+
+    def __init__(self, weights=()):
+        self._weights = list(weights)
+        self._tree = [0.0] + self._weights
+        n = len(self._weights)
+        for i in range(1, n + 1):
+            parent = i + (i & -i)
+            if parent <= n:
+                self._tree[parent] += self._tree[i]
+
+    def __len__(self):
+        return len(self._weights)
+
+    def __getitem__(self, index):
+        return self._weights[index]
+
+    def __setitem__(self, index, weight):
+        delta = weight - self._weights[index]
+        self._weights[index] = weight
+        i = index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+
+    def append(self, weight):
+        self._weights.append(0.0)
+        i = len(self._weights)
+        # The new node covers the range (i - lowbit(i), i]
+        self._tree.append(sum(self._weights[i - (i & -i) : i]))
+        self[i - 1] = weight
+
+    def total(self):
+        total = 0.0
+        i = len(self._weights)
+        while i:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def find(self, value):
+        """Return the index whose cumulative weight range contains ``value``."""
+        position = 0
+        step = 1 << (len(self._weights).bit_length() - 1) if self._weights else 0
+        while step:
+            following = position + step
+            if following < len(self._tree) and self._tree[following] <= value:
+                position = following
+                value -= self._tree[following]
+            step >>= 1
+        return min(position, len(self._weights) - 1)
+
+    def pick(self, rng=random):
+        """Return a random index with probability proportional to its weight."""
+        return self.find(rng.random() * self.total())
+
+
+class UniformSampler:
+    """Pick any remaining question with equal probability."""
+
+    def pick(self, survey, exclude=()):
+        ids = list(
+            survey.questions.filter(visible=True)
+            .exclude(pk__in=exclude)
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+        return random.choice(ids) if ids else None
+
+    def tally_changed(self, question, yes=None, total=None):
+        pass
+
+
+class AdaptiveSampler:
+    """Pick questions in proportion to :func:`question_weight`.
+
+    The weights of one survey are kept in process memory. A pick draws from
+    the whole survey and redraws when the result is excluded; only when
+    that keeps failing are the remaining questions weighed one by one. The
+    tree is built from the stored question tallies and rebuilt when the
+    survey's questions change and every ``REBUILD_INTERVAL`` seconds so
+    ages and changes made by other processes are picked up.
+    """
+
+    REBUILD_INTERVAL = 300
+    MAX_REDRAWS = 32
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.survey_id = None
+        self._version = None
+        self._built_at = 0.0
+        self._ids = []
+        self._positions = {}
+        self._created = []
+        self._tree = FenwickTree()
+
+    def _rebuild(self, survey):
+        now = timezone.now()
+        rows = survey.questions.filter(visible=True).order_by("pk").values_list(
+            "pk", "created_at", "yes_count", "answer_count"
+        )
+        self._ids, self._created, weights = [], [], []
+        for pk, created_at, yes, total in rows:
+            self._ids.append(pk)
+            self._created.append(created_at)
+            weights.append(question_weight(yes, total, _age_days(now, created_at)))
+        self._positions = {pk: i for i, pk in enumerate(self._ids)}
+        self._tree = FenwickTree(weights)
+        self.survey_id = survey.pk
+        self._version = survey.catalog_version
+        self._built_at = time.monotonic()
+
+    def _ensure_current(self, survey):
+        if (
+            (self.survey_id, self._version) != (survey.pk, survey.catalog_version)
+            or time.monotonic() - self._built_at > self.REBUILD_INTERVAL
+        ):
+            self._rebuild(survey)
+
+    def tally_changed(self, question, yes=None, total=None):
+        """Recompute the weight of ``question`` after its answers changed.
+
+        ``yes`` and ``total`` are the new tallies; they are read when not
+        given because the instance may predate the change.
+        """
+        if question.survey_id != self.survey_id:
+            return
+        if yes is None or total is None:
+            yes, total = Question.objects.values_list(
+                "yes_count", "answer_count"
+            ).get(pk=question.pk)
+        with self._lock:
+            index = self._positions.get(question.pk)
+            if index is not None:
+                age = _age_days(timezone.now(), self._created[index])
+                self._tree[index] = question_weight(yes, total, age)
+
+    def pick(self, survey, exclude=()):
+        exclude = set(exclude)
+        with self._lock:
+            self._ensure_current(survey)
+            if not self._ids:
+                return None
+            for _ in range(self.MAX_REDRAWS):
+                pk = self._ids[self._tree.pick()]
+                if pk not in exclude:
+                    return pk
+            candidates = [
+                i for i, pk in enumerate(self._ids) if pk not in exclude
+            ]
+            if not candidates:
+                return None
+            weights = [self._tree[i] for i in candidates]
+            return self._ids[random.choices(candidates, weights)[0]]
+
+
+def _age_days(now, created_at):
+    return max(0.0, (now - created_at).total_seconds() / 86400)
+
+
+_samplers = {}
+_samplers_lock = threading.Lock()
+
+
+def get_sampler():
+    """Return the shared instance of the configured sampler."""
+    path = getattr(settings, "SURVEY_QUESTION_SAMPLER", DEFAULT_SAMPLER)
+    with _samplers_lock:
+        if path not in _samplers:
+            _samplers[path] = import_string(path)()
+        return _samplers[path]
@@ -0,0 +1,155 @@
+"""Full-text search over question texts.
+
+On SQLite an FTS5 table mirrors ``Question.text``. It is an external
+content table, so the text is stored only once, and triggers keep it in
+sync with every insert, update and delete, including bulk queryset
+operations. Other databases, or SQLite builds without FTS5, fall back to a
+case-insensitive substring search.
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connection, connections
+from django.db.models import Count, OuterRef, Q, Subquery
+
+from .models import Answer, Question
+
+FTS_TABLE = "survey_question_fts"
+
+_TOKEN = re.compile(r"\w+")
+
+
+def _statements():
+    table = Question._meta.db_table
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        f"text, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+        f"VALUES ('delete', old.id, old.text); END",
+        f"CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF text ON {table} "
+        f"BEGIN "
+        f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, text) "
+        f"VALUES ('delete', old.id, old.text); "
+        f"INSERT INTO {FTS_TABLE}(rowid, text) VALUES (new.id, new.text); END",
+    ]
+
+
+def ensure_search_index(using=DEFAULT_DB_ALIAS):
+    """Create the FTS5 table and its triggers if missing and fill the table.
+
+    Returns ``False`` when full-text search is not available.
+    """
+    db = connections[using]
+    if db.vendor != "sqlite":
+        return False
+    try:
+        with db.cursor() as cursor:
+            existed = FTS_TABLE in db.introspection.table_names(cursor)
+            for statement in _statements():
+                cursor.execute(statement)
+            if not existed:
+                cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    except OperationalError:
+        return False
+    return True
+
+
+def _fts_query(text):
+    """Turn user input into an FTS5 query matching all words.
+
+    Every word is quoted so FTS5 operators in the input are ignored, and the
+    last word is matched as a prefix so results follow typing.
+    """
+    tokens = _TOKEN.findall(text)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _ranked_ids(survey, text, offset, limit):
+    """Return ``(count, ids)`` of matching visible questions, best first."""
+    query = _fts_query(text)
+    if query is None:
+        return 0, []
+    table = Question._meta.db_table
+    where = (
+        f"FROM {FTS_TABLE} JOIN {table} q ON q.id = {FTS_TABLE}.rowid "
+        f"WHERE {FTS_TABLE} MATCH %s AND q.survey_id = %s AND q.visible"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) {where}", [query, survey.pk])
+        (count,) = cursor.fetchone()
+        cursor.execute(
+            f"SELECT q.id {where} ORDER BY {FTS_TABLE}.rank, q.id LIMIT %s OFFSET %s",
+            [query, survey.pk, limit, offset],
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+    return count, ids
+
+
+def _substring_ids(survey, text, offset, limit):
+    questions = survey.questions.filter(visible=True)
+    for token in _TOKEN.findall(text) or [text]:
+        questions = questions.filter(text__icontains=token)
+    count = questions.count()
+    ids = list(
+        questions.order_by("pk").values_list("pk", flat=True)[offset : offset + limit]
+    )
+    return count, ids
+
+
+# Later pages are empty anyway; keeps the row offset a database integer
+MAX_PAGE = 10**6
+
+
+def search_questions(survey, text, user=None, page=1, per_page=20):
+    """Return a page of questions matching ``text``.
+
+    The result is a dict with ``results``, ``count``, ``page`` and
+    ``has_next``. Each result has the question's ``id``, ``text``, ``yes``,
+    ``no`` and ``total`` tallies and the user's own ``answer``, if any.
+    Pages after ``MAX_PAGE`` are returned as ``MAX_PAGE``.
+    """
+    page = min(page, MAX_PAGE)
+    offset = (page - 1) * per_page
+    try:
+        if connection.vendor != "sqlite":
+            raise OperationalError("FTS5 requires SQLite")
+        count, ids = _ranked_ids(survey, text, offset, per_page)
+    except OperationalError:
+        count, ids = _substring_ids(survey, text, offset, per_page)
+    questions = Question.objects.filter(pk__in=ids).annotate(
+        yes=Count("answers", filter=Q(answers__answer="yes")),
+        no=Count("answers", filter=Q(answers__answer="no")),
+    )
+    if user is not None and user.is_authenticated:
+        questions = questions.annotate(
+            my_answer=Subquery(
+                Answer.objects.filter(question=OuterRef("pk"), user=user).values(
+                    "answer"
+                )[:1]
+            )
+        )
+    rows = {q.pk: q for q in questions}
+    results = [
+        {
+            "id": pk,
+            "text": rows[pk].text,
+            "yes": rows[pk].yes,
+            "no": rows[pk].no,
+            "total": rows[pk].yes + rows[pk].no,
+            "answer": getattr(rows[pk], "my_answer", None),
+        }
+        for pk in ids
+        if pk in rows
+    ]
+    return {
+        "results": results,
+        "count": count,
+        "page": page,
+        "has_next": offset + len(ids) < count,
+    }
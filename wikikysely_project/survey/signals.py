@@ -0,0 +1,82 @@
+from django.db.models.signals import m2m_changed, post_save
+from django.dispatch import receiver
+
+from .activity import record_activity
+from .models import (
+    Answer,
+    Question,
+    Survey,
+    adjust_participation,
+    adjust_question_participation,
+    agreement_change,
+    bump_catalog_version,
+    bump_data_version,
+    change_question_tallies,
+)
+from .permissions import forget_secretaries
+from .sampling import get_sampler
+from .similarity import question_index
+
+
+@receiver(post_save, sender=Answer)
+def count_new_answer(sender, instance, created, **kwargs):
+    """Keep participation, tallies and activity current when answers change."""
+    old_answer = None if created else getattr(instance, "_loaded_answer", None)
+    changes = {}
+    if old_answer != instance.answer:
+        # Before the tallies and so the stored majority are refreshed
+        changes = agreement_change(instance.question_id, old_answer, instance.answer)
+    instance._loaded_answer = instance.answer
+    if created and instance.question.visible:
+        changes["answered"] = 1
+    adjust_participation(
+        instance.question.survey_id, instance.user_id, **changes
+    )
+    if created:
+        survey_id = instance.question.survey_id
+        first = not Answer.objects.filter(
+            user_id=instance.user_id, question__survey_id=survey_id
+        ).exclude(pk=instance.pk).exists()
+        record_activity(
+            survey_id, instance.created_at, answers=1, participants=int(first)
+        )
+    if old_answer != instance.answer:
+        yes, total = change_question_tallies(
+            instance.question_id, old_answer, instance.answer
+        )
+        get_sampler().tally_changed(instance.question, yes, total)
+    bump_data_version(instance.question.survey_id)
+
+
+@receiver(post_save, sender=Question)
+def question_changed(sender, instance, created, **kwargs):
+    """Invalidate cached results when questions are added, edited or hidden."""
+    if created:
+        record_activity(instance.survey_id, instance.created_at, questions=1)
+    elif getattr(instance, "_loaded_visible", instance.visible) != instance.visible:
+        # Hidden or shown with save(), e.g. from the admin
+        adjust_question_participation(instance, 1 if instance.visible else -1)
+    instance._loaded_visible = instance.visible
+    bump_catalog_version(instance.survey_id)
+    if question_index.survey_id == instance.survey_id:
+        version = Survey.objects.values_list("catalog_version", flat=True).get(
+            pk=instance.survey_id
+        )
+        question_index.question_changed(instance, version)
+
+
+@receiver(m2m_changed, sender=Survey.secretaries.through)
+def secretaries_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate loaded secretary ids when secretaries are added or removed."""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        survey_ids = [instance.pk]
+    elif pk_set is not None:
+        survey_ids = list(pk_set)
+    else:
+        # A cleared user side does not report which surveys it touched
+        survey_ids = [None]
+    for survey_id in survey_ids:
+        bump_catalog_version(survey_id)
+        forget_secretaries(survey_id)
@@ -0,0 +1,176 @@
+"""Trigram index for finding questions similar to a given text.
+
+Texts are split into words and every word is padded with a space on both
+sides and cut into overlapping three character grams.
+Similarity is the Jaccard index of two gram sets. The index lives in process
+memory and keeps an inverted list from each gram to the questions containing
+it, so a lookup only touches questions that share at least one gram with
+the query. It is tied to ``Survey.catalog_version`` and rebuilt whenever
+another process has changed the survey's questions.
+"""
+from collections import Counter, defaultdict
+import heapq
+from itertools import chain
+import math
+import re
+import threading
+
+from django.db.models import Count, Q
+
+
+# Questions at least this similar are shown as suggestions while typing.
+SUGGEST_THRESHOLD = 0.3
+# Questions at least this similar must be confirmed before saving.
+NEAR_DUPLICATE_THRESHOLD = 0.6
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize(text):
+    """Return ``text`` case folded with punctuation and extra spaces removed."""
+    return " ".join(_WORD.findall(text.casefold()))
+
+
+def trigrams(text):
+    """Return the set of word trigrams of ``text``."""
+    grams = set()
+    for word in normalize(text).split():
+        padded = f" {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class QuestionIndex:
+    """Inverted trigram index over the visible questions of one survey."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.survey_id = None
+        self.version = None
+        self._postings = defaultdict(set)
+        self._grams = {}
+        self._texts = {}
+
+    def _add(self, pk, text):
+        self._remove(pk)
+        grams = trigrams(text)
+        self._grams[pk] = grams
+        self._texts[pk] = normalize(text)
+        for gram in grams:
+            self._postings[gram].add(pk)
+
+    def _remove(self, pk):
+        for gram in self._grams.pop(pk, ()):
+            postings = self._postings[gram]
+            postings.discard(pk)
+            if not postings:
+                del self._postings[gram]
+        self._texts.pop(pk, None)
+
+    def _rebuild(self, survey):
+        self._postings = defaultdict(set)
+        self._grams = {}
+        self._texts = {}
+        rows = survey.questions.filter(visible=True).values_list("pk", "text")
+        for pk, text in rows.iterator():
+            self._add(pk, text)
+        self.survey_id = survey.pk
+        self.version = survey.catalog_version
+
+    def _ensure_current(self, survey):
+        if (self.survey_id, self.version) != (survey.pk, survey.catalog_version):
+            self._rebuild(survey)
+
+    def warm(self, survey):
+        """Build the index for ``survey`` now unless it is current."""
+        with self._lock:
+            self._ensure_current(survey)
+
+    def question_changed(self, question, version):
+        """Apply a saved question to the index.
+
+        ``version`` is the survey's catalog version after the change. If the
+        index has missed other changes it is left stale and rebuilt on the
+        next lookup.
+        """
+        with self._lock:
+            if self.survey_id != question.survey_id or self.version != version - 1:
+                return
+            if question.visible:
+                self._add(question.pk, question.text)
+            else:
+                self._remove(question.pk)
+            self.version = version
+
+    def find_exact(self, survey, text, exclude=None):
+        """Return the pk of a visible question with the same normalized text."""
+        target = normalize(text)
+        grams = trigrams(text)
+        if not grams:
+            return None
+        with self._lock:
+            self._ensure_current(survey)
+            rarest = min(grams, key=lambda g: len(self._postings.get(g, ())))
+            for pk in self._postings.get(rarest, ()):
+                if pk != exclude and self._texts[pk] == target:
+                    return pk
+        return None
+
+    def search(self, survey, text, limit=5, threshold=SUGGEST_THRESHOLD, exclude=None):
+        """Return up to ``limit`` ``(score, pk)`` pairs, most similar first."""
+        grams = trigrams(text)
+        if not grams:
+            return []
+        with self._lock:
+            self._ensure_current(survey)
+            # Jaccard >= threshold implies sharing at least this many grams
+            needed = math.ceil(threshold * len(grams))
+            shared = Counter(
+                chain.from_iterable(self._postings.get(g, ()) for g in grams)
+            )
+            shared.pop(exclude, None)
+            scored = [
+                (count / (len(grams) + len(self._grams[pk]) - count), pk)
+                for pk, count in shared.items()
+                if count >= needed
+            ]
+            scored = [item for item in scored if item[0] >= threshold]
+        return heapq.nlargest(limit, scored)
+
+
+question_index = QuestionIndex()
+
+
+def similar_questions(survey, text, limit=5, threshold=SUGGEST_THRESHOLD, exclude=None):
+    """Return similar visible questions with their answer tallies.
+
+    Each item is a dict with ``id``, ``text``, ``score``, ``yes``, ``no`` and
+    ``total``. Tallies for all matches are fetched with a single query.
+    """
+    matches = question_index.search(
+        survey, text, limit=limit, threshold=threshold, exclude=exclude
+    )
+    if not matches:
+        return []
+    ids = [pk for _, pk in matches]
+    rows = {
+        row["pk"]: row
+        for row in survey.questions.filter(pk__in=ids)
+        .annotate(
+            yes=Count("answers", filter=Q(answers__answer="yes")),
+            no=Count("answers", filter=Q(answers__answer="no")),
+        )
+        .values("pk", "text", "yes", "no")
+    }
+    return [
+        {
+            "id": pk,
+            "text": rows[pk]["text"],
+            "score": round(score, 3),
+            "yes": rows[pk]["yes"],
+            "no": rows[pk]["no"],
+            "total": rows[pk]["yes"] + rows[pk]["no"],
+        }
+        for score, pk in matches
+        if pk in rows
+    ]
@@ -0,0 +1,154 @@
+"""Statistics helpers for answer tallies."""
+import math
+
+from django.core.cache import cache
+from django.db.models import Count, FloatField, Q, Value
+from django.db.models.functions import Coalesce, Greatest, NullIf, Sqrt
+import numpy as np
+
+# Normal quantile for a 95 % confidence level
+Z_95 = 1.959964
+
+# How long question results are cached, in seconds. The key contains the
+# survey data version so stale results are never served.
+RESULTS_CACHE_TIMEOUT = 60 * 60
+
+# Result of a question that has no answers
+EMPTY_RESULT = {
+    "yes": 0,
+    "no": 0,
+    "total": 0,
+    "agree_ratio": 0,
+    "yes_low": 0.0,
+    "yes_high": 100.0,
+    "agree_low": 0.0,
+}
+
+
+def wilson_interval(yes, total, z=Z_95):
+    """Return the Wilson score interval ``(low, high)`` for a yes share.
+
+    Without answers the interval covers everything, ``(0.0, 1.0)``.
+    """
+    if not total:
+        return 0.0, 1.0
+    share = yes / total
+    z2 = z * z
+    denominator = 1 + z2 / total
+    centre = (share + z2 / (2 * total)) / denominator
+    half = z * math.sqrt(share * (1 - share) / total + z2 / (4 * total * total))
+    half /= denominator
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def wilson_low_expression(yes, total, z=Z_95):
+    """Return a database expression for the Wilson lower bound in percent.
+
+    ``yes`` and ``total`` are expressions. Without answers the bound is 0.
+    """
+    n = NullIf(total, 0) * 1.0
+    share = yes / n
+    z2 = z * z
+    low = (
+        share
+        + z2 / (2 * n)
+        - z * Sqrt(share * (1 - share) / n + z2 / (4 * n * n))
+    ) / (1 + z2 / n)
+    return Coalesce(
+        Greatest(low * 100, Value(0.0)), Value(0.0), output_field=FloatField()
+    )
+
+
+def wilson_intervals(yes, total, z=Z_95):
+    """Vectorized :func:`wilson_interval` over NumPy arrays.
+
+    Returns ``(low, high)`` arrays; questions without answers get ``(0, 1)``.
+    """
+    yes = np.asarray(yes, dtype=np.float64)
+    total = np.asarray(total, dtype=np.float64)
+    n = np.maximum(total, 1)
+    share = yes / n
+    z2 = z * z
+    denominator = 1 + z2 / n
+    centre = (share + z2 / (2 * n)) / denominator
+    half = z * np.sqrt(share * (1 - share) / n + z2 / (4 * n * n)) / denominator
+    low = np.where(total > 0, np.maximum(centre - half, 0.0), 0.0)
+    high = np.where(total > 0, np.minimum(centre + half, 1.0), 1.0)
+    return low, high
+
+
+def get_question_results(survey):
+    """Return answer tallies and intervals of the survey's visible questions.
+
+    The result maps question ids to dicts with ``yes``, ``no``, ``total``,
+    ``agree_ratio``, ``yes_low`` and ``yes_high`` (the Wilson interval of
+    the yes share) and ``agree_low`` (the lower bound for the majority
+    answer). Shares are percentages. Results are computed with one query
+    and cached for the survey's data version.
+    """
+    key = f"survey:{survey.pk}:results:{survey.data_version}"
+
+    def compute():
+        rows = list(
+            survey.questions.filter(visible=True)
+            .order_by("pk")
+            .annotate(
+                yes=Count("answers", filter=Q(answers__answer="yes")),
+                no=Count("answers", filter=Q(answers__answer="no")),
+            )
+            .values_list("pk", "yes", "no")
+        )
+        if not rows:
+            return {}
+        ids, yes, no = (np.array(column) for column in zip(*rows))
+        total = yes + no
+        low, high = wilson_intervals(yes, total)
+        agree_low = np.where(yes >= no, low, 1 - high)
+        agree_low = np.where(total > 0, agree_low, 0.0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            agree = np.where(total > 0, np.maximum(yes, no) / total, 0.0)
+        return {
+            int(pk): {
+                "yes": int(yes[i]),
+                "no": int(no[i]),
+                "total": int(total[i]),
+                "agree_ratio": round(float(agree[i]) * 100),
+                "yes_low": round(float(low[i]) * 100, 1),
+                "yes_high": round(float(high[i]) * 100, 1),
+                "agree_low": round(float(agree_low[i]) * 100, 1),
+            }
+            for i, pk in enumerate(ids)
+        }
+
+    return cache.get_or_set(key, compute, RESULTS_CACHE_TIMEOUT)
+
+
+def get_chart_data(survey, sort=None):
+    """Return the results of the survey's visible questions as parallel lists.
+
+    The lists ``ids``, ``labels``, ``yes``, ``no``, ``total`` and ``ratio``
+    (the agree ratio) are in question id order, or in descending order of
+    the ``sort`` result field. They are cached for the survey's data version.
+    """
+    key = f"survey:{survey.pk}:chart:{survey.data_version}:{sort or 'id'}"
+
+    def compute():
+        results = get_question_results(survey)
+        rows = [
+            (pk, text, results.get(pk, EMPTY_RESULT))
+            for pk, text in survey.questions.filter(visible=True)
+            .order_by("pk")
+            .values_list("pk", "text")
+        ]
+        if sort:
+            rows.sort(key=lambda row: -row[2][sort])
+        return {
+            "ids": [pk for pk, _, _ in rows],
+            "labels": [text for _, text, _ in rows],
+            "yes": [result["yes"] for _, _, result in rows],
+            "no": [result["no"] for _, _, result in rows],
+            "total": [result["total"] for _, _, result in rows],
+            "ratio": [result["agree_ratio"] for _, _, result in rows],
+        }
+
+    return cache.get_or_set(key, compute, RESULTS_CACHE_TIMEOUT)
@@ -0,0 +1,252 @@
+"""Server side sorted, keyset paginated question tables.
+
+Every table in ``TABLES`` has a base queryset, the columns it can be sorted
+by and a template rendering its rows. A page ends with a cursor holding the
+sort value and primary key of its last row; the next page continues with
+``(value, pk)`` past the cursor, so deep pages cost the same as the first
+one and are served by the ``(survey, visible, <column>)`` indexes.
+"""
+import base64
+import binascii
+import json
+import math
+from collections import namedtuple
+from datetime import datetime
+
+from django.db.models import F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Answer
+from .stats import EMPTY_RESULT, get_question_results, wilson_low_expression
+
+PAGE_SIZE = 50
+
+QUESTION_SORTS = {
+    "id": "pk",
+    "published": "created_at",
+    "answers": "answer_count",
+    "agree": "agree_ratio",
+}
+
+ANSWER_SORTS = {
+    "id": "question_id",
+    "published": "question__created_at",
+    "answers": "question__answer_count",
+    "agree": "question__agree_ratio",
+    "answered": "created_at",
+    "my_answer": "answer",
+}
+
+RESULTS_TABLE_SORTS = {
+    **QUESTION_SORTS,
+    "my_answer": "my_answer",
+    "agree_low": "agree_low",
+    "yes_low": "yes_low",
+}
+
+# Sorts whose cursor value is a datetime
+DATE_SORTS = {"published", "answered"}
+
+# Cursor value types of the other sorts; integers are the default
+CURSOR_TYPES = {
+    "my_answer": str,
+    "agree_low": (int, float),
+    "yes_low": (int, float),
+}
+
+# Integers outside this range cannot be bound as database parameters
+MIN_INT, MAX_INT = -(2**63), 2**63 - 1
+
+Page = namedtuple("Page", "rows sort direction next")
+
+
+class Table:
+    def __init__(
+        self,
+        rows,
+        template,
+        sorts,
+        default_sort="id",
+        default_direction="desc",
+        editors_only=False,
+        prepare=None,
+    ):
+        self.rows = rows
+        self.template = template
+        self.sorts = sorts
+        self.default_sort = default_sort
+        self.default_direction = default_direction
+        self.editors_only = editors_only
+        self.prepare = prepare
+
+    def page(self, survey, user, sort=None, direction=None, after=None):
+        """Return one ``Page`` of rows and the cursor of the next page.
+
+        Unknown sorts and directions fall back to the table defaults and an
+        invalid ``after`` cursor raises ``ValueError``.
+        """
+        if sort not in self.sorts:
+            sort = self.default_sort
+        if direction not in ("asc", "desc"):
+            direction = self.default_direction
+        field = self.sorts[sort]
+        qs = self.rows(survey, user)
+        if after:
+            value, pk = decode_cursor(after, sort)
+            op = "lt" if direction == "desc" else "gt"
+            qs = qs.filter(
+                Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"pk__{op}": pk})
+            )
+        prefix = "-" if direction == "desc" else ""
+        rows = list(qs.order_by(f"{prefix}{field}", f"{prefix}pk")[: PAGE_SIZE + 1])
+        next_cursor = None
+        if len(rows) > PAGE_SIZE:
+            rows = rows[:PAGE_SIZE]
+            last = rows[-1]
+            next_cursor = encode_cursor(_value(last, field), last.pk)
+        if self.prepare:
+            self.prepare(survey, rows)
+        return Page(rows, sort, direction, next_cursor)
+
+
+def _value(obj, field):
+    if field == "pk":
+        return obj.pk
+    for part in field.split("__"):
+        obj = getattr(obj, part)
+    return obj
+
+
+def encode_cursor(value, pk):
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    data = json.dumps([value, pk], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor, sort):
+    """Return ``(value, pk)`` from a cursor made by ``encode_cursor``."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, pk = json.loads(data)
+        if sort in DATE_SORTS:
+            value = datetime.fromisoformat(value)
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    expected = datetime if sort in DATE_SORTS else CURSOR_TYPES.get(sort, int)
+    if (
+        not isinstance(value, expected)
+        or isinstance(value, bool)
+        or not isinstance(pk, int)
+        or isinstance(pk, bool)
+        or not _bindable(value)
+        or not _bindable(pk)
+    ):
+        raise ValueError("Invalid cursor")
+    return value, pk
+
+
+def _bindable(value):
+    if isinstance(value, int):
+        return MIN_INT <= value <= MAX_INT
+    if isinstance(value, float):
+        return math.isfinite(value)
+    return True
+
+
+def _unanswered(survey, user):
+    qs = survey.questions.filter(visible=True)
+    if user.is_authenticated:
+        qs = qs.exclude(answers__user=user)
+    return qs
+
+
+def _answered(survey, user):
+    if not user.is_authenticated:
+        return Answer.objects.none()
+    return with_tallies(
+        Answer.objects.filter(
+            user=user, question__survey=survey, question__visible=True
+        )
+    )
+
+
+def _my_answers(survey, user):
+    if not user.is_authenticated:
+        return Answer.objects.none()
+    return with_tallies(
+        Answer.objects.filter(
+            user=user, question__visible=True, question__survey__deleted=False
+        )
+    )
+
+
+def with_tallies(answers):
+    """Annotate ``answers`` with their question's stored tallies."""
+    return answers.select_related("question", "question__survey").annotate(
+        total_answers=F("question__answer_count"),
+        agree_ratio=F("question__agree_ratio"),
+    )
+
+
+def _results(survey, user):
+    qs = survey.questions.filter(visible=True).annotate(
+        yes_low=wilson_low_expression(F("yes_count"), F("answer_count")),
+        agree_low=wilson_low_expression(
+            Greatest(F("yes_count"), F("answer_count") - F("yes_count")),
+            F("answer_count"),
+        ),
+    )
+    if not user.is_authenticated:
+        return qs.annotate(my_answer=Value(""))
+    mine = Answer.objects.filter(question=OuterRef("pk"), user=user)
+    return qs.annotate(
+        my_answer=Coalesce(Subquery(mine.values("answer")[:1]), Value(""))
+    )
+
+
+def _attach_results(survey, rows):
+    results = get_question_results(survey)
+    for question in rows:
+        question.result = results.get(question.pk, EMPTY_RESULT)
+
+
+def _active(survey, user):
+    return survey.questions.filter(visible=True)
+
+
+def _hidden(survey, user):
+    return survey.questions.filter(visible=False)
+
+
+TABLES = {
+    "unanswered": Table(_unanswered, "survey/rows/unanswered.html", QUESTION_SORTS),
+    "answered": Table(_answered, "survey/rows/answered.html", ANSWER_SORTS),
+    "results": Table(
+        _results,
+        "survey/rows/results.html",
+        RESULTS_TABLE_SORTS,
+        default_sort="published",
+        prepare=_attach_results,
+    ),
+    "active": Table(
+        _active,
+        "survey/rows/active.html",
+        QUESTION_SORTS,
+        default_direction="asc",
+        editors_only=True,
+    ),
+    "hidden": Table(
+        _hidden,
+        "survey/rows/hidden.html",
+        QUESTION_SORTS,
+        default_direction="asc",
+        editors_only=True,
+    ),
+    "my_answers": Table(
+        _my_answers,
+        "survey/rows/my_answers.html",
+        ANSWER_SORTS,
+        default_sort="answered",
+    ),
+}
@@ -1,3 +1,7 @@
+from collections import OrderedDict
+import hashlib
+import threading
+
 from django import template
 from django.utils.html import escape
 from django.utils.safestring import mark_safe
@@ -5,11 +9,47 @@ import markdown
 
 register = template.Library()
 
+# Maximum number of rendered Markdown snippets kept in memory.
+MARKDOWN_CACHE_SIZE = 128
+
+_markdown = markdown.Markdown(extensions=["nl2br"])
+_lock = threading.Lock()
+_cache = OrderedDict()
+
+
+def _cache_key(value):
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()
+
+
+def render_markdown(value):
+    """Return escaped Markdown rendered to HTML, using a bounded LRU cache.
+
+    The parser instance is reused and reset between conversions instead of
+    being rebuilt for each call. Views can call this after saving text to
+    pre-render it, so later template renders are a dictionary lookup.
+    """
+    if not value:
+        return ""
+    key = _cache_key(value)
+    with _lock:
+        html = _cache.get(key)
+        if html is not None:
+            _cache.move_to_end(key)
+            return html
+        html = _markdown.reset().convert(escape(value))
+        _cache[key] = html
+        if len(_cache) > MARKDOWN_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return html
+
+
+def clear_markdown_cache():
+    """Remove all cached Markdown renderings."""
+    with _lock:
+        _cache.clear()
+
+
 @register.filter
 def markdownify(value):
     """Render Markdown text to HTML with line breaks."""
-    if not value:
-        return ""
-    escaped = escape(value)
-    html = markdown.markdown(escaped, extensions=["nl2br"])
-    return mark_safe(html)
+    return mark_safe(render_markdown(value))
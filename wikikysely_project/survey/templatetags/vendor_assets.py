@@ -0,0 +1,24 @@
+from django import template
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+
+from ..vendor import VENDOR_ASSETS
+
+register = template.Library()
+
+
+def _is_vendored(path):
+    # Not cached, so files downloaded later are used without a restart
+    hashed_files = getattr(staticfiles_storage, "hashed_files", None)
+    if hashed_files:
+        # After collectstatic only files in the manifest can be served
+        return path in hashed_files
+    return finders.find(path) is not None
+
+
+@register.simple_tag
+def vendor_static(name):
+    """Return the URL of a vendored library, or its CDN URL if not downloaded."""
+    path, cdn_url = VENDOR_ASSETS[name]
+    return static(path) if _is_vendored(path) else cdn_url
@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from ..activity import backfill_activity, get_activity
+from ..models import ActivityRollup, Answer, Survey, Question, record_answer
+
+T0 = datetime(2026, 3, 1, 10, 15, tzinfo=dt_timezone.utc)
+
+
+class ActivityRollupTests(TransactionTestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(username=f"tester{i}", password="pass")
+            for i in range(1, 3)
+        ]
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.users[0], state="running"
+        )
+        self.q1, self.q2 = [
+            Question.objects.create(
+                survey=self.survey, text=f"Question {i}?", creator=self.users[0]
+            )
+            for i in (1, 2)
+        ]
+
+    def _rollups(self):
+        return sorted(
+            ActivityRollup.objects.values_list(
+                "period", "start", "answers", "participants", "questions"
+            )
+        )
+
+    def _move(self, model, moment):
+        model.objects.all().update(created_at=moment)
+
+    def test_writes_match_backfill(self):
+        a, b = self.users
+        record_answer(a, self.q1, "yes")
+        record_answer(a, self.q2, "no")
+        record_answer(b, self.q1, "no")
+        record_answer(b, self.q1, "yes")
+        live = self._rollups()
+        day = [row for row in live if row[0] == "day"]
+        self.assertEqual(len(day), 1)
+        self.assertEqual(day[0][2:], (3, 2, 2))
+        backfill_activity(self.survey)
+        self.assertEqual(self._rollups(), live)
+
+    def test_backfill_and_range_query(self):
+        a, b = self.users
+        Answer.objects.create(user=a, question=self.q1, answer="yes")
+        Answer.objects.create(user=b, question=self.q1, answer="no")
+        self._move(Question, T0)
+        self._move(Answer, T0 + timedelta(days=2))
+        Answer.objects.filter(user=b).update(
+            created_at=T0 + timedelta(days=2, hours=3)
+        )
+        out = StringIO()
+        call_command("backfill_activity", stdout=out)
+        self.assertIn("Activity rollups rebuilt.", out.getvalue())
+        midnight = T0.replace(hour=0, minute=0)
+        days = get_activity(self.survey, "day", T0, midnight + timedelta(days=4))
+        self.assertEqual(
+            [(b["answers"], b["participants"], b["questions"]) for b in days],
+            [(0, 0, 2), (0, 0, 0), (2, 2, 0), (0, 0, 0)],
+        )
+        self.assertEqual(days[0]["start"], "2026-03-01T00:00:00+00:00")
+        hours = get_activity(
+            self.survey,
+            "hour",
+            T0 + timedelta(days=2),
+            T0.replace(minute=0) + timedelta(days=2, hours=4),
+        )
+        self.assertEqual([b["answers"] for b in hours], [1, 0, 0, 1])
+
+    def test_endpoint(self):
+        record_answer(self.users[0], self.q1, "yes")
+        url = reverse("survey:survey_activity")
+        data = self.client.get(url).json()
+        self.assertEqual(data["period"], "day")
+        self.assertEqual(len(data["buckets"]), 30)
+        self.assertEqual(data["buckets"][-1]["answers"], 1)
+        data = self.client.get(url, {"period": "hour"}).json()
+        self.assertEqual(len(data["buckets"]), 48)
+        data = self.client.get(
+            url, {"start": "2020-01-01", "end": "2026-01-01"}
+        ).json()
+        self.assertEqual(len(data["buckets"]), 366)
+        self.assertEqual(self.client.get(url, {"period": "week"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"start": "soon"}).status_code, 400)
@@ -0,0 +1,137 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from .. import admin as survey_admin
+from ..models import (
+    Survey,
+    Question,
+    Answer,
+    Participation,
+    get_skipped_ids,
+    rebuild_participation,
+    refresh_question_tallies,
+    skip_question,
+)
+
+
+class AdminTests(TransactionTestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.admin = User.objects.create_superuser(
+            username="admin", password="pass"
+        )
+        self.client.login(username="admin", password="pass")
+        self.users = [
+            User.objects.create_user(username=f"tester{i}", password="pass")
+            for i in range(3)
+        ]
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.admin, state="running"
+        )
+        self.questions = Question.objects.bulk_create(
+            Question(
+                survey=self.survey, text=f"Question {i}?", creator=self.users[0]
+            )
+            for i in range(5)
+        )
+        Answer.objects.bulk_create(
+            Answer(question=q, user=u, answer="yes")
+            for q in self.questions
+            for u in self.users
+        )
+
+    def _queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelists_do_not_grow_with_rows(self):
+        for model in ("answer", "question"):
+            url = reverse(f"admin:survey_{model}_changelist")
+            before = self._queries(url)
+            Answer.objects.create(
+                question=Question.objects.create(
+                    survey=self.survey, text=f"New {model}?", creator=self.users[1]
+                ),
+                user=self.users[2],
+                answer="no",
+            )
+            self.assertEqual(self._queries(url), before)
+
+    def test_big_tables_use_estimated_count(self):
+        url = reverse("admin:survey_answer_changelist")
+        with mock.patch.object(survey_admin, "ESTIMATE_COUNT_THRESHOLD", 1):
+            response = self.client.get(url)
+        last_pk = Answer.objects.order_by("-pk").values_list("pk", flat=True)[0]
+        self.assertEqual(response.context["cl"].result_count, last_pk)
+        response = self.client.get(url, {"answer": "yes"})
+        self.assertEqual(response.context["cl"].result_count, 15)
+
+    def test_survey_inline_is_paginated(self):
+        url = reverse("admin:survey_survey_change", args=[self.survey.pk])
+        with mock.patch.object(survey_admin.QuestionInline, "per_page", 2):
+            # The first request also loads content types
+            self._queries(url)
+            first = self._queries(url)
+            response = self.client.get(url, {"questions_page": 3})
+        formset = response.context["inline_admin_formsets"][0].formset
+        self.assertEqual(len(formset.forms), 1)
+        self.assertEqual(formset.page.paginator.num_pages, 3)
+        self.assertContains(response, "?questions_page=2")
+        Question.objects.create(
+            survey=self.survey, text="Another?", creator=self.users[2]
+        )
+        with mock.patch.object(survey_admin.QuestionInline, "per_page", 2):
+            self.assertEqual(self._queries(url), first)
+
+    def _answered(self, user):
+        return Participation.objects.get(survey=self.survey, user=user).answered
+
+    def test_admin_edits_keep_counts_current(self):
+        refresh_question_tallies(self.survey.questions.values("pk"))
+        rebuild_participation(self.survey)
+        question = self.questions[0]
+        # Hiding a question from its change form
+        url = reverse("admin:survey_question_change", args=[question.pk])
+        data = {
+            "survey": self.survey.pk,
+            "text": question.text,
+            "creator": self.users[0].pk,
+        }
+        self.client.post(url, data)
+        self.assertEqual(self._answered(self.users[0]), 4)
+        # Deleting answers with the changelist action
+        answers = Answer.objects.filter(question=self.questions[1])
+        self.client.post(
+            reverse("admin:survey_answer_changelist"),
+            {
+                "action": "delete_selected",
+                "_selected_action": [a.pk for a in answers[:2]],
+                "post": "yes",
+            },
+        )
+        question = Question.objects.get(pk=self.questions[1].pk)
+        self.assertEqual((question.answer_count, question.yes_count), (1, 1))
+        self.assertEqual(self._answered(self.users[0]), 3)
+        # Deleting a skipped question
+        question = Question.objects.create(
+            survey=self.survey, text="Skipped?", creator=self.users[0]
+        )
+        skip_question(self.users[2], question)
+        self.client.post(
+            reverse("admin:survey_question_delete", args=[question.pk]),
+            {"post": "yes"},
+        )
+        self.assertFalse(Question.objects.filter(pk=question.pk).exists())
+        self.assertEqual(get_skipped_ids(self.users[2], self.survey), set())
+        self.assertEqual(
+            Participation.objects.get(survey=self.survey, user=self.users[2]).skipped,
+            0,
+        )
@@ -0,0 +1,127 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils.translation import activate
+
+from ..agreement import recompute_agreement
+from ..models import (
+    Answer,
+    Participation,
+    Question,
+    Survey,
+    rebuild_participation,
+    record_answer,
+    remove_answer,
+    set_questions_visible,
+)
+
+
+class AgreementTests(TransactionTestCase):
+
+    def setUp(self):
+        activate("en")
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(username=f"tester{i}", password="pass")
+            for i in range(1, 4)
+        ]
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.users[0], state="running"
+        )
+        self.q1, self.q2 = [
+            Question.objects.create(
+                survey=self.survey, text=f"Question {i}?", creator=self.users[0]
+            )
+            for i in (1, 2)
+        ]
+
+    def _agreement(self):
+        return {
+            user_id: (agreed, disagreed)
+            for user_id, agreed, disagreed in Participation.objects.filter(
+                survey=self.survey
+            ).values_list("user_id", "agreed", "disagreed")
+        }
+
+    def _assert_consistent(self):
+        incremental = self._agreement()
+        self.assertEqual(recompute_agreement(self.survey)["participations"], 0)
+        rebuild_participation(self.survey)
+        self.assertEqual(self._agreement(), incremental)
+        return incremental
+
+    def test_counts_follow_answers_and_majority_flips(self):
+        a, b, c = self.users
+        record_answer(a, self.q1, "yes")
+        self.assertEqual(self._assert_consistent(), {a.pk: (1, 0)})
+        # An even split has no majority
+        record_answer(b, self.q1, "no")
+        self.assertEqual(self._assert_consistent(), {a.pk: (0, 0), b.pk: (0, 0)})
+        record_answer(c, self.q1, "no")
+        self.assertEqual(
+            self._assert_consistent(),
+            {a.pk: (0, 1), b.pk: (1, 0), c.pk: (1, 0)},
+        )
+        # Changing an answer flips the majority from no to yes
+        record_answer(b, self.q1, "yes")
+        record_answer(a, self.q2, "no")
+        self.assertEqual(
+            self._assert_consistent(),
+            {a.pk: (2, 0), b.pk: (1, 0), c.pk: (0, 1)},
+        )
+        remove_answer(Answer.objects.get(user=a, question=self.q1))
+        self.assertEqual(
+            self._assert_consistent(),
+            {a.pk: (1, 0), b.pk: (0, 0), c.pk: (0, 0)},
+        )
+        self.q1.refresh_from_db()
+        self.assertEqual(self.q1.majority, "")
+
+    def test_hidden_questions_are_not_counted(self):
+        a, b = self.users[:2]
+        record_answer(a, self.q1, "yes")
+        record_answer(b, self.q1, "no")
+        record_answer(a, self.q2, "yes")
+        record_answer(b, self.q2, "yes")
+        set_questions_visible(self.survey, [self.q2.pk], False)
+        self.assertEqual(self._assert_consistent(), {a.pk: (0, 0), b.pk: (0, 0)})
+        # A flip while hidden is picked up when the question is shown again
+        record_answer(b, self.q2, "no")
+        record_answer(self.users[2], self.q2, "no")
+        set_questions_visible(self.survey, [self.q2.pk], True)
+        self.assertEqual(
+            self._assert_consistent(),
+            {a.pk: (0, 1), b.pk: (1, 0), self.users[2].pk: (1, 0)},
+        )
+
+    def test_recompute_repairs_counts(self):
+        a, b = self.users[:2]
+        record_answer(a, self.q1, "yes")
+        record_answer(b, self.q1, "yes")
+        Participation.objects.update(agreed=0, disagreed=5)
+        Question.objects.update(majority="no")
+        out = StringIO()
+        call_command("recompute_agreement", stdout=out)
+        self.assertIn("2 users, 2 majorities and 2 agreement counts", out.getvalue())
+        self.assertEqual(self._agreement(), {a.pk: (1, 0), b.pk: (1, 0)})
+        self.assertEqual(
+            set(Question.objects.values_list("majority", flat=True)), {"yes", ""}
+        )
+
+    def test_userinfo_shows_agreement(self):
+        a, b, c = self.users
+        record_answer(a, self.q1, "yes")
+        record_answer(b, self.q1, "yes")
+        record_answer(c, self.q1, "no")
+        record_answer(a, self.q2, "no")
+        record_answer(c, self.q2, "yes")
+        self.client.force_login(a)
+        response = self.client.get(reverse("survey:userinfo"))
+        self.assertContains(response, "Agreement with the majority")
+        self.assertContains(response, "100%")
+        self.assertContains(
+            response, "1 with the majority, 0 against it, 1 on evenly split questions"
+        )
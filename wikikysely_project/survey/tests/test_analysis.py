@@ -0,0 +1,80 @@
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils.translation import activate
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+import numpy as np
+from scipy import sparse
+
+from ..analysis import analyze_matrix, get_survey_analysis, load_answer_matrix
+from ..models import Survey, Question, Answer
+
+
+class AnalysisTests(TransactionTestCase):
+
+    def setUp(self):
+        activate("en")
+        cache.clear()
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(username=f"tester{i}", password="pass")
+            for i in range(8)
+        ]
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.users[0], state="running"
+        )
+        self.questions = [
+            Question.objects.create(
+                survey=self.survey, text=f"Question {i}?", creator=self.users[0]
+            )
+            for i in range(4)
+        ]
+        # Two camps that disagree on every question
+        for i, user in enumerate(self.users):
+            for q in self.questions:
+                camp_yes = (i % 2 == 0) == (q.pk % 2 == 0)
+                Answer.objects.create(
+                    question=q, user=user, answer="yes" if camp_yes else "no"
+                )
+
+    def _survey(self):
+        return Survey.objects.get(pk=self.survey.pk)
+
+    def test_load_answer_matrix(self):
+        user_ids, question_ids, matrix = load_answer_matrix(self.survey)
+        self.assertEqual(matrix.shape, (8, 4))
+        self.assertEqual(matrix.dtype, np.int8)
+        self.assertEqual(sorted(question_ids), [q.pk for q in self.questions])
+        self.assertEqual(set(np.unique(matrix.data)), {-1, 1})
+
+    def test_groups_separate_camps(self):
+        result = get_survey_analysis(self._survey(), n_groups=2)
+        self.assertEqual(sorted(g["size"] for g in result["groups"]), [4, 4])
+        group = result["groups"][0]
+        self.assertEqual(group["consensus"][0]["score"], 1.0)
+        self.assertEqual(group["divisive"][0]["score"], 1.0)
+        labels = {tuple(p[:2]): p[2] for p in result["points"]}
+        self.assertEqual(len(set(labels.values())), 2)
+
+    def test_small_and_empty_matrices(self):
+        empty = analyze_matrix(sparse.csr_matrix((0, 0)), np.array([]))
+        self.assertEqual(empty["groups"], [])
+        single = analyze_matrix(sparse.csr_matrix([[1], [-1], [1]]), np.array([7]))
+        self.assertEqual(sum(g["size"] for g in single["groups"]), 3)
+
+    def test_result_is_reused_until_questions_change(self):
+        first = get_survey_analysis(self._survey(), n_groups=2)
+        # Answer changes bump the data version but reuse the analysis
+        Answer.objects.filter(question=self.questions[0]).first().save()
+        Answer.objects.filter(question=self.questions[0]).update(answer="yes")
+        self.assertEqual(get_survey_analysis(self._survey(), n_groups=2), first)
+        Answer.objects.filter(question=self.questions[0]).delete()
+        self.questions[0].save()  # bumps the catalog version
+        updated = get_survey_analysis(self._survey(), n_groups=2)
+        self.assertEqual(updated["question_count"], 3)
+
+    def test_analysis_page(self):
+        response = self.client.get(reverse("survey:survey_analysis") + "?groups=2")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["groups"]), 2)
+        self.assertContains(response, self.questions[0].text)
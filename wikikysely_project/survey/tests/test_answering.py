@@ -0,0 +1,93 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..answering import answer_and_advance
+from ..models import (
+    Answer,
+    Question,
+    Survey,
+    bump_catalog_version,
+    get_skipped_ids,
+)
+
+
+class AnswerAndAdvanceTests(TransactionTestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(username=f"tester{i}", password="pass")
+            for i in range(1, 3)
+        ]
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.users[0], state="running"
+        )
+
+    def _questions(self, count):
+        questions = Question.objects.bulk_create(
+            Question(survey=self.survey, text=f"Q{i}?", creator=self.users[0])
+            for i in range(count)
+        )
+        bump_catalog_version(self.survey.pk)
+        self.survey.refresh_from_db()
+        return questions
+
+    def _queries(self, user, question, answer_value):
+        with CaptureQueriesContext(connection) as queries:
+            answer_and_advance(user, question, answer_value)
+        return len(queries)
+
+    def test_walks_through_the_survey(self):
+        questions = self._questions(3)
+        user = self.users[0]
+        seen = []
+        question = questions[0]
+        for answer_value in ("yes", "", "no"):
+            seen.append(question.pk)
+            step = answer_and_advance(user, question, answer_value)
+            question = step.next_question
+        self.assertIsNone(question)
+        self.assertTrue(step.has_skipped)
+        self.assertEqual(sorted(seen), [q.pk for q in questions])
+        self.assertEqual(Answer.objects.filter(user=user).count(), 2)
+        self.assertEqual(get_skipped_ids(user, self.survey), set())
+        self.assertEqual(
+            (step.question.yes_count, step.question.answer_count), (0, 1)
+        )
+
+    def test_query_count_does_not_grow_with_survey(self):
+        small = self._questions(3)
+        # Warm the sampler and the first answer bookkeeping
+        answer_and_advance(self.users[0], small[0], "yes")
+        answer_and_advance(self.users[1], small[0], "yes")
+        few = self._queries(self.users[1], small[1], "no")
+        many = self._questions(200)
+        answer_and_advance(self.users[1], many[0], "yes")
+        self.assertEqual(self._queries(self.users[1], many[1], "no"), few)
+
+    def test_answer_takes_a_fixed_number_of_queries(self):
+        questions = self._questions(3)
+        answer_and_advance(self.users[0], questions[0], "yes")
+        answer_and_advance(self.users[1], questions[1], "yes")
+        # Tallies change by one and the sampler is not read again
+        with self.assertNumQueries(16):
+            step = answer_and_advance(self.users[1], questions[0], "yes")
+        self.assertEqual(
+            (step.question.yes_count, step.question.answer_count), (2, 2)
+        )
+
+    def test_skip_set_is_read_once(self):
+        questions = self._questions(3)
+        user = self.users[0]
+        answer_and_advance(user, questions[0], "")
+        with CaptureQueriesContext(connection) as queries:
+            step = answer_and_advance(user, questions[1], "yes")
+        skip_reads = [
+            q["sql"]
+            for q in queries
+            if q["sql"].startswith("SELECT") and "survey_skipset" in q["sql"]
+        ]
+        self.assertEqual(len(skip_reads), 1)
+        self.assertTrue(step.has_skipped)
@@ -0,0 +1,47 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import RequestFactory, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.translation import activate
+from django.contrib.auth import get_user_model
+
+from ..context_processors import unanswered_count
+from ..models import Survey, Question
+
+
+class ContextProcessorTests(TransactionTestCase):
+
+    def setUp(self):
+        activate("en")
+        User = get_user_model()
+        self.user = User.objects.create_user(username="tester", password="pass")
+        self.client.login(username="tester", password="pass")
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.user, state="running"
+        )
+        Question.objects.create(survey=self.survey, text="Q?", creator=self.user)
+
+    def test_values_are_lazy_and_memoized(self):
+        request = RequestFactory().get("/")
+        request.user = self.user
+        with CaptureQueriesContext(connection) as queries:
+            context = unanswered_count(request)
+        self.assertEqual(len(queries), 0)
+        self.assertIs(unanswered_count(request), context)
+        self.assertEqual(int(str(context["unanswered_count"])), 1)
+        self.assertTrue(context["can_edit"])
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(str(context["unanswered_count"]), "1")
+            self.assertTrue(context["can_edit"])
+        self.assertEqual(len(queries), 0)
+
+    def test_view_and_context_share_lookups(self):
+        with mock.patch.object(
+            Survey, "get_main_survey", wraps=Survey.get_main_survey
+        ) as lookup:
+            response = self.client.get(reverse("survey:survey_detail"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(lookup.call_count, 1)
+        self.assertContains(response, reverse("survey:survey_edit"))
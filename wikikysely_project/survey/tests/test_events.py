@@ -0,0 +1,132 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from ..events import (
+    answer_mismatches,
+    compact_answer_events,
+    derive_tallies,
+    opinion_changes,
+    snapshot_answers,
+    tally_mismatches,
+)
+from ..models import (
+    Survey,
+    Question,
+    Answer,
+    AnswerEvent,
+    record_answer,
+    remove_answer,
+    skip_question,
+)
+
+
+class AnswerEventTests(TransactionTestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(username=f"tester{i}", password="pass")
+            for i in range(1, 4)
+        ]
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.users[0], state="running"
+        )
+        self.q1, self.q2 = [
+            Question.objects.create(
+                survey=self.survey, text=f"Question {i}?", creator=self.users[0]
+            )
+            for i in (1, 2)
+        ]
+
+    def _history(self):
+        rows = AnswerEvent.objects.order_by("pk").values_list(
+            "user_id", "question_id", "kind", "answer"
+        )
+        return list(rows)
+
+    def test_writes_append_events(self):
+        a, b = self.users[:2]
+        skip_question(a, self.q2)
+        record_answer(a, self.q1, "yes")
+        record_answer(a, self.q1, "yes")
+        record_answer(a, self.q1, "no")
+        remove_answer(Answer.objects.get(user=a, question=self.q1))
+        record_answer(b, self.q1, "yes")
+        self.assertEqual(
+            self._history(),
+            [
+                (a.pk, self.q2.pk, "skip", ""),
+                (a.pk, self.q1.pk, "answer", "yes"),
+                (a.pk, self.q1.pk, "change", "no"),
+                (a.pk, self.q1.pk, "retract", ""),
+                (b.pk, self.q1.pk, "answer", "yes"),
+            ],
+        )
+        self.assertEqual(answer_mismatches(self.survey), 0)
+
+    def test_snapshot_and_compaction_keep_state(self):
+        a, b, c = self.users
+        Answer.objects.create(user=c, question=self.q2, answer="no")
+        self.assertEqual(answer_mismatches(self.survey), 1)
+        self.assertEqual(snapshot_answers(self.survey), 1)
+        self.assertEqual(snapshot_answers(self.survey), 0)
+        record_answer(a, self.q1, "yes")
+        record_answer(a, self.q1, "no")
+        record_answer(b, self.q1, "yes")
+        remove_answer(Answer.objects.get(user=b, question=self.q1))
+        skip_question(b, self.q2)
+        deleted, written = compact_answer_events(
+            self.survey, timezone.now() + timedelta(seconds=1)
+        )
+        self.assertEqual((deleted, written), (6, 3))
+        self.assertEqual(answer_mismatches(self.survey), 0)
+        self.assertEqual(
+            opinion_changes(self.survey),
+            {self.q1.pk: (1, 1), self.q2.pk: (0, 1)},
+        )
+        record_answer(a, self.q1, "yes")
+        self.assertEqual(answer_mismatches(self.survey), 0)
+
+    def test_opinion_changes_survive_retraction(self):
+        a, b = self.users[:2]
+        record_answer(a, self.q1, "no")
+        remove_answer(Answer.objects.get(user=a, question=self.q1))
+        record_answer(a, self.q1, "yes")
+        record_answer(b, self.q1, "yes")
+        record_answer(b, self.q2, "no")
+        self.assertEqual(
+            opinion_changes(self.survey),
+            {self.q1.pk: (1, 2), self.q2.pk: (0, 1)},
+        )
+
+    def test_tallies_projected_from_events(self):
+        a, b, c = self.users
+        record_answer(a, self.q1, "yes")
+        record_answer(b, self.q1, "no")
+        record_answer(c, self.q1, "no")
+        record_answer(c, self.q1, "yes")
+        remove_answer(Answer.objects.get(user=b, question=self.q1))
+        self.assertEqual(derive_tallies(self.survey), {self.q1.pk: (2, 2)})
+        self.assertEqual(tally_mismatches(self.survey), 0)
+        Question.objects.filter(pk=self.q1.pk).update(yes_count=0)
+        self.assertEqual(tally_mismatches(self.survey), 1)
+
+    def test_command_reports(self):
+        Answer.objects.create(user=self.users[0], question=self.q1, answer="yes")
+        out = StringIO()
+        call_command("compact_answer_events", "--older-than", "30", stdout=out)
+        self.assertIn("1 answers added to the log", out.getvalue())
+        self.assertNotIn("differ", out.getvalue())
+
+    def test_opinion_changes_command(self):
+        record_answer(self.users[0], self.q1, "yes")
+        record_answer(self.users[0], self.q1, "no")
+        out = StringIO()
+        call_command("opinion_changes", str(self.survey.pk), stdout=out)
+        self.assertIn(f"{self.q1.pk}\t1/1\t100.0%", out.getvalue())
+        self.assertIn(f"{self.q2.pk}\t0/0\t0.0%", out.getvalue())
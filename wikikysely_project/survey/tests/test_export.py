@@ -0,0 +1,67 @@
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+import io
+import os
+import tempfile
+
+import numpy as np
+
+from ..export import iter_answer_export, read_answer_export
+from ..models import Survey, Question, Answer
+
+
+class AnswerExportTests(TransactionTestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.admin = User.objects.create_superuser(username="admin", password="pass")
+        self.users = [
+            User.objects.create_user(username=f"tester{i}", password="pass")
+            for i in range(3)
+        ]
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.admin, state="running"
+        )
+        self.q1, self.q2, self.hidden = [
+            Question.objects.create(
+                survey=self.survey, text=f"Question {i}?", creator=self.admin
+            )
+            for i in range(3)
+        ]
+        self.hidden.visible = False
+        self.hidden.save()
+        Answer.objects.create(question=self.q1, user=self.users[0], answer="yes")
+        Answer.objects.create(question=self.q2, user=self.users[0], answer="no")
+        Answer.objects.create(question=self.q1, user=self.users[1], answer="no")
+        Answer.objects.create(question=self.hidden, user=self.users[2], answer="yes")
+
+    def test_roundtrip_in_small_chunks(self):
+        data = b"".join(iter_answer_export(self.survey, chunk_size=2))
+        header, columns = read_answer_export(io.BytesIO(data))
+        self.assertEqual([q["id"] for q in header["questions"]], [self.q1.pk, self.q2.pk])
+        self.assertEqual(columns["user"].tolist(), [0, 0, 1])
+        self.assertEqual(columns["question"].tolist(), [self.q1.pk, self.q2.pk, self.q1.pk])
+        self.assertEqual(columns["answer"].tolist(), [1, -1, -1])
+        self.assertEqual(columns["answer"].dtype, np.int8)
+        self.assertTrue((columns["created_at"] > 0).all())
+        self.assertNotIn(b"tester", data)
+
+    def test_endpoint_requires_superuser(self):
+        self.client.login(username="tester0", password="pass")
+        response = self.client.get(reverse("survey:survey_answers_export"))
+        self.assertEqual(response.status_code, 404)
+
+        self.client.login(username="admin", password="pass")
+        response = self.client.get(reverse("survey:survey_answers_export"))
+        self.assertEqual(response.status_code, 200)
+        _, columns = read_answer_export(io.BytesIO(b"".join(response.streaming_content)))
+        self.assertEqual(len(columns["answer"]), 3)
+
+    def test_command_writes_npz(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "answers.npz")
+            call_command("export_answers", path, "--format", "npz", stdout=io.StringIO())
+            with np.load(path) as data:
+                self.assertEqual(data["answer"].tolist(), [1, -1, -1])
@@ -0,0 +1,115 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils.translation import activate
+from django.contrib.auth import get_user_model
+
+from ..importing import import_questions, read_question_texts
+from ..models import Survey, Question, SurveyLog
+
+
+class QuestionImportTests(TransactionTestCase):
+
+    def setUp(self):
+        activate("en")
+        User = get_user_model()
+        self.user = User.objects.create_superuser(username="admin", password="pass")
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.user, state="running"
+        )
+        Question.objects.create(
+            survey=self.survey, text="Is it sunny?", creator=self.user
+        )
+        Question.objects.create(
+            survey=self.survey, text="Is it raining?", creator=self.user, visible=False
+        )
+
+    def test_skips_duplicates_in_one_pass(self):
+        version = Survey.objects.get(pk=self.survey.pk).catalog_version
+        with self.assertNumQueries(8):
+            result = import_questions(
+                self.survey,
+                [
+                    "is it  SUNNY",
+                    "Is it raining?",
+                    "Do you like tea?",
+                    "do you like tea",
+                    "  ",
+                    "x" * 501,
+                ],
+                self.user,
+            )
+        self.assertEqual(
+            [q.text for q in result.created], ["Is it raining?", "Do you like tea?"]
+        )
+        self.assertEqual(result.duplicates, ["is it SUNNY", "do you like tea"])
+        self.assertEqual(len(result.invalid), 2)
+        self.assertEqual(
+            sorted(
+                entry["question_id"]
+                for entry in SurveyLog.objects.values_list("data", flat=True)
+            ),
+            sorted(q.pk for q in result.created),
+        )
+        self.assertGreater(
+            Survey.objects.get(pk=self.survey.pk).catalog_version, version
+        )
+
+    def test_command_reads_csv_and_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / "questions.csv"
+            csv_path.write_text('id,text\n1,"Is it cold?"\n2,Is it sunny?\n')
+            json_path = Path(tmp) / "questions.json"
+            json_path.write_text(json.dumps([{"text": "Is it windy?"}, "Is it cold"]))
+            out = StringIO()
+            call_command("import_questions", str(csv_path), stdout=out)
+            call_command("import_questions", str(json_path), stdout=out)
+        self.assertIn("Imported 1 questions, skipped 1 duplicates", out.getvalue())
+        self.assertEqual(
+            set(self.survey.questions.values_list("text", flat=True)),
+            {"Is it sunny?", "Is it raining?", "Is it cold?", "Is it windy?"},
+        )
+
+    def test_non_string_items_are_invalid(self):
+        upload = StringIO(
+            json.dumps([None, 5, {"text": None}, {"text": ["Is it?"]}, "Is it hot?"])
+        )
+        texts = read_question_texts(upload, "questions.json")
+        result = import_questions(self.survey, texts, self.user)
+        self.assertEqual([q.text for q in result.created], ["Is it hot?"])
+        self.assertEqual(result.invalid, [None, 5, None, ["Is it?"]])
+        self.assertFalse(self.survey.questions.filter(text="None").exists())
+
+    def test_command_requires_a_creator(self):
+        Survey.objects.filter(pk=self.survey.pk).update(creator=None)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "questions.json"
+            path.write_text(json.dumps(["Is it hot?"]))
+            with self.assertRaisesMessage(CommandError, "--user"):
+                call_command("import_questions", str(path), stdout=StringIO())
+            call_command(
+                "import_questions", str(path), "--user", "admin", stdout=StringIO()
+            )
+        self.assertTrue(self.survey.questions.filter(text="Is it hot?").exists())
+
+    def test_admin_action(self):
+        self.client.login(username="admin", password="pass")
+        url = reverse("admin:survey_survey_changelist")
+        data = {
+            "action": "import_questions_action",
+            "_selected_action": [self.survey.pk],
+        }
+        response = self.client.post(url, data)
+        self.assertContains(response, 'name="apply"')
+        upload = SimpleUploadedFile("questions.json", b'["Is it hot?"]')
+        response = self.client.post(
+            url, {**data, "apply": "1", "file": upload}, follow=True
+        )
+        self.assertContains(response, "Imported 1 questions")
+        self.assertTrue(self.survey.questions.filter(text="Is it hot?").exists())
@@ -0,0 +1,136 @@
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils.translation import activate
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from io import StringIO
+from unittest.mock import patch
+
+from datetime import timedelta
+from django.utils import timezone
+
+from ..jobs import JOB_HANDLERS, RUNNING_LEASE, claim_jobs, enqueue_job, run_job
+from ..models import Survey, Question, Answer, Job
+
+
+class JobQueueTests(TransactionTestCase):
+
+    def setUp(self):
+        activate("en")
+        User = get_user_model()
+        self.user = User.objects.create_user(username="tester", password="pass")
+        self.other = User.objects.create_user(username="other", password="pass")
+        self.client.login(username="tester", password="pass")
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.other, state="running"
+        )
+        self.question = Question.objects.create(
+            survey=self.survey, text="Question?", creator=self.other
+        )
+        Answer.objects.create(question=self.question, user=self.user, answer="yes")
+
+    def test_download_can_be_queued_and_polled(self):
+        response = self.client.get(reverse("survey:userinfo_download") + "?async=1")
+        self.assertEqual(response.status_code, 202)
+        status_url = response.json()["status_url"]
+        self.assertEqual(response["Location"], status_url)
+        self.assertEqual(self.client.get(status_url).json()["status"], "queued")
+
+        call_command("run_jobs", "--once", stdout=StringIO())
+
+        data = self.client.get(status_url).json()
+        self.assertEqual(data["status"], "done")
+        self.assertEqual(data["result"]["answers"][0]["answer"], "yes")
+
+    def test_wikitext_job_renders_export(self):
+        response = self.client.get(
+            reverse("survey:survey_answers_wikitext") + "?async=1"
+        )
+        job = Job.objects.get(pk=response.json()["job_id"])
+        run_job(claim_jobs()[0])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertIn("Question?", job.result["wiki_text"])
+        self.assertIn('"total_users": 1', job.result["json_text"])
+
+    def test_user_data_delete_job(self):
+        response = self.client.post(
+            reverse("survey:user_data_delete"), {"async": "1"}
+        )
+        self.assertEqual(response.status_code, 202)
+        job = run_job(claim_jobs()[0])
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.result["removed_answers"], 1)
+        self.assertFalse(get_user_model().objects.filter(pk=self.user.pk).exists())
+        # The account is gone but the job can still be polled with its token
+        status_url = response.json()["status_url"]
+        data = self.client.get(status_url).json()
+        self.assertEqual(data["status"], "done")
+        self.assertIn("Account removed.", data["result"]["messages"])
+        job_url = reverse("survey:job_status", args=[job.pk])
+        self.assertEqual(self.client.get(job_url).status_code, 404)
+        self.assertEqual(
+            self.client.get(job_url + "?token=wrong").status_code, 404
+        )
+
+    def test_stale_running_job_is_claimed_again(self):
+        job = enqueue_job("userinfo_download", user=self.user, max_attempts=2)
+        self.assertEqual(claim_jobs()[0].pk, job.pk)
+        self.assertEqual(claim_jobs(), [])
+        expired = timezone.now() - timedelta(seconds=RUNNING_LEASE + 1)
+        Job.objects.filter(pk=job.pk).update(started_at=expired)
+        reclaimed = claim_jobs()
+        self.assertEqual([j.attempts for j in reclaimed], [2])
+        # A worker dying on the last attempt fails the job
+        Job.objects.filter(pk=job.pk).update(started_at=expired)
+        self.assertEqual(claim_jobs(), [])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+    def test_failed_job_is_retried_then_marked_failed(self):
+        with patch.dict(JOB_HANDLERS, {"broken": lambda job: 1 / 0}):
+            job = enqueue_job("broken", max_attempts=2)
+            job = run_job(claim_jobs()[0])
+            self.assertEqual(job.status, Job.QUEUED)
+            self.assertIn("ZeroDivisionError", job.error)
+            Job.objects.filter(pk=job.pk).update(run_after=job.created_at)
+            job = run_job(claim_jobs()[0])
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_claimed_job_is_not_claimed_twice(self):
+        enqueue_job("userinfo_download", user=self.user)
+        self.assertEqual(len(claim_jobs(limit=5)), 1)
+        self.assertEqual(claim_jobs(limit=5), [])
+
+    def test_status_hidden_from_other_users(self):
+        job = enqueue_job("userinfo_download", user=self.other)
+        response = self.client.get(reverse("survey:job_status", args=[job.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_ownerless_user_jobs_and_errors_are_private(self):
+        job = Job.objects.create(
+            name="userinfo_download", status=Job.DONE, result={"answers": []}
+        )
+        url = reverse("survey:job_status", args=[job.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        failed = enqueue_job("userinfo_download", user=self.user)
+        Job.objects.filter(pk=failed.pk).update(
+            status=Job.FAILED, error="Traceback (most recent call last): ..."
+        )
+        data = self.client.get(
+            reverse("survey:job_status", args=[failed.pk])
+        ).json()
+        self.assertEqual(data["error"], "The job failed.")
+        self.user.is_superuser = True
+        self.user.save()
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_user_data_delete_removes_finished_jobs(self):
+        self.client.get(reverse("survey:userinfo_download") + "?async=1")
+        run_job(claim_jobs()[0])
+        Question.objects.create(
+            survey=self.survey, text="Kept?", creator=self.user
+        ).answers.create(user=self.other, answer="no")
+        self.client.post(reverse("survey:user_data_delete"))
+        self.assertFalse(Job.objects.filter(user=self.user).exists())
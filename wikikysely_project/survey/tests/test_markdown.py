@@ -0,0 +1,50 @@
+from django.test import SimpleTestCase
+from unittest.mock import patch
+
+from ..templatetags import markdown_extras
+from ..templatetags.markdown_extras import (
+    clear_markdown_cache,
+    markdownify,
+    render_markdown,
+)
+
+
+class MarkdownCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        clear_markdown_cache()
+
+    def test_renders_markdown_with_line_breaks(self):
+        html = markdownify("**bold**\nnext")
+        self.assertIn("<strong>bold</strong>", html)
+        self.assertIn("<br />", html)
+
+    def test_html_is_escaped(self):
+        html = markdownify("<script>alert(1)</script>")
+        self.assertNotIn("<script>", html)
+
+    def test_empty_value(self):
+        self.assertEqual(markdownify(""), "")
+        self.assertEqual(markdownify(None), "")
+
+    def test_repeated_render_uses_cache(self):
+        render_markdown("*cached*")
+        with patch.object(markdown_extras._markdown, "convert") as convert:
+            html = render_markdown("*cached*")
+        convert.assert_not_called()
+        self.assertIn("<em>cached</em>", html)
+
+    def test_parser_is_reset_between_documents(self):
+        render_markdown("[a]: https://example.org\n\n[link][a]")
+        html = render_markdown("[link][a]")
+        self.assertNotIn("href", html)
+
+    def test_cache_is_bounded(self):
+        with patch.object(markdown_extras, "MARKDOWN_CACHE_SIZE", 2):
+            render_markdown("one")
+            render_markdown("two")
+            render_markdown("three")
+        self.assertEqual(len(markdown_extras._cache), 2)
+        self.assertNotIn(
+            markdown_extras._cache_key("one"), markdown_extras._cache
+        )
@@ -0,0 +1,183 @@
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils.translation import activate
+from django.contrib.auth import get_user_model
+
+from ..models import (
+    Survey,
+    Question,
+    Answer,
+    Participation,
+    SkipSet,
+    SkippedQuestion,
+    SurveyLog,
+    get_skipped_ids,
+    rebuild_participation,
+    record_answer,
+    skip_question,
+)
+
+
+class ParticipationTests(TransactionTestCase):
+
+    def setUp(self):
+        activate("en")
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(username=f"tester{i}", password="pass")
+            for i in range(1, 4)
+        ]
+        self.user = self.users[0]
+        self.client.login(username=self.user.username, password="pass")
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.user, state="running"
+        )
+        self.q1, self.q2 = [
+            Question.objects.create(
+                survey=self.survey, text=f"Question {i}?", creator=self.user
+            )
+            for i in (1, 2)
+        ]
+
+    def _counts(self, user):
+        row = Participation.objects.filter(survey=self.survey, user=user).first()
+        return (row.answered, row.skipped) if row else None
+
+    def test_answer_and_skip_update_counts(self):
+        url = reverse("survey:answer_survey")
+        self.client.post(url, {"question_id": self.q1.pk, "answer": ""})
+        self.assertEqual(self._counts(self.user), (0, 1))
+        self.client.post(url, {"question_id": self.q1.pk, "answer": "yes"})
+        self.assertEqual(self._counts(self.user), (1, 0))
+        self.client.post(url, {"question_id": self.q1.pk, "answer": "no"})
+        self.assertEqual(self._counts(self.user), (1, 0))
+
+    def test_answer_delete_decrements(self):
+        answer = Answer.objects.create(question=self.q1, user=self.user, answer="yes")
+        self.assertEqual(self._counts(self.user), (1, 0))
+        self.client.get(reverse("survey:answer_delete", args=[answer.pk]))
+        self.assertEqual(self._counts(self.user), (0, 0))
+
+    def test_hide_and_show_question_adjusts_counts(self):
+        Answer.objects.create(question=self.q1, user=self.users[1], answer="yes")
+        skip_question(self.users[2], self.q1)
+        self.client.get(reverse("survey:question_hide", args=[self.q1.pk]))
+        self.assertEqual(self._counts(self.users[1]), (0, 0))
+        self.assertEqual(self._counts(self.users[2]), (0, 0))
+        self.client.get(reverse("survey:question_show", args=[self.q1.pk]))
+        self.assertEqual(self._counts(self.users[1]), (1, 0))
+        self.assertEqual(self._counts(self.users[2]), (0, 1))
+
+    def test_saving_visibility_adjusts_counts(self):
+        Answer.objects.create(question=self.q1, user=self.users[1], answer="yes")
+        question = Question.objects.get(pk=self.q1.pk)
+        question.visible = False
+        question.save()
+        self.assertEqual(self._counts(self.users[1]), (0, 0))
+        question.save()  # Unchanged visibility is not counted again
+        self.assertEqual(self._counts(self.users[1]), (0, 0))
+        question.visible = True
+        question.save()
+        self.assertEqual(self._counts(self.users[1]), (1, 0))
+
+    def test_bulk_visibility_adjusts_counts_once(self):
+        for q in (self.q1, self.q2):
+            Answer.objects.create(question=q, user=self.users[1], answer="yes")
+        skip_question(self.users[2], self.q1)
+        skip_question(self.users[2], self.q2)
+        url = reverse("survey:question_visibility")
+        question_ids = [self.q1.pk, self.q2.pk]
+        response = self.client.post(
+            url, {"question_ids": question_ids, "visible": "0"}, follow=True
+        )
+        self.assertContains(response, "2 questions hidden")
+        self.assertEqual(self._counts(self.users[1]), (0, 0))
+        self.assertEqual(self._counts(self.users[2]), (0, 0))
+        self.assertEqual(
+            SurveyLog.objects.filter(data__action="question_hide").count(), 2
+        )
+        # Already hidden questions are left alone
+        response = self.client.post(
+            url,
+            {"question_ids": question_ids, "visible": "0"},
+            HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        )
+        self.assertEqual(response.json(), {"changed": []})
+        response = self.client.post(
+            url,
+            {"question_ids": question_ids, "visible": "1"},
+            HTTP_X_REQUESTED_WITH="XMLHttpRequest",
+        )
+        self.assertEqual(response.json(), {"changed": question_ids})
+        self.assertEqual(self._counts(self.users[1]), (2, 0))
+        self.assertEqual(self._counts(self.users[2]), (0, 2))
+        self.client.force_login(self.users[1])
+        self.client.post(url, {"question_ids": question_ids, "visible": "0"})
+        self.assertEqual(self.survey.questions.filter(visible=True).count(), 2)
+
+    def test_full_users_and_total_users(self):
+        for q in (self.q1, self.q2):
+            Answer.objects.create(question=q, user=self.users[1], answer="yes")
+        Answer.objects.create(question=self.q1, user=self.users[2], answer="no")
+        response = self.client.get(reverse("survey:survey_answers"))
+        self.assertEqual(response.context["total_users"], 2)
+        response = self.client.get(reverse("survey:survey_answers_wikitext"))
+        self.assertIn('"full_users": 1', response.context["json_text"])
+
+    def test_user_data_delete_updates_other_users_skips(self):
+        skip_question(self.users[1], self.q1)
+        Answer.objects.create(question=self.q2, user=self.users[1], answer="yes")
+        self.client.post(reverse("survey:user_data_delete"))
+        self.assertFalse(Question.objects.filter(pk=self.q1.pk).exists())
+        self.assertEqual(self._counts(self.users[1]), (1, 0))
+
+    def test_rebuild_matches_incremental_counts(self):
+        Answer.objects.create(question=self.q1, user=self.users[1], answer="yes")
+        skip_question(self.users[1], self.q2)
+        Answer.objects.create(question=self.q2, user=self.users[2], answer="no")
+        expected = {u.pk: self._counts(u) for u in self.users[1:]}
+        Participation.objects.all().delete()
+        rebuild_participation(self.survey)
+        self.assertEqual({u.pk: self._counts(u) for u in self.users[1:]}, expected)
+
+    def test_skips_share_one_packed_row(self):
+        skip_question(self.user, self.q1)
+        skip_question(self.user, self.q2)
+        skip_question(self.user, self.q2)
+        self.assertEqual(SkipSet.objects.filter(user=self.user).count(), 1)
+        self.assertEqual(
+            get_skipped_ids(self.user, self.survey), {self.q1.pk, self.q2.pk}
+        )
+        self.assertEqual(self._counts(self.user), (0, 2))
+        record_answer(self.user, self.q2, "no")
+        self.assertEqual(get_skipped_ids(self.user, self.survey), {self.q1.pk})
+        self.assertEqual(self._counts(self.user), (1, 1))
+
+    def test_pack_skipped_questions_moves_old_rows(self):
+        with connection.schema_editor() as editor:
+            editor.create_model(SkippedQuestion)
+        other = self.users[1]
+        SkippedQuestion.objects.bulk_create(
+            [
+                SkippedQuestion(question=self.q1, user=self.user),
+                SkippedQuestion(question=self.q2, user=self.user),
+                SkippedQuestion(question=self.q1, user=other),
+            ]
+        )
+        Answer.objects.create(question=self.q2, user=self.user, answer="yes")
+        skip_question(other, self.q2)
+        call_command("pack_skipped_questions", "--drop-table", stdout=StringIO())
+        self.assertEqual(get_skipped_ids(self.user, self.survey), {self.q1.pk})
+        self.assertEqual(get_skipped_ids(other, self.survey), {self.q1.pk, self.q2.pk})
+        self.assertEqual(self._counts(self.user), (1, 1))
+        self.assertEqual(self._counts(other), (0, 2))
+        self.assertNotIn(
+            "survey_skippedquestion", connection.introspection.table_names()
+        )
+        # Nothing left to move once the table is gone
+        out = StringIO()
+        call_command("pack_skipped_questions", stdout=out)
+        self.assertIn("nothing to move", out.getvalue())
@@ -0,0 +1,41 @@
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+
+from ..models import Survey
+from ..permissions import can_edit_survey, forget_secretaries
+
+
+class PermissionTests(TransactionTestCase):
+
+    def setUp(self):
+        forget_secretaries()
+        User = get_user_model()
+        self.creator = User.objects.create_user(username="creator", password="pass")
+        self.other = User.objects.create_user(username="other", password="pass")
+        self.survey = Survey.objects.create(title="Test Survey", creator=self.creator)
+
+    def _survey(self):
+        return Survey.objects.get(pk=self.survey.pk)
+
+    def test_checks_reuse_loaded_secretaries(self):
+        survey = self._survey()
+        self.assertFalse(can_edit_survey(self.other, survey))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(can_edit_survey(self.creator, survey))
+            self.assertFalse(can_edit_survey(self.other, survey))
+            self.assertFalse(can_edit_survey(AnonymousUser(), survey))
+        self.assertEqual(len(queries), 0)
+
+    def test_secretary_changes_invalidate(self):
+        self.assertFalse(can_edit_survey(self.other, self._survey()))
+        self.survey.secretaries.add(self.other)
+        self.assertTrue(can_edit_survey(self.other, self._survey()))
+        self.other.secretary_surveys.remove(self.survey)
+        self.assertFalse(can_edit_survey(self.other, self._survey()))
+        self.other.secretary_surveys.add(self.survey)
+        self.assertTrue(can_edit_survey(self.other, self._survey()))
+        self.other.secretary_surveys.clear()
+        self.assertFalse(can_edit_survey(self.other, self._survey()))
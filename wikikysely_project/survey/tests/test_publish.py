@@ -0,0 +1,80 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TransactionTestCase
+from django.contrib.auth import get_user_model
+
+from ..models import Survey, Question, Answer
+
+
+class PublishResultsTests(TransactionTestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.user = User.objects.create_user(username="tester", password="pass")
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.user, state="running"
+        )
+        self.q1, self.q2 = [
+            Question.objects.create(
+                survey=self.survey, text=f"Question {i}?", creator=self.user
+            )
+            for i in (1, 2)
+        ]
+        Answer.objects.create(question=self.q1, user=self.user, answer="yes")
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.output = Path(tmp.name)
+
+    def _publish(self):
+        out = StringIO()
+        call_command(
+            "publish_results",
+            str(self.output),
+            "--page-size",
+            "1",
+            "--language",
+            "en",
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def _diff(self):
+        return json.loads((self.output / "diff.json").read_text())
+
+    def test_publishes_only_changes(self):
+        out = self._publish()
+        self.assertIn("2 rows, 2 changed, 0 removed", out)
+        self.assertIn("Wrote 2 of 2 pages", out)
+        results = json.loads((self.output / "results.json").read_text())
+        self.assertEqual(results["total_users"], 1)
+        self.assertEqual(
+            [row["id"] for row in results["data"]], [self.q1.pk, self.q2.pk]
+        )
+        page = (self.output / "table-0001.wiki").read_text()
+        self.assertIn('{| class="wikitable"', page)
+        self.assertIn("| Question 1? || 1 || 0 || 1 ||", page)
+
+        out = self._publish()
+        self.assertIn("2 rows, 0 changed, 0 removed", out)
+        self.assertIn("Wrote 0 of 2 pages", out)
+        self.assertEqual((self.output / "diff.wiki").read_text(), "")
+
+        Answer.objects.create(question=self.q2, user=self.user, answer="no")
+        out = self._publish()
+        self.assertIn("2 rows, 1 changed, 0 removed", out)
+        self.assertIn("Wrote 1 of 2 pages", out)
+        self.assertEqual(
+            [row["id"] for row in self._diff()["changed"]], [self.q2.pk]
+        )
+        self.assertIn("Question 2?", (self.output / "diff.wiki").read_text())
+
+        self.q2.visible = False
+        self.q2.save()
+        out = self._publish()
+        self.assertIn("1 rows, 0 changed, 1 removed", out)
+        self.assertEqual(self._diff()["removed"], [self.q2.pk])
+        self.assertFalse((self.output / "table-0002.wiki").exists())
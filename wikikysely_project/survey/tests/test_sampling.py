@@ -0,0 +1,82 @@
+import random
+
+from django.test import SimpleTestCase, TransactionTestCase
+from django.contrib.auth import get_user_model
+
+from ..models import Survey, Question, Answer
+from ..sampling import AdaptiveSampler, FenwickTree, question_weight
+from ..stats import wilson_interval
+
+
+class FenwickTreeTests(SimpleTestCase):
+
+    def test_find_matches_prefix_sums(self):
+        rng = random.Random(0)
+        weights = [rng.random() for _ in range(37)]
+        tree = FenwickTree(weights[:20])
+        for weight in weights[20:]:
+            tree.append(weight)
+        tree[5] = 0.0
+        weights[5] = 0.0
+        self.assertAlmostEqual(tree.total(), sum(weights))
+        for _ in range(200):
+            value = rng.random() * sum(weights)
+            index = tree.find(value)
+            self.assertLessEqual(sum(weights[:index]), value)
+            self.assertGreater(sum(weights[: index + 1]), value)
+
+    def test_weights_favour_uncertain_and_new_questions(self):
+        self.assertGreater(question_weight(1, 1, 10), question_weight(90, 100, 10))
+        self.assertGreater(question_weight(5, 10, 0), question_weight(5, 10, 30))
+        self.assertGreater(question_weight(900, 1000, 100), 0)
+
+    def test_wilson_interval(self):
+        self.assertEqual(wilson_interval(0, 0), (0.0, 1.0))
+        low, high = wilson_interval(900, 1000)
+        self.assertAlmostEqual(low, 0.8798, places=3)
+        self.assertAlmostEqual(high, 0.9171, places=3)
+        low, high = wilson_interval(1, 1)
+        self.assertLess(low, 0.25)
+
+
+class AdaptiveSamplerTests(TransactionTestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(username=f"tester{i}", password="pass")
+            for i in range(20)
+        ]
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.users[0], state="running"
+        )
+        self.settled, self.fresh = [
+            Question.objects.create(
+                survey=self.survey, text=f"Question {i}?", creator=self.users[0]
+            )
+            for i in (1, 2)
+        ]
+        for user in self.users:
+            Answer.objects.create(question=self.settled, user=user, answer="yes")
+        self.survey.refresh_from_db()
+
+    def test_under_answered_question_is_preferred(self):
+        sampler = AdaptiveSampler()
+        random.seed(0)
+        picks = [sampler.pick(self.survey) for _ in range(200)]
+        self.assertGreater(picks.count(self.fresh.pk), 150)
+
+    def test_excluded_questions_are_not_picked(self):
+        sampler = AdaptiveSampler()
+        picks = {sampler.pick(self.survey, {self.fresh.pk}) for _ in range(20)}
+        self.assertEqual(picks, {self.settled.pk})
+        self.assertIsNone(sampler.pick(self.survey, {self.fresh.pk, self.settled.pk}))
+
+    def test_tally_change_updates_weight(self):
+        sampler = AdaptiveSampler()
+        sampler.pick(self.survey)
+        index = sampler._positions[self.fresh.pk]
+        before = sampler._tree[index]
+        Answer.objects.create(question=self.fresh, user=self.users[1], answer="no")
+        sampler.tally_changed(self.fresh)
+        self.assertLess(sampler._tree[index], before)
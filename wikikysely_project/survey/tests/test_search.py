@@ -0,0 +1,77 @@
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils.translation import activate
+from django.contrib.auth import get_user_model
+
+from ..models import Survey, Question, Answer
+from ..search import search_questions
+
+
+class QuestionSearchTests(TransactionTestCase):
+
+    def setUp(self):
+        activate("en")
+        User = get_user_model()
+        self.user = User.objects.create_user(username="tester", password="pass")
+        self.other = User.objects.create_user(username="other", password="pass")
+        self.client.login(username="tester", password="pass")
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.user, state="running"
+        )
+        self.images = Question.objects.create(
+            survey=self.survey,
+            text="Should Wikipedia allow generated images?",
+            creator=self.other,
+        )
+        self.bots = Question.objects.create(
+            survey=self.survey,
+            text="Should Wikipedia allow more bots? Bots edit a lot.",
+            creator=self.other,
+        )
+        Answer.objects.create(question=self.images, user=self.user, answer="no")
+        Answer.objects.create(question=self.images, user=self.other, answer="yes")
+
+    def test_ranked_matches_with_tallies(self):
+        data = search_questions(self.survey, "wikipedia bots", user=self.user)
+        self.assertEqual([r["id"] for r in data["results"]], [self.bots.pk])
+        data = search_questions(self.survey, "Wikipedia", user=self.user)
+        self.assertEqual(data["count"], 2)
+        image = next(r for r in data["results"] if r["id"] == self.images.pk)
+        self.assertEqual((image["yes"], image["no"], image["answer"]), (1, 1, "no"))
+
+    def test_prefix_and_operators(self):
+        data = search_questions(self.survey, "imag")
+        self.assertEqual([r["id"] for r in data["results"]], [self.images.pk])
+        data = search_questions(self.survey, 'images" OR "bots')
+        self.assertEqual(data["count"], 0)
+
+    def test_index_follows_edits_hides_and_deletes(self):
+        self.bots.text = "Is the weather nice?"
+        self.bots.save()
+        self.assertEqual(search_questions(self.survey, "bots")["count"], 0)
+        self.assertEqual(search_questions(self.survey, "weather")["count"], 1)
+        self.bots.visible = False
+        self.bots.save()
+        self.assertEqual(search_questions(self.survey, "weather")["count"], 0)
+        Question.objects.filter(pk=self.bots.pk).delete()
+        self.assertEqual(search_questions(self.survey, "weather")["count"], 0)
+
+    def test_endpoint_is_paginated(self):
+        for i in range(25):
+            Question.objects.create(
+                survey=self.survey, text=f"Question number {i}?", creator=self.other
+            )
+        url = reverse("survey:question_search")
+        first = self.client.get(url, {"q": "question"}).json()
+        self.assertEqual(first["count"], 25)
+        self.assertEqual(len(first["results"]), 20)
+        self.assertTrue(first["has_next"])
+        second = self.client.get(url, {"q": "question", "page": 2}).json()
+        self.assertEqual(len(second["results"]), 5)
+        self.assertFalse(second["has_next"])
+        self.assertFalse(
+            {r["id"] for r in first["results"]} & {r["id"] for r in second["results"]}
+        )
+        last = self.client.get(url, {"q": "question", "page": 10**20})
+        self.assertEqual(last.status_code, 200)
+        self.assertEqual(last.json()["results"], [])
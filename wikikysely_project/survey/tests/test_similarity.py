@@ -0,0 +1,101 @@
+from django.test import SimpleTestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils.translation import activate
+from django.contrib.auth import get_user_model
+
+from ..models import Survey, Question, Answer
+from ..similarity import QuestionIndex, question_index, trigrams, similar_questions
+
+
+class TrigramTests(SimpleTestCase):
+
+    def test_case_and_punctuation_are_ignored(self):
+        self.assertEqual(trigrams("Is this OK?"), trigrams("is this, ok"))
+
+    def test_words_are_padded(self):
+        self.assertEqual(trigrams("abc"), {" ab", "abc", "bc "})
+
+
+class SimilarQuestionTests(TransactionTestCase):
+
+    def setUp(self):
+        activate("en")
+        question_index.__init__()
+        User = get_user_model()
+        self.user = User.objects.create_user(username="tester", password="pass")
+        self.other = User.objects.create_user(username="other", password="pass")
+        self.client.login(username="tester", password="pass")
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.user, state="running"
+        )
+        self.question = Question.objects.create(
+            survey=self.survey,
+            text="Should Wikipedia allow AI generated images?",
+            creator=self.other,
+        )
+        self.weather = Question.objects.create(
+            survey=self.survey, text="Is the weather nice today?", creator=self.other
+        )
+        Answer.objects.create(question=self.question, user=self.other, answer="yes")
+
+    def test_similar_questions_include_tallies(self):
+        self.survey.refresh_from_db()
+        results = similar_questions(
+            self.survey, "Should wikipedia allow AI-generated pictures"
+        )
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]["id"], self.question.pk)
+        self.assertEqual((results[0]["yes"], results[0]["no"]), (1, 0))
+
+    def test_index_follows_hide_and_show(self):
+        self.survey.refresh_from_db()
+        text = "Should Wikipedia allow AI generated images"
+        self.assertTrue(similar_questions(self.survey, text))
+        self.client.get(reverse("survey:question_hide", args=[self.question.pk]))
+        self.survey.refresh_from_db()
+        self.assertEqual(similar_questions(self.survey, text), [])
+        self.client.get(reverse("survey:question_show", args=[self.question.pk]))
+        self.survey.refresh_from_db()
+        self.assertTrue(similar_questions(self.survey, text))
+
+    def test_stale_index_is_rebuilt(self):
+        index = QuestionIndex()
+        self.survey.refresh_from_db()
+        self.assertEqual(index.search(self.survey, "weather today")[0][1], self.weather.pk)
+        Question.objects.filter(pk=self.weather.pk).update(text="Something else entirely")
+        self.survey.refresh_from_db()
+        self.assertEqual(index.search(self.survey, "weather today")[0][1], self.weather.pk)
+        Survey.objects.filter(pk=self.survey.pk).update(catalog_version=99)
+        self.survey.refresh_from_db()
+        self.assertEqual(index.search(self.survey, "weather today"), [])
+
+    def test_json_endpoint(self):
+        response = self.client.get(
+            reverse("survey:question_similar"), {"q": "allow AI generated images"}
+        )
+        data = response.json()["questions"]
+        self.assertEqual(data[0]["id"], self.question.pk)
+        self.assertEqual(
+            data[0]["url"], reverse("survey:answer_question", args=[self.question.pk])
+        )
+
+    def test_add_near_duplicate_requires_confirmation(self):
+        url = reverse("survey:question_add")
+        text = "Should Wikipedia allow images generated by AI?"
+        response = self.client.post(url, {"text": text})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [q["id"] for q in response.context["similar_questions"]],
+            [self.question.pk],
+        )
+        self.assertFalse(Question.objects.filter(text=text).exists())
+        self.client.post(url, {"text": text, "confirm_similar": "1"})
+        self.assertTrue(Question.objects.filter(text=text).exists())
+
+    def test_add_exact_duplicate_is_rejected(self):
+        url = reverse("survey:question_add")
+        self.client.post(
+            url,
+            {"text": "should wikipedia allow AI generated images", "confirm_similar": "1"},
+        )
+        self.assertEqual(Question.objects.count(), 2)
@@ -0,0 +1,30 @@
+from django.test import SimpleTestCase
+from django.templatetags.static import static
+from unittest.mock import patch
+
+from ..templatetags import vendor_assets
+from ..vendor import VENDOR_ASSETS
+
+
+class StaticAssetTests(SimpleTestCase):
+
+    def test_uncollected_files_keep_their_names(self):
+        self.assertEqual(static("css/style.css"), "/static/css/style.css")
+
+    def test_vendor_static_uses_the_local_copy_once_downloaded(self):
+        path, cdn_url = VENDOR_ASSETS["chart.js"]
+        with patch.object(vendor_assets.finders, "find", return_value=None):
+            self.assertEqual(vendor_assets.vendor_static("chart.js"), cdn_url)
+        with patch.object(vendor_assets.finders, "find", return_value="/tmp/x.js"):
+            self.assertEqual(
+                vendor_assets.vendor_static("chart.js"), f"/static/{path}"
+            )
+
+    def test_vendor_static_follows_the_manifest(self):
+        path, cdn_url = VENDOR_ASSETS["chart.js"]
+        storage = vendor_assets.staticfiles_storage
+        with patch.object(storage, "hashed_files", {"css/style.css": "x"}):
+            # Missing from the manifest: static() would raise ValueError
+            self.assertEqual(vendor_assets.vendor_static("chart.js"), cdn_url)
+        with patch.object(storage, "hashed_files", {path: "vendor/chart.abc.js"}):
+            self.assertTrue(vendor_assets._is_vendored(path))
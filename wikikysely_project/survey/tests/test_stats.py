@@ -0,0 +1,87 @@
+from django.test import SimpleTestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils.translation import activate
+from django.contrib.auth import get_user_model
+import json
+
+from ..models import Survey, Question, Answer
+from ..stats import get_question_results, wilson_interval, wilson_intervals
+
+
+class WilsonIntervalTests(SimpleTestCase):
+
+    def test_vectorized_matches_scalar(self):
+        yes = [0, 1, 5, 900, 0]
+        total = [0, 1, 10, 1000, 3]
+        low, high = wilson_intervals(yes, total)
+        for i in range(len(yes)):
+            expected = wilson_interval(yes[i], total[i])
+            self.assertAlmostEqual(low[i], expected[0])
+            self.assertAlmostEqual(high[i], expected[1])
+
+
+class QuestionResultTests(TransactionTestCase):
+
+    def setUp(self):
+        activate("en")
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(username=f"tester{i}", password="pass")
+            for i in range(6)
+        ]
+        self.client.login(username="tester0", password="pass")
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.users[0], state="running"
+        )
+        self.lucky, self.clear = [
+            Question.objects.create(
+                survey=self.survey, text=f"Question {i}?", creator=self.users[0]
+            )
+            for i in (1, 2)
+        ]
+        Answer.objects.create(question=self.lucky, user=self.users[0], answer="yes")
+        for user in self.users:
+            Answer.objects.create(question=self.clear, user=user, answer="no")
+
+    def test_results_are_cached_per_data_version(self):
+        self.survey.refresh_from_db()
+        results = get_question_results(self.survey)
+        self.assertEqual(results[self.lucky.pk]["agree_ratio"], 100)
+        self.assertLess(
+            results[self.lucky.pk]["agree_low"], results[self.clear.pk]["agree_low"]
+        )
+        with self.assertNumQueries(0):
+            get_question_results(self.survey)
+        Answer.objects.create(question=self.lucky, user=self.users[1], answer="no")
+        self.survey.refresh_from_db()
+        self.assertEqual(get_question_results(self.survey)[self.lucky.pk]["total"], 2)
+
+    def test_chart_data_sorts_by_lower_bound(self):
+        url = reverse("survey:survey_chart_data")
+        response = self.client.get(url)
+        self.assertEqual(response.json()["ids"], [self.lucky.pk, self.clear.pk])
+        response = self.client.get(url, {"sort": "agree_low"})
+        self.assertEqual(response.json()["ids"], [self.clear.pk, self.lucky.pk])
+        response = self.client.get(
+            reverse("survey:survey_answers"), {"sort": "agree_low"}
+        )
+        self.assertContains(response, f"{url}?sort=agree_low")
+        # The visible results table uses the same order
+        self.assertEqual(
+            [q.pk for q in response.context["results_rows"]],
+            [self.clear.pk, self.lucky.pk],
+        )
+        results = get_question_results(self.survey)
+        for question in response.context["results_rows"]:
+            self.assertAlmostEqual(
+                question.agree_low, results[question.pk]["agree_low"], places=0
+            )
+
+    def test_intervals_in_json_and_export(self):
+        data = self.client.get(reverse("survey:questions_json")).json()
+        item = next(q for q in data["questions"] if q["id"] == self.clear.pk)
+        self.assertEqual(item["yes_low"], 0.0)
+        self.assertLess(item["yes_high"], 50)
+        response = self.client.get(reverse("survey:survey_answers_wikitext"))
+        rows = json.loads(response.context["json_text"])["data"]
+        self.assertIn("agree_low", rows[0])
@@ -0,0 +1,117 @@
+from unittest import mock
+
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils.translation import activate
+from django.contrib.auth import get_user_model
+
+from ..models import Survey, Question, Answer, refresh_question_tallies
+from ..tables import TABLES, encode_cursor
+
+
+class QuestionTableTests(TransactionTestCase):
+
+    def setUp(self):
+        activate("en")
+        User = get_user_model()
+        self.users = [
+            User.objects.create_user(username=f"tester{i}", password="pass")
+            for i in range(1, 4)
+        ]
+        self.user = self.users[0]
+        self.client.login(username=self.user.username, password="pass")
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=self.user, state="running"
+        )
+        self.questions = [
+            Question.objects.create(
+                survey=self.survey, text=f"Question {i}?", creator=self.user
+            )
+            for i in range(1, 6)
+        ]
+
+    def _answer(self, question, count, answer="yes"):
+        for user in self.users[:count]:
+            Answer.objects.create(question=question, user=user, answer=answer)
+
+    def test_tallies_follow_answers(self):
+        q = self.questions[0]
+        self._answer(q, 2)
+        Answer.objects.create(question=q, user=self.users[2], answer="no")
+        q.refresh_from_db()
+        self.assertEqual((q.answer_count, q.yes_count, q.agree_ratio), (3, 2, 67))
+        q.text = "Edited?"
+        q.save()
+        q.refresh_from_db()
+        self.assertEqual(q.answer_count, 3)
+        Question.objects.filter(pk=q.pk).update(answer_count=0)
+        refresh_question_tallies([q.pk])
+        q.refresh_from_db()
+        self.assertEqual(q.answer_count, 3)
+
+    def test_keyset_pages_cover_all_rows(self):
+        for count, q in zip((2, 0, 3, 2, 1), self.questions):
+            self._answer(q, count)
+        table = TABLES["unanswered"]
+        with mock.patch("wikikysely_project.survey.tables.PAGE_SIZE", 2):
+            page = table.page(self.survey, self.users[2], "answers", "desc")
+            seen = list(page.rows)
+            while page.next:
+                page = table.page(
+                    self.survey, self.users[2], "answers", "desc", after=page.next
+                )
+                seen.extend(page.rows)
+        # users[2] answered only the question with three answers
+        self.assertEqual(
+            [q.pk for q in seen],
+            [self.questions[3].pk, self.questions[0].pk, self.questions[4].pk,
+             self.questions[1].pk],
+        )
+
+    def test_endpoint_sorts_and_pages(self):
+        self._answer(self.questions[1], 1, answer="no")
+        url = reverse("survey:question_table", args=["results"])
+        with mock.patch("wikikysely_project.survey.tables.PAGE_SIZE", 3):
+            data = self.client.get(url, {"sort": "my_answer", "dir": "desc"}).json()
+            self.assertEqual((data["sort"], data["dir"]), ("my_answer", "desc"))
+            self.assertIn(self.questions[1].text, data["html"].split("</tr>")[0])
+            self.assertTrue(data["next"])
+            rest = self.client.get(
+                url, {"sort": "my_answer", "dir": "desc", "after": data["next"]}
+            ).json()
+        self.assertIsNone(rest["next"])
+        self.assertEqual(rest["html"].count("</tr>"), 2)
+        with mock.patch("wikikysely_project.survey.tables.PAGE_SIZE", 3):
+            data = self.client.get(url, {"sort": "agree_low", "dir": "desc"}).json()
+            rest = self.client.get(
+                url, {"sort": "agree_low", "dir": "desc", "after": data["next"]}
+            ).json()
+        self.assertEqual(rest["html"].count("</tr>"), 2)
+        response = self.client.get(url, {"after": "not a cursor"})
+        self.assertEqual(response.status_code, 400)
+        # A well formed cursor with a value of the wrong type
+        cursor = encode_cursor("text", self.questions[0].pk)
+        response = self.client.get(url, {"sort": "answers", "after": cursor})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.get(url, {"sort": "agree_low", "after": cursor})
+        self.assertEqual(response.status_code, 400)
+        # Integers the database cannot bind
+        for cursor in (encode_cursor(2**63, 1), encode_cursor(1, -(2**63) - 1)):
+            response = self.client.get(url, {"sort": "answers", "after": cursor})
+            self.assertEqual(response.status_code, 400)
+
+    def test_editor_tables_require_permission(self):
+        self.client.logout()
+        self.client.login(username="tester2", password="pass")
+        url = reverse("survey:question_table", args=["hidden"])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        url = reverse("survey:question_table", args=["missing"])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_detail_renders_first_page_only(self):
+        with mock.patch("wikikysely_project.survey.tables.PAGE_SIZE", 2):
+            response = self.client.get(reverse("survey:survey_detail"))
+        self.assertEqual(len(response.context["unanswered_questions"]), 2)
+        self.assertTrue(response.context["unanswered_next"])
+        self.assertEqual(response.context["unanswered_count"], 5)
+        self.assertContains(response, "Show more")
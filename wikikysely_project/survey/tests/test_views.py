@@ -1,4 +1,4 @@
-from django.test import TransactionTestCase
+from django.test import TransactionTestCase, override_settings
 from django.urls import reverse
 from django.utils.translation import activate
 from django.contrib.auth import get_user_model
@@ -11,7 +11,9 @@ from ..models import (
     Question,
     Answer,
     SurveyLog,
-    SkippedQuestion,
+    SkipSet,
+    get_skipped_ids,
+    skip_question,
     log_survey_action,
 )
 from unittest.mock import patch
@@ -110,6 +112,9 @@ class SurveyFlowTests(TransactionTestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(Answer.objects.count(), 0)
 
+    @override_settings(
+        SURVEY_QUESTION_SAMPLER="wikikysely_project.survey.sampling.UniformSampler"
+    )
     def test_skipped_questions_record_and_reset(self):
         survey = self._create_survey()
         q1, q2 = self._create_questions(survey, count=2)
@@ -119,18 +124,12 @@ class SurveyFlowTests(TransactionTestCase):
 
             data = {"question_id": q1.pk, "answer": ""}
             response = self.client.post(reverse("survey:answer_survey"), data)
-            self.assertTrue(
-                SkippedQuestion.objects.filter(
-                    user=self.user, question=q1
-                ).exists()
-            )
+            self.assertEqual(get_skipped_ids(self.user, survey), {q1.pk})
             self.assertEqual(response.context["question"], q2)
 
             data = {"question_id": q2.pk, "answer": ""}
             response = self.client.post(reverse("survey:answer_survey"), data)
-            self.assertEqual(
-                SkippedQuestion.objects.filter(user=self.user).count(), 0
-            )
+            self.assertEqual(get_skipped_ids(self.user, survey), set())
             self.assertTemplateUsed(response, "survey/completion.html")
 
     def test_skipping_all_questions_via_answer_question(self):
@@ -141,18 +140,14 @@ class SurveyFlowTests(TransactionTestCase):
         response = self.client.post(
             reverse("survey:answer_question", args=[q1.pk]), data
         )
-        self.assertTrue(
-            SkippedQuestion.objects.filter(user=self.user, question=q1).exists()
-        )
+        self.assertEqual(get_skipped_ids(self.user, survey), {q1.pk})
         self.assertEqual(response.context["question"], q2)
 
         data = {"question_id": q2.pk, "answer": ""}
         response = self.client.post(
             reverse("survey:answer_question", args=[q2.pk]), data
         )
-        self.assertEqual(
-            SkippedQuestion.objects.filter(user=self.user).count(), 0
-        )
+        self.assertEqual(get_skipped_ids(self.user, survey), set())
         self.assertTemplateUsed(response, "survey/completion.html")
 
     def test_skip_last_question_no_skip_message_answer_survey(self):
@@ -227,6 +222,57 @@ class SurveyFlowTests(TransactionTestCase):
         )
         self.assertRedirects(response, next_url)
 
+    def test_answer_json_returns_next_question(self):
+        survey = self._create_survey()
+        q1, q2 = self._create_questions(survey, 2)
+        url = reverse("survey:answer_question", args=[q1.pk])
+        response = self.client.post(
+            url,
+            {"question_id": q1.pk, "answer": "yes"},
+            HTTP_ACCEPT="application/json",
+        )
+        data = response.json()
+        self.assertEqual(data["answered"]["id"], q1.pk)
+        self.assertEqual(data["answered"]["my_answer"], "yes")
+        self.assertEqual(
+            (data["answered"]["yes"], data["answered"]["total"]), (1, 1)
+        )
+        self.assertEqual(data["next"]["id"], q2.pk)
+        self.assertEqual(
+            data["next"]["url"], reverse("survey:answer_question", args=[q2.pk])
+        )
+        self.assertEqual(list(get_messages(response.wsgi_request)), [])
+        # The last question is skipped, so nothing is left
+        response = self.client.post(
+            reverse("survey:answer_survey"),
+            {"question_id": q2.pk, "answer": ""},
+            HTTP_ACCEPT="application/json",
+        )
+        data = response.json()
+        self.assertIsNone(data["next"])
+        self.assertTrue(data["has_skipped"])
+        self.assertEqual(get_skipped_ids(self.user, survey), set())
+
+    def test_answer_json_reports_errors(self):
+        survey = self._create_survey()
+        q1 = self._create_question(survey)
+        url = reverse("survey:answer_question", args=[q1.pk])
+        response = self.client.post(
+            url,
+            {"question_id": q1.pk, "answer": "maybe"},
+            HTTP_ACCEPT="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("answer", response.json()["errors"])
+        self.client.logout()
+        response = self.client.post(
+            url,
+            {"question_id": q1.pk, "answer": "yes"},
+            HTTP_ACCEPT="application/json",
+        )
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(Answer.objects.exists())
+
     def test_survey_edit(self):
         survey = self._create_survey()
         data = {
@@ -465,14 +511,38 @@ class SurveyFlowTests(TransactionTestCase):
         Answer.objects.create(question=question, user=self.user, answer="yes")
         response = self.client.get(reverse("survey:survey_answers"))
         self.assertEqual(response.status_code, 200)
-        data = response.context["data"][0]
-        self.assertEqual(data["yes"], 1)
-        self.assertEqual(data["no"], 0)
-        self.assertIn("published", data)
-        self.assertEqual(data["agree_ratio"], 100)
-        self.assertEqual(data["my_answer"], "Yes")
+        row = response.context["results_rows"][0]
+        self.assertEqual(row.result["yes"], 1)
+        self.assertEqual(row.result["agree_ratio"], 100)
         self.assertEqual(response.context["total_users"], 1)
         self.assertContains(response, "Answer table")
+        self.assertContains(response, reverse("survey:survey_chart_data"))
+
+    def test_chart_data_uses_etag(self):
+        survey = self._create_survey()
+        question = self._create_question(survey)
+        Answer.objects.create(question=question, user=self.user, answer="yes")
+        url = reverse("survey:survey_chart_data")
+        response = self.client.get(url)
+        self.assertEqual(
+            response.json(),
+            {
+                "ids": [question.pk],
+                "labels": [question.text],
+                "yes": [1],
+                "no": [0],
+                "total": [1],
+                "ratio": [100],
+            },
+        )
+        etag = response["ETag"]
+        self.assertIn("no-cache", response["Cache-Control"])
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        Answer.objects.create(question=question, user=self.users[1], answer="no")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["ratio"], [50])
 
     def test_consensus_ratio_calculation(self):
         survey = self._create_survey()
@@ -489,9 +559,8 @@ class SurveyFlowTests(TransactionTestCase):
         Answer.objects.create(question=question, user=extra_users[2], answer="no")
         Answer.objects.create(question=question, user=extra_users[3], answer="no")
 
-        response = self.client.get(reverse("survey:survey_answers"))
-        data = response.context["data"][0]
-        self.assertEqual(data["agree_ratio"], 60)
+        response = self.client.get(reverse("survey:survey_chart_data"))
+        self.assertEqual(response.json()["ratio"], [60])
 
     def test_results_view_displays_my_answer_column(self):
         survey = self._create_survey()
@@ -641,7 +710,7 @@ class SurveyFlowTests(TransactionTestCase):
     def test_userinfo_download_includes_skipped_question_ids(self):
         survey = self._create_survey()
         q = self._create_question(survey)
-        SkippedQuestion.objects.create(user=self.user, question=q)
+        skip_question(self.user, q)
 
         response = self.client.get(reverse("survey:userinfo_download"))
         self.assertEqual(response.status_code, 200)
@@ -683,12 +752,12 @@ class SurveyFlowTests(TransactionTestCase):
     def test_userinfo_shows_skipped_questions(self):
         survey = self._create_survey()
         q = Question.objects.create(survey=survey, text="Skipped Q", creator=self.users[1])
-        SkippedQuestion.objects.create(user=self.user, question=q)
+        skip_question(self.user, q)
 
         response = self.client.get(reverse("survey:userinfo"))
         self.assertEqual(response.status_code, 200)
         skipped = list(response.context["skipped_questions"])
-        self.assertEqual(skipped[0].question, q)
+        self.assertEqual(skipped[0], q)
         self.assertContains(response, q.text)
 
     def test_user_data_delete_removes_answers_and_questions(self):
@@ -739,6 +808,43 @@ class SurveyFlowTests(TransactionTestCase):
         User = get_user_model()
         self.assertTrue(User.objects.filter(pk=self.user.pk).exists())
 
+    def test_user_data_delete_preview_does_not_delete(self):
+        survey = self._create_survey()
+        q1 = self._create_question(survey, text="Mine?")
+        q2 = self._create_question(survey, text="Answered?")
+        Answer.objects.create(question=q1, user=self.user, answer="yes")
+        Answer.objects.create(question=q2, user=self.users[1], answer="no")
+
+        response = self.client.get(
+            reverse("survey:user_data_delete") + "?preview=1"
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["removed_answers"], 1)
+        self.assertEqual(data["removed_questions"], 1)
+        self.assertEqual(data["kept_questions"], 1)
+        self.assertEqual(data["kept_surveys"], 1)
+        self.assertTrue(data["has_questions"])
+        self.assertEqual(Answer.objects.filter(user=self.user).count(), 1)
+        self.assertTrue(Question.objects.filter(pk=q1.pk).exists())
+
+    def test_user_data_delete_preview_matches_delete(self):
+        survey = self._create_survey()
+        questions = self._create_questions(survey, count=4)
+        Answer.objects.create(question=questions[0], user=self.users[1], answer="no")
+        for q in questions:
+            Answer.objects.create(question=q, user=self.user, answer="yes")
+        skip_question(self.users[1], questions[1])
+
+        from ..views import delete_user_data
+
+        preview = delete_user_data(self.user, dry_run=True)
+        result = delete_user_data(self.user)
+        self.assertEqual(preview, result)
+        self.assertEqual(result["removed_questions"], 3)
+        self.assertEqual(list(Question.objects.all()), [questions[0]])
+        self.assertEqual(get_skipped_ids(self.users[1], survey), set())
+
     def test_delete_answer_returns_unanswered_count(self):
         survey = self._create_survey()
         q = self._create_question(survey)
@@ -808,10 +914,10 @@ class SurveyFlowTests(TransactionTestCase):
     def test_user_data_delete_removes_skipped_questions(self):
         survey = self._create_survey()
         q = self._create_question(survey)
-        SkippedQuestion.objects.create(user=self.user, question=q)
+        skip_question(self.user, q)
 
         response = self.client.post(reverse("survey:user_data_delete"), follow=True)
         self.assertRedirects(response, reverse("survey:survey_detail"))
-        self.assertFalse(SkippedQuestion.objects.filter(user=self.user).exists())
+        self.assertFalse(SkipSet.objects.filter(user=self.user).exists())
         self.assertContains(response, "Removed data from skipped questions.")
 
@@ -0,0 +1,26 @@
+from django.test import TransactionTestCase
+from django.contrib.auth import get_user_model
+
+from ..models import Survey, Question
+from ..similarity import question_index
+from ..warmup import STEPS, warm_up
+
+
+class WarmUpTests(TransactionTestCase):
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username="tester", password="pass")
+        self.survey = Survey.objects.create(
+            title="Test Survey", creator=user, state="running"
+        )
+        Question.objects.create(survey=self.survey, text="Question?", creator=user)
+
+    def test_runs_every_step(self):
+        with self.assertNoLogs("wikikysely_project.survey.warmup", "ERROR"):
+            timings = warm_up()
+        self.assertEqual([name for name, _ in timings], [name for name, _ in STEPS])
+        self.survey.refresh_from_db()
+        self.assertEqual(
+            (question_index.survey_id, question_index.version),
+            (self.survey.pk, self.survey.catalog_version),
+        )
@@ -6,11 +6,19 @@ app_name = "survey"
 urlpatterns = [
     path("", views.survey_detail, name="survey_detail"),
     path("questions.json", views.questions_json, name="questions_json"),
+    path("questions/search/", views.question_search, name="question_search"),
+    path("questions/table/<str:name>/", views.question_table, name="question_table"),
     path("survey/create/", views.survey_create, name="survey_create"),
     path("register/", views.register, name="register"),
     path("survey/edit/", views.survey_edit, name="survey_edit"),
     path("survey/answer/", views.answer_survey, name="answer_survey"),
     path("survey/question/add/", views.question_add, name="question_add"),
+    path("survey/question/similar/", views.question_similar, name="question_similar"),
+    path(
+        "survey/questions/visibility/",
+        views.question_visibility,
+        name="question_visibility",
+    ),
     path("question/<int:pk>/edit/", views.question_edit, name="question_edit"),
     path("question/<int:pk>/hide/", views.question_hide, name="question_hide"),
     path("question/<int:pk>/delete/", views.question_delete, name="question_delete"),
@@ -33,4 +41,9 @@ urlpatterns = [
         views.survey_answers_wikitext,
         name="survey_answers_wikitext",
     ),
+    path("answers/chart.json", views.survey_chart_data, name="survey_chart_data"),
+    path("answers/activity.json", views.survey_activity, name="survey_activity"),
+    path("answers/export/", views.survey_answers_export, name="survey_answers_export"),
+    path("answers/analysis/", views.survey_analysis, name="survey_analysis"),
+    path("jobs/<int:pk>/", views.job_status, name="job_status"),
 ]
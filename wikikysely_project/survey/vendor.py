@@ -0,0 +1,21 @@
+"""Third party browser libraries served from ``static/vendor``.
+
+``manage.py vendor_assets`` downloads the pinned files from the URLs
+below. Until a file has been downloaded, and collected when a static
+manifest is in use, templates load it from the CDN.
+"""
+
+VENDOR_ASSETS = {
+    "bootstrap": (
+        "vendor/bootstrap.5.3.2.bundle.min.js",
+        "https://tools-static.wmflabs.org/cdnjs/ajax/libs/bootstrap/5.3.2/js/bootstrap.bundle.min.js",
+    ),
+    "chart.js": (
+        "vendor/chart.4.4.1.umd.min.js",
+        "https://tools-static.wmflabs.org/cdnjs/ajax/libs/Chart.js/4.4.1/chart.umd.min.js",
+    ),
+    "chartjs-plugin-datalabels": (
+        "vendor/chartjs-plugin-datalabels.2.2.0.min.js",
+        "https://tools-static.wmflabs.org/cdnjs/ajax/libs/chartjs-plugin-datalabels/2.2.0/chartjs-plugin-datalabels.min.js",
+    ),
+}
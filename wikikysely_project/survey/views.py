@@ -1,4 +1,3 @@
-import random
 from django.contrib import messages
 from django.urls import reverse, resolve, Resolver404
 from django.contrib.auth import login, logout
@@ -11,21 +10,68 @@ from django.http import Http404
 from django.template.loader import render_to_string
 from django.utils.translation import gettext_lazy as _, gettext, ngettext
 from django.utils.html import format_html, format_html_join
-from django.db.models import Count, Q, F, FloatField, ExpressionWrapper, Max, Subquery
-from django.db.models.functions import NullIf, TruncDate, Greatest, Round
-from django.http import JsonResponse
-from datetime import timedelta
+from django.db import transaction
+from django.db.models import (
+    Count,
+    Q,
+    Max,
+    Exists,
+    OuterRef,
+)
+from django.db.models.functions import TruncDate
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+from datetime import datetime, timedelta, timezone as dt_timezone
 from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 import json
+import secrets
+from urllib.parse import urlencode
 from .models import (
     Survey,
     Question,
     Answer,
-    SkippedQuestion,
+    AnswerEvent,
     log_survey_action,
     SurveyLog,
+    Job,
+    Participation,
+    SkipSet,
+    bump_catalog_version,
+    clear_skips,
+    delete_questions,
+    discard_skips,
+    get_participant_counts,
+    get_skipped_ids,
+    record_answer,
+    refresh_question_tallies,
+    remove_answer,
+    set_questions_visible,
+    survey_log_entry,
+    unpack_ids,
+)
+from .activity import DAY, HOUR, PERIODS, bucket_start, get_activity
+from .answering import (
+    advance,
+    answer_and_advance,
+    pick_question,
+    question_data,
+    save_answer,
+)
+from .jobs import USER_JOBS, enqueue_job
+from .permissions import can_edit_survey
+from .sampling import get_sampler
+from .search import search_questions
+from .stats import EMPTY_RESULT, get_chart_data, get_question_results
+from .tables import TABLES, with_tallies
+from .similarity import (
+    NEAR_DUPLICATE_THRESHOLD,
+    question_index,
+    similar_questions,
 )
 from .forms import SurveyForm, QuestionForm, AnswerForm, SecretaryAddForm
+from .templatetags.markdown_extras import render_markdown
 from django.contrib.auth import get_user_model
 
 LOGIN_REQUIRED_VIEWS = {
@@ -43,53 +89,38 @@ LOGIN_REQUIRED_VIEWS = {
 }
 
 
-def can_edit_survey(user, survey):
-    return (
-        user == survey.creator
-        or user.is_superuser
-        or survey.secretaries.filter(pk=user.pk).exists()
-    )
+def get_main_survey(request):
+    """Return the main survey, looked up at most once per request."""
+    if not hasattr(request, "_main_survey"):
+        request._main_survey = Survey.get_main_survey()
+    return request._main_survey
+
+
+def request_can_edit(request, survey):
+    """Return ``can_edit_survey`` for the request user, once per request."""
+    results = request.__dict__.setdefault("_can_edit", {})
+    if survey.pk not in results:
+        results[survey.pk] = can_edit_survey(request.user, survey)
+    return results[survey.pk]
 
 
 def get_user_answers(user, survey):
-    """Return user's answers for the survey with aggregated stats."""
+    """Return user's answers for the survey with the stored question tallies."""
     if not getattr(user, "is_authenticated", False):
         return Answer.objects.none()
-    return (
+    return with_tallies(
         Answer.objects.filter(
             user=user, question__survey=survey, question__visible=True
         )
-        .select_related("question")
-        .annotate(
-            yes_count=Count(
-                "question__answers",
-                filter=Q(question__answers__answer="yes"),
-                distinct=True,
-            ),
-            total_answers=Count("question__answers", distinct=True),
-        )
-        .annotate(
-            agree_ratio=ExpressionWrapper(
-                Round(
-                    Greatest(F("yes_count"), F("total_answers") - F("yes_count"))
-                    * 100.0
-                    / NullIf(F("total_answers"), 0)
-                ),
-                output_field=FloatField(),
-            )
-        )
-        .order_by("-created_at")
-    )
+    ).order_by("-created_at")
 
 
 def get_question_stats(question, user=None):
     """Return aggregated statistics for a single question."""
-    yes_count = question.answers.filter(answer="yes").count()
-    no_count = question.answers.filter(answer="no").count()
-    total = yes_count + no_count
-    agree_ratio = (
-        round((max(yes_count, no_count) / total) * 100)
-    ) if total else 0
+    yes_count = question.yes_count
+    total = question.answer_count
+    no_count = total - yes_count
+    agree_ratio = question.agree_ratio
     user_answer = None
     if user and user.is_authenticated:
         ans = Answer.objects.filter(question=question, user=user).first()
@@ -123,7 +154,7 @@ def get_question_stats(question, user=None):
 
 def get_login_redirect_url(request):
     """Return default post-login redirect based on unanswered questions."""
-    survey = Survey.get_main_survey()
+    survey = get_main_survey(request)
     if survey is None:
         return reverse("survey:survey_create")
     answered_ids = Answer.objects.filter(
@@ -197,95 +228,50 @@ def survey_logout(request):
 
 
 def survey_detail(request):
-    survey = Survey.get_main_survey()
+    survey = get_main_survey(request)
     if survey is None:
         if request.user.is_authenticated:
             return redirect("survey:survey_create")
         messages.info(request, _("No surveys"))
         return render(request, "survey/survey_list.html", {"surveys": []})
 
-    questions = survey.questions.filter(visible=True).prefetch_related(
-        'answers'
-    ).order_by("pk")
-
-    # Defaults for user not logged in
-    user_answers = []
-    unanswered_questions = questions
-    unanswered_count = 0
-
+    question_count = survey.questions.filter(visible=True).count()
+    unanswered = TABLES["unanswered"].page(survey, request.user)
+    answered = TABLES["answered"].page(survey, request.user)
     if request.user.is_authenticated:
-        user_answers_qs = (
-            Answer.objects.filter(
-                user=request.user,
-                question__survey=survey,
-                question__visible=True,
-            )
-            .select_related("question")
-            .annotate(
-                yes_count=Count(
-                    "question__answers",
-                    filter=Q(question__answers__answer="yes"),
-                    distinct=True,
-                ),
-                total_answers=Count("question__answers", distinct=True),
-            )
-        )
-        answered_ids = set(user_answers_qs.values_list("question_id", flat=True))
-        user_answers = list(user_answers_qs)
-        for ans in user_answers:
-            ans.agree_ratio = calculate_agree_ratio(ans.yes_count, ans.total_answers)
+        unanswered_count = TABLES["unanswered"].rows(survey, request.user).count()
     else:
-        answered_ids = set()
+        unanswered_count = question_count
 
-    unanswered_questions = [q for q in questions if q.id not in answered_ids]
-    unanswered_count = len(unanswered_questions)
-
-    for question in questions:
-        question.yes_count = sum(1 for a in question.answers.all() if a.answer == "yes")
-        question.total_answers = question.answers.count()
-        question.agree_ratio = calculate_agree_ratio(question.yes_count, question.total_answers)
-    
-    can_edit = can_edit_survey(request.user, survey)
+    can_edit = request_can_edit(request, survey)
 
     dev_url = f"https://wikikysely-dev.toolforge.org/{request.LANGUAGE_CODE}"
-    
+
     return render(
         request,
         "survey/survey_detail.html",
         {
             "survey": survey,
-            "questions": questions,
+            "question_count": question_count,
             "can_edit": can_edit,
-            "user_answers": user_answers,
+            "user_answers": answered.rows,
+            "answered_next": answered.next,
             "unanswered_count": unanswered_count,
-            "unanswered_questions": unanswered_questions,
+            "unanswered_questions": unanswered.rows,
+            "unanswered_next": unanswered.next,
             "dev_url": dev_url,
         },
     )
 
 
-def calculate_agree_ratio(yes_count, total_answers):
-    """Calculate agree ratio in Python to reduce database load"""
-    if total_answers == 0:
-        return 0
-    return round((max(yes_count, total_answers - yes_count) / total_answers) * 100)
-
-
 def questions_json(request):
     """Return survey questions and aggregated statistics as JSON."""
-    survey = Survey.get_main_survey()
+    survey = get_main_survey(request)
     if survey is None:
         return JsonResponse({"questions": []})
 
-    questions = (
-        survey.questions.filter(visible=True)
-        .annotate(
-            yes_count=Count("answers", filter=Q(answers__answer="yes")),
-            no_count=Count("answers", filter=Q(answers__answer="no")),
-            total_answers=Count("answers"),
-        )
-        .order_by("pk")
-    )
+    questions = survey.questions.filter(visible=True).order_by("pk")
+    results = get_question_results(survey)
 
     user_answers = {}
     if request.user.is_authenticated:
@@ -298,14 +284,18 @@ def questions_json(request):
 
     data = []
     for q in questions:
+        result = results.get(q.pk, EMPTY_RESULT)
         item = {
             "id": q.id,
             "text": q.text,
             "created_at": q.created_at,
-            "total_answers": q.total_answers,
-            "yes_count": q.yes_count,
-            "no_count": q.no_count,
-            "agree_ratio": calculate_agree_ratio(q.yes_count, q.total_answers),
+            "total_answers": result["total"],
+            "yes_count": result["yes"],
+            "no_count": result["no"],
+            "agree_ratio": result["agree_ratio"],
+            "yes_low": result["yes_low"],
+            "yes_high": result["yes_high"],
+            "agree_low": result["agree_low"],
         }
         ans = user_answers.get(q.id)
         if ans:
@@ -327,6 +317,7 @@ def survey_create(request):
             survey = form.save(commit=False)
             survey.creator = request.user
             survey.save()
+            render_markdown(survey.description)
             messages.success(request, _("Survey created"))
             return redirect("survey:survey_detail")
     else:
@@ -336,23 +327,25 @@ def survey_create(request):
 
 @login_required
 def survey_edit(request):
-    survey = Survey.get_main_survey()
+    survey = get_main_survey(request)
     if survey is None:
         return redirect("survey:survey_create")
-    if not can_edit_survey(request.user, survey):
+    if not request_can_edit(request, survey):
         messages.error(request, _("No permission"))
         return redirect("survey:survey_detail")
     if request.method == "POST":
         form = SurveyForm(request.POST, instance=survey)
         if form.is_valid():
             survey = form.save()
+            # Pre-render the description so detail pages hit the cache
+            render_markdown(survey.description)
             log_survey_action(request.user, survey, "survey_update")
             messages.success(request, _("Survey updated"))
             return redirect("survey:survey_detail")
     else:
         form = SurveyForm(instance=survey)
-    active_questions = survey.questions.filter(visible=True)
-    hidden_questions = survey.questions.filter(visible=False)
+    active = TABLES["active"].page(survey, request.user)
+    hidden = TABLES["hidden"].page(survey, request.user)
     secretaries = survey.secretaries.all()
     secretary_form = SecretaryAddForm()
     logs = (
@@ -366,8 +359,10 @@ def survey_edit(request):
             "form": form,
             "survey": survey,
             "is_edit": True,
-            "active_questions": active_questions,
-            "hidden_questions": hidden_questions,
+            "active_questions": active.rows,
+            "active_next": active.next,
+            "hidden_questions": hidden.rows,
+            "hidden_next": hidden.next,
             "secretaries": secretaries,
             "secretary_form": secretary_form,
             "logs": logs,
@@ -377,7 +372,7 @@ def survey_edit(request):
 
 
 def question_add(request):
-    survey = Survey.get_main_survey()
+    survey = get_main_survey(request)
     if survey is None:
         return redirect("survey:survey_create")
     if survey.state == "closed":
@@ -391,6 +386,7 @@ def question_add(request):
         messages.error(request, _("No permission"))
         return redirect("survey:survey_detail")
     login_message = None
+    similar = []
     if not request.user.is_authenticated:
         login_url = f"{reverse('social:begin', args=['mediawiki'])}?next={request.path}"
         login_message = format_html(
@@ -407,7 +403,7 @@ def question_add(request):
         form = QuestionForm(request.POST)
         if form.is_valid():
             text = form.cleaned_data["text"].strip()
-            existing = survey.questions.filter(text__iexact=text, visible=True).first()
+            existing, similar = find_duplicate_questions(request, survey, text)
             if existing:
                 yes_count = existing.answers.filter(answer="yes").count()
                 no_count = existing.answers.filter(answer="no").count()
@@ -428,7 +424,7 @@ def question_add(request):
                         "no": no_count,
                     },
                 )
-            else:
+            elif not similar:
                 question = form.save(commit=False)
                 question.survey = survey
                 question.creator = request.user
@@ -443,7 +439,92 @@ def question_add(request):
     return render(
         request,
         "survey/question_form.html",
-        {"form": form, "survey": survey, "login_message": login_message},
+        {
+            "form": form,
+            "survey": survey,
+            "login_message": login_message,
+            "similar_questions": similar,
+        },
+    )
+
+
+def question_search(request):
+    """Return a page of questions matching ``q`` as JSON, best match first."""
+    survey = get_main_survey(request)
+    text = request.GET.get("q", "").strip()
+    if survey is None or not text:
+        return JsonResponse({"results": [], "count": 0, "page": 1, "has_next": False})
+    try:
+        page = max(1, int(request.GET.get("page", 1)))
+    except ValueError:
+        page = 1
+    data = search_questions(survey, text[:200], user=request.user, page=page)
+    for item in data["results"]:
+        item["url"] = reverse("survey:answer_question", args=[item["id"]])
+    return JsonResponse(data)
+
+
+def find_duplicate_questions(request, survey, text, exclude=None):
+    """Return ``(existing, similar)`` for a question text being saved.
+
+    ``existing`` is a visible question with the same text ignoring case and
+    punctuation. ``similar`` lists near-duplicates that the author has to
+    confirm by submitting the form again with ``confirm_similar``.
+    """
+    existing_pk = question_index.find_exact(survey, text, exclude=exclude)
+    if existing_pk:
+        return survey.questions.get(pk=existing_pk), []
+    if request.POST.get("confirm_similar"):
+        return None, []
+    return None, similar_questions(
+        survey, text, threshold=NEAR_DUPLICATE_THRESHOLD, exclude=exclude
+    )
+
+
+def question_similar(request):
+    """Return visible questions similar to ``q`` with their tallies as JSON."""
+    survey = get_main_survey(request)
+    text = request.GET.get("q", "").strip()
+    if survey is None or not text:
+        return JsonResponse({"questions": []})
+    try:
+        exclude = int(request.GET["exclude"])
+    except (KeyError, ValueError):
+        exclude = None
+    results = similar_questions(survey, text[:500], exclude=exclude)
+    for item in results:
+        item["url"] = reverse("survey:answer_question", args=[item["id"]])
+    return JsonResponse({"questions": results})
+
+
+def question_table(request, name):
+    """Return one page of a server side sorted question table as JSON."""
+    table = TABLES.get(name)
+    survey = get_main_survey(request)
+    if table is None or survey is None:
+        raise Http404
+    if table.editors_only and not request_can_edit(request, survey):
+        raise Http404
+    try:
+        page = table.page(
+            survey,
+            request.user,
+            sort=request.GET.get("sort"),
+            direction=request.GET.get("dir"),
+            after=request.GET.get("after"),
+        )
+    except ValueError:
+        return JsonResponse({"error": "Invalid cursor"}, status=400)
+    next_path = request.GET.get("next", "")
+    if not next_path.startswith("/") or next_path.startswith("//"):
+        next_path = reverse("survey:survey_detail")
+    html = render_to_string(
+        table.template,
+        {"rows": page.rows, "survey": survey, "next_path": next_path},
+        request=request,
+    )
+    return JsonResponse(
+        {"html": html, "next": page.next, "sort": page.sort, "dir": page.direction}
     )
 
 
@@ -453,7 +534,7 @@ def question_hide(request, pk):
     question = get_object_or_404(Question, pk=pk, visible=True)
     survey = question.survey
 
-    if not can_edit_survey(request.user, survey):
+    if not request_can_edit(request, survey):
         messages.error(request, _("No permission"))
         return redirect("survey:survey_detail")
 
@@ -478,7 +559,7 @@ def question_hide(request, pk):
     if next_url:
         return redirect(next_url)
 
-    if can_edit_survey(request.user, survey):
+    if request_can_edit(request, survey):
         return redirect("survey:survey_edit")
     return redirect("survey:survey_detail")
 
@@ -487,7 +568,7 @@ def question_hide(request, pk):
 def question_show(request, pk):
     question = get_object_or_404(Question, pk=pk, visible=False)
     survey = question.survey
-    if not can_edit_survey(request.user, survey):
+    if not request_can_edit(request, survey):
         messages.error(request, _("No permission"))
         return redirect("survey:survey_edit")
     if survey.state == "closed":
@@ -506,6 +587,55 @@ def question_show(request, pk):
     return redirect("survey:survey_edit")
 
 
+@login_required
+def question_visibility(request):
+    """Hide (``visible=0``) or show (``visible=1``) the posted questions."""
+    survey = get_main_survey(request)
+    if survey is None:
+        return redirect("survey:survey_create")
+    if request.method != "POST" or not request_can_edit(request, survey):
+        messages.error(request, _("No permission"))
+        return redirect("survey:survey_detail")
+    if survey.state == "closed":
+        messages.error(request, _("Cannot edit questions in a closed survey"))
+        return redirect("survey:survey_edit")
+    visible = request.POST.get("visible") == "1"
+    question_ids = [
+        int(pk) for pk in request.POST.getlist("question_ids") if pk.isdigit()
+    ]
+    with transaction.atomic():
+        changed = set_questions_visible(survey, question_ids, visible)
+        action = "question_show" if visible else "question_hide"
+        SurveyLog.objects.bulk_create(
+            (
+                SurveyLog(
+                    data=survey_log_entry(
+                        request.user,
+                        survey,
+                        action,
+                        question_id=pk,
+                        question_text=text,
+                    )
+                )
+                for pk, text in changed
+            ),
+            batch_size=1000,
+        )
+    if request.headers.get("X-Requested-With") == "XMLHttpRequest":
+        return JsonResponse({"changed": [pk for pk, text in changed]})
+    count = len(changed)
+    if visible:
+        message = ngettext(
+            "%(count)d question visible", "%(count)d questions visible", count
+        )
+    else:
+        message = ngettext(
+            "%(count)d question hidden", "%(count)d questions hidden", count
+        )
+    messages.success(request, message % {"count": count})
+    return redirect("survey:survey_edit")
+
+
 @login_required
 def question_delete(request, pk):
     """Permanently delete a question if it has no answers."""
@@ -524,7 +654,7 @@ def question_delete(request, pk):
         messages.error(request, _("Cannot remove questions from a closed survey"))
         return redirect("survey:survey_detail")
 
-    question.delete()
+    delete_questions([question])
     if request.headers.get("X-Requested-With") == "XMLHttpRequest":
         return JsonResponse({"deleted": True})
     messages.success(request, _("Question removed"))
@@ -545,10 +675,10 @@ def question_delete(request, pk):
 
 @login_required
 def secretary_add(request):
-    survey = Survey.get_main_survey()
+    survey = get_main_survey(request)
     if survey is None:
         return redirect("survey:survey_create")
-    if not can_edit_survey(request.user, survey):
+    if not request_can_edit(request, survey):
         messages.error(request, _("No permission"))
         return redirect("survey:survey_detail")
     if request.method == "POST":
@@ -574,10 +704,10 @@ def secretary_add(request):
 
 @login_required
 def secretary_remove(request, user_id):
-    survey = Survey.get_main_survey()
+    survey = get_main_survey(request)
     if survey is None:
         return redirect("survey:survey_create")
-    if not can_edit_survey(request.user, survey):
+    if not request_can_edit(request, survey):
         messages.error(request, _("No permission"))
         return redirect("survey:survey_detail")
     User = get_user_model()
@@ -620,14 +750,13 @@ def question_edit(request, pk):
         messages.error(request, _("Cannot edit questions in a closed survey"))
         return redirect("survey:survey_detail")
 
+    similar = []
     if request.method == "POST":
         form = QuestionForm(request.POST, instance=question)
         if form.is_valid():
             text = form.cleaned_data["text"].strip()
-            existing = (
-                survey.questions.filter(text__iexact=text, visible=True)
-                .exclude(pk=question.pk)
-                .first()
+            existing, similar = find_duplicate_questions(
+                request, survey, text, exclude=question.pk
             )
             if existing:
                 yes_count = existing.answers.filter(answer="yes").count()
@@ -649,7 +778,7 @@ def question_edit(request, pk):
                         "no": no_count,
                     },
                 )
-            else:
+            elif not similar:
                 form.save()
                 messages.success(request, _("Question updated"))
                 if request.user == survey.creator or request.user.is_superuser:
@@ -661,12 +790,115 @@ def question_edit(request, pk):
     return render(
         request,
         "survey/question_form.html",
-        {"form": form, "survey": survey, "is_edit": True, "can_delete_question": can_delete_question},
+        {
+            "form": form,
+            "survey": survey,
+            "is_edit": True,
+            "can_delete_question": can_delete_question,
+            "similar_questions": similar,
+        },
+    )
+
+
+def wants_json(request):
+    """Return whether the client asked for a JSON response."""
+    return "application/json" in request.headers.get("Accept", "")
+
+
+def _login_to_answer(request):
+    """Add the log in prompt of the answer pages and return the login URL."""
+    login_url = f"{reverse('social:begin', args=['mediawiki'])}?next={request.path}"
+    messages.info(
+        request,
+        format_html(
+            _(
+                'To answer the question you must log in. '
+                '<a href="{0}">Log in with your Wikimedia account</a>.'
+            ),
+            login_url,
+        ),
+    )
+    return login_url
+
+
+def _answer_message(request, question, answer_value):
+    """Confirm the answer or skip of ``question`` to the user."""
+    if answer_value:
+        messages.success(
+            request,
+            gettext(
+                'Answered question #{number}: "{question}" with "{answer}"'
+            ).format(
+                number=question.pk,
+                question=question.text,
+                answer=gettext("Yes") if answer_value == "yes" else gettext("No"),
+            ),
+        )
+    else:
+        messages.info(
+            request,
+            gettext('Skipped question #{number}: "{question}"').format(
+                number=question.pk,
+                question=question.text,
+            ),
+        )
+
+
+def _advance_response(step, answer_value):
+    """Return the JSON answer of an ``answer_and_advance`` step."""
+    return JsonResponse(
+        {
+            "success": True,
+            "answered": question_data(step.question, answer_value or None),
+            "next": (
+                question_data(step.next_question) if step.next_question else None
+            ),
+            "has_skipped": step.has_skipped,
+        }
+    )
+
+
+def _completion(request, survey, step):
+    return render(
+        request,
+        "survey/completion.html",
+        {"survey": survey, "has_skipped": step.has_skipped},
+    )
+
+
+def _render_answer_page(request, survey, question, form, **context):
+    user_answers = get_user_answers(request.user, survey)
+    if request.user.is_authenticated and question:
+        user_answers = user_answers.exclude(question=question)
+    question_stats = get_question_stats(question, request.user) if question else None
+    max_total = (
+        survey.questions.filter(visible=True)
+        .aggregate(max_total=Max("answer_count"))
+        .get("max_total")
+        or 0
+    )
+    timeline_data = json.dumps(question_stats["timeline"]) if question_stats else "[]"
+    return render(
+        request,
+        "survey/answer_form.html",
+        {
+            "survey": survey,
+            "question": question,
+            "form": form,
+            "user_answers": user_answers,
+            "question_stats": question_stats,
+            "max_total": max_total,
+            "timeline_data": timeline_data,
+            "yes_label": gettext("Yes"),
+            "no_label": gettext("No"),
+            "no_answers_label": gettext("No answers"),
+            **context,
+        },
     )
 
 
 def answer_survey(request):
-    survey = Survey.get_main_survey()
+    survey = get_main_survey(request)
     if survey is None:
         return redirect("survey:survey_create")
     if survey.state == "paused":
@@ -676,22 +908,15 @@ def answer_survey(request):
         messages.error(request, _("Survey not active"))
         return redirect("survey:survey_detail")
     if not request.user.is_authenticated:
-        login_url = f"{reverse('social:begin', args=['mediawiki'])}?next={request.path}"
-        messages.info(
-            request,
-            format_html(
-                _(
-                    'To answer the question you must log in. '
-                    '<a href="{0}">Log in with your Wikimedia account</a>.'
-                ),
-                login_url,
-            ),
+        login_url = _login_to_answer(request)
+        if request.method == "POST" and wants_json(request):
+            return JsonResponse(
+                {"success": False, "login_url": login_url}, status=403
+            )
+        skip_id = request.GET.get("skip", "")
+        question = pick_question(
+            survey, exclude=[int(skip_id)] if skip_id.isdigit() else []
         )
-        remaining = survey.questions.filter(visible=True)
-        skip_id = request.GET.get("skip")
-        if skip_id:
-            remaining = remaining.exclude(id=skip_id)
-        question = random.choice(list(remaining)) if remaining else None
         if not question:
             messages.info(request, _("No more questions"))
             return redirect("survey:survey_detail")
@@ -706,146 +931,38 @@ def answer_survey(request):
         )
         if form.is_valid():
             answer_value = form.cleaned_data["answer"]
-            skip_message = False
-            answered_question = question
-            if answer_value:
-                Answer.objects.update_or_create(
-                    user=request.user,
-                    question=question,
-                    defaults={"answer": answer_value},
-                )
-                SkippedQuestion.objects.filter(
-                    user=request.user, question=question
-                ).delete()
-            else:
-                SkippedQuestion.objects.get_or_create(
-                    user=request.user, question=question
-                )
-                skip_message = True
-
-            answered_questions = Answer.objects.filter(
-                user=request.user,
-                question__survey=survey,
-            ).values_list("question_id", flat=True)
-            skipped_questions = SkippedQuestion.objects.filter(
+            step = answer_and_advance(request.user, question, answer_value)
+            if wants_json(request):
+                return _advance_response(step, answer_value)
+            if step.next_question is None:
+                return _completion(request, survey, step)
+            _answer_message(request, question, answer_value)
+            question = step.next_question
+            form = AnswerForm(initial={"question_id": question.pk})
+        elif wants_json(request):
+            return JsonResponse({"success": False, "errors": form.errors}, status=400)
+    else:
+        answered_questions = set(
+            Answer.objects.filter(
                 user=request.user,
                 question__survey=survey,
             ).values_list("question_id", flat=True)
-            remaining = (
-                survey.questions.filter(visible=True)
-                .exclude(id__in=answered_questions)
-                .exclude(id__in=skipped_questions)
-            )
-            if not remaining:
-                has_skipped = SkippedQuestion.objects.filter(
-                    user=request.user, question__survey=survey
-                ).exists()
-                SkippedQuestion.objects.filter(
-                    user=request.user, question__survey=survey
-                ).delete()
-                return render(
-                    request,
-                    "survey/completion.html",
-                    {"survey": survey, "has_skipped": has_skipped},
-                )
-            if not answer_value:
-                remaining = remaining.exclude(id=question.pk)
-            question = random.choice(list(remaining)) if remaining else None
-            answer_label = (
-                gettext("Yes") if answer_value == "yes" else gettext("No")
-                if answer_value else ""
-            )
-            if answer_value:
-                messages.success(
-                    request,
-                    gettext(
-                        'Answered question #{number}: "{question}" with "{answer}"'
-                    ).format(
-                        number=answered_question.pk,
-                        question=answered_question.text,
-                        answer=answer_label,
-                    ),
-                )
-            if skip_message:
-                messages.info(
-                    request,
-                    gettext('Skipped question #{number}: "{question}"').format(
-                        number=answered_question.pk,
-                        question=answered_question.text,
-                    ),
-                )
-            if not question:
-                has_skipped = False
-                return render(
-                    request,
-                    "survey/completion.html",
-                    {"survey": survey, "has_skipped": has_skipped},
-                )
-            form = AnswerForm(initial={"question_id": question.pk})
-    else:
-        answered_questions = Answer.objects.filter(
-            user=request.user,
-            question__survey=survey,
-        ).values_list("question_id", flat=True)
-        skipped_questions = SkippedQuestion.objects.filter(
-            user=request.user,
-            question__survey=survey,
-        ).values_list("question_id", flat=True)
-        remaining = (
-            survey.questions.filter(visible=True)
-            .exclude(id__in=answered_questions)
-            .exclude(id__in=skipped_questions)
         )
-        if not remaining:
-            has_skipped = SkippedQuestion.objects.filter(
-                user=request.user, question__survey=survey
-            ).exists()
-            SkippedQuestion.objects.filter(
-                user=request.user, question__survey=survey
-            ).delete()
-            remaining = survey.questions.filter(visible=True).exclude(
-                id__in=answered_questions
-            )
-            if not remaining:
+        skipped_questions = get_skipped_ids(request.user, survey)
+        question = pick_question(survey, answered_questions | skipped_questions)
+        if not question:
+            has_skipped = bool(skipped_questions)
+            clear_skips(request.user, survey)
+            question = pick_question(survey, answered_questions)
+            if not question:
                 return render(
                     request,
                     "survey/completion.html",
                     {"survey": survey, "has_skipped": has_skipped},
                 )
-        question = random.choice(list(remaining)) if remaining else None
         form = AnswerForm(initial={"question_id": question.pk})
 
-    user_answers = get_user_answers(request.user, survey)
-    if request.user.is_authenticated and question:
-        user_answers = user_answers.exclude(question=question)
-    question_stats = get_question_stats(question, request.user) if question else None
-    max_total = (
-        survey.questions.filter(visible=True)
-        .annotate(total=Count("answers"))
-        .aggregate(max_total=Max("total"))
-        .get("max_total")
-        or 0
-    )
-    yes_label = gettext("Yes")
-    no_label = gettext("No")
-    no_answers_label = gettext("No answers")
-    timeline_data = json.dumps(question_stats["timeline"]) if question_stats else "[]"
-    return render(
-        request,
-        "survey/answer_form.html",
-        {
-            "survey": survey,
-            "question": question,
-            "form": form,
-            "user_answers": user_answers,
-            "question_stats": question_stats,
-            "max_total": max_total,
-            "timeline_data": timeline_data,
-            "yes_label": yes_label,
-            "no_label": no_label,
-            "no_answers_label": no_answers_label,
-        },
-    )
+    return _render_answer_page(request, survey, question, form)
 
 
 def answer_question(request, pk):
@@ -870,17 +987,11 @@ def answer_question(request, pk):
     show_thanks_message = False
 
     if not request.user.is_authenticated:
-        login_url = f"{reverse('social:begin', args=['mediawiki'])}?next={request.path}"
-        messages.info(
-            request,
-            format_html(
-                _(
-                    'To answer the question you must log in. '
-                    '<a href="{0}">Log in with your Wikimedia account</a>.'
-                ),
-                login_url,
-            ),
-        )
+        login_url = _login_to_answer(request)
+        if request.method == "POST" and wants_json(request):
+            return JsonResponse(
+                {"success": False, "login_url": login_url}, status=403
+            )
         form = None
     else:
         answer = Answer.objects.filter(question=question, user=request.user).first()
@@ -888,45 +999,27 @@ def answer_question(request, pk):
             form = AnswerForm(request.POST, instance=answer)
             if form.is_valid():
                 answer_value = form.cleaned_data["answer"]
-                skip_message = False
-                answered_question = question
-                if answer_value:
-                    Answer.objects.update_or_create(
-                        user=request.user,
-                        question=question,
-                        defaults={"answer": answer_value},
-                    )
-                    SkippedQuestion.objects.filter(
-                        user=request.user, question=question
-                    ).delete()
-                    show_thanks_message = True
-                else:
-                    SkippedQuestion.objects.get_or_create(
-                        user=request.user, question=question
+                if wants_json(request):
+                    return _advance_response(
+                        answer_and_advance(request.user, question, answer_value),
+                        answer_value,
                     )
-                    skip_message = True
-                    show_skip_help = True
+                skipped = save_answer(request.user, question, answer_value)
+                show_thanks_message = bool(answer_value)
+                show_skip_help = not answer_value
 
                 if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-                    yes_count = question.answers.filter(answer="yes").count()
-                    no_count = question.answers.filter(answer="no").count()
-                    total = yes_count + no_count
-                    ratio = round((max(yes_count, no_count) / total) * 100) if total else 0
+                    question.refresh_from_db(fields=Question.TALLY_FIELDS)
                     return JsonResponse(
                         {
                             "success": True,
-                            "yes_count": yes_count,
-                            "total": total,
-                            "agree_ratio": ratio,
+                            "yes_count": question.yes_count,
+                            "total": question.answer_count,
+                            "agree_ratio": question.agree_ratio,
                             "question_id": question.pk,
                         }
                     )
 
-                answer_label = (
-                    gettext("Yes") if answer_value == "yes" else gettext("No")
-                    if answer_value else ""
-                )
-
                 if next_url:
                     from urllib.parse import urlparse, parse_qs
 
@@ -934,189 +1027,55 @@ def answer_question(request, pk):
                     if (
                         parsed.path == reverse("survey:answer_survey")
                         and parse_qs(parsed.query).get("embed")
-                    ):
-                        if answer_value:
-                            messages.success(
-                                request,
-                                gettext(
-                                    'Answered question #{number}: "{question}" with "{answer}"'
-                                ).format(
-                                    number=answered_question.pk,
-                                    question=answered_question.text,
-                                    answer=answer_label,
-                                ),
-                            )
-                        elif skip_message:
-                            messages.info(
-                                request,
-                                gettext(
-                                    'Skipped question #{number}: "{question}"'
-                                ).format(
-                                    number=answered_question.pk,
-                                    question=answered_question.text,
-                                ),
-                            )
-                        return redirect(next_url)
-
-                if answer is not None and next_url:
-                    from urllib.parse import urlparse
-                    if urlparse(next_url).path != request.path:
-                        if answer_value:
-                            messages.success(
-                                request,
-                                gettext(
-                                    'Answered question #{number}: "{question}" with "{answer}"'
-                                ).format(
-                                    number=answered_question.pk,
-                                    question=answered_question.text,
-                                    answer=answer_label,
-                                ),
-                            )
-                        elif skip_message:
-                            messages.info(
-                                request,
-                                gettext(
-                                    'Skipped question #{number}: "{question}"'
-                                ).format(
-                                    number=answered_question.pk,
-                                    question=answered_question.text,
-                                ),
-                            )
+                    ) or (answer is not None and parsed.path != request.path):
+                        _answer_message(request, question, answer_value)
                         return redirect(next_url)
 
-                answered_questions = Answer.objects.filter(
-                    user=request.user, question__survey=survey
-                ).values_list("question_id", flat=True)
-                skipped_questions = SkippedQuestion.objects.filter(
-                    user=request.user, question__survey=survey
-                ).values_list("question_id", flat=True)
-                current_question_pk = question.pk
-                question = (
-                    survey.questions.filter(visible=True)
-                    .exclude(id__in=answered_questions)
-                    .exclude(id__in=skipped_questions)
-                    .exclude(id=current_question_pk)
-                    .order_by('?')
-                    .first()
-                )
-
-                if not question:
-                    has_skipped = SkippedQuestion.objects.filter(
-                        user=request.user, question__survey=survey
-                    ).exists()
-                    SkippedQuestion.objects.filter(
-                        user=request.user, question__survey=survey
-                    ).delete()
-                    return render(
-                        request,
-                        "survey/completion.html",
-                        {"survey": survey, "has_skipped": has_skipped},
-                    )
-                if answer_value:
-                    messages.success(
-                        request,
-                        gettext(
-                            'Answered question #{number}: "{question}" with "{answer}"'
-                        ).format(
-                            number=answered_question.pk,
-                            question=answered_question.text,
-                            answer=answer_label,
-                        ),
-                    )
-                if skip_message:
-                    messages.info(
-                        request,
-                        gettext('Skipped question #{number}: "{question}"').format(
-                            number=answered_question.pk,
-                            question=answered_question.text,
-                        ),
-                    )
+                step = advance(request.user, question, skipped)
+                if step.next_question is None:
+                    return _completion(request, survey, step)
+                _answer_message(request, question, answer_value)
+                question = step.next_question
                 answer = None
                 form = AnswerForm(initial={"question_id": question.pk})
             else:
+                if wants_json(request):
+                    return JsonResponse(
+                        {"success": False, "errors": form.errors}, status=400
+                    )
                 form = AnswerForm(instance=answer, initial={"question_id": question.pk})
         else:
             form = AnswerForm(instance=answer, initial={"question_id": question.pk})
         can_delete_question = (
             request.user == question.creator and not question.answers.exists()
         )
-    user_answers = (
-        get_user_answers(request.user, survey)
-        if request.user.is_authenticated
-        else Answer.objects.none()
-    )
-    if request.user.is_authenticated:
-        user_answers = user_answers.exclude(question=question)
-    question_stats = get_question_stats(question, request.user)
-    max_total = (
-        survey.questions.filter(visible=True)
-        .annotate(total=Count("answers"))
-        .aggregate(max_total=Max("total"))
-        .get("max_total")
-        or 0
-    )
-    yes_label = gettext("Yes")
-    no_label = gettext("No")
-    no_answers_label = gettext("No answers")
-    timeline_data = json.dumps(question_stats["timeline"])
-    return render(
+    return _render_answer_page(
         request,
-        "survey/answer_form.html",
-        {
-            "survey": survey,
-            "question": question,
-            "form": form,
-            "is_edit": answer is not None,
-            "can_delete_question": (
-                can_delete_question if request.user.is_authenticated else False
-            ),
-            "user_answers": user_answers,
-            "question_stats": question_stats,
-            "max_total": max_total,
-            "timeline_data": timeline_data,
-            "yes_label": yes_label,
-            "no_label": no_label,
-            "no_answers_label": no_answers_label,
-            "next": next_url,
-            "show_skip_help": show_skip_help,
-            "show_thanks_message": show_thanks_message,
-        },
+        survey,
+        question,
+        form,
+        is_edit=answer is not None,
+        can_delete_question=can_delete_question,
+        next=next_url,
+        show_skip_help=show_skip_help,
+        show_thanks_message=show_thanks_message,
     )
 
 
 @login_required
 def userinfo(request):
-    answers_qs = (
-        Answer.objects.filter(
-            user=request.user,
-            question__visible=True,
-            question__survey__deleted=False,
-        )
-        .select_related("question")
-        .annotate(
-            yes_count=Count(
-                "question__answers",
-                filter=Q(question__answers__answer="yes"),
-                distinct=True,
-            ),
-            total_answers=Count("question__answers", distinct=True),
-        )
-    )
-
-    answers = list(answers_qs)
-    for ans in answers:
-        ans.agree_ratio = calculate_agree_ratio(ans.yes_count, ans.total_answers)
+    answers = TABLES["my_answers"].page(None, request.user)
 
     total_answers = Answer.objects.filter(user=request.user).count()
 
-    skipped_questions = (
-        SkippedQuestion.objects.filter(
-            user=request.user,
-            question__visible=True,
-            question__survey__deleted=False,
-        )
-        .select_related("question", "question__survey")
-    )
+    skipped_ids = set()
+    for data in SkipSet.objects.filter(user=request.user).values_list(
+        "data", flat=True
+    ):
+        skipped_ids |= unpack_ids(data)
+    skipped_questions = Question.objects.filter(
+        pk__in=skipped_ids, visible=True, survey__deleted=False
+    ).select_related("survey")
 
     questions_qs = (
         Question.objects.filter(
@@ -1136,6 +1095,13 @@ def userinfo(request):
 
     total_questions = Question.objects.filter(creator=request.user).count()
 
+    survey = get_main_survey(request)
+    participation = (
+        Participation.objects.filter(survey=survey, user=request.user).first()
+        if survey
+        else None
+    )
+
     hard_deletable_questions = []
     editable_questions = []
     for q in questions_qs:
@@ -1161,21 +1127,21 @@ def userinfo(request):
         request,
         "survey/userinfo.html",
         {
-            "answers": answers,
+            "answers": answers.rows,
+            "answers_next": answers.next,
             "skipped_questions": skipped_questions,
             "questions": questions_qs,
             "hard_deletable_questions": hard_deletable_questions,
             "editable_questions": editable_questions,
             "total_answers": total_answers,
             "total_questions": total_questions,
+            "participation": participation,
         },
     )
 
 
-@login_required
-def userinfo_download(request):
-    """Return all data stored about the current user as JSON."""
-    user = request.user
+def get_user_data(user):
+    """Return all data stored about the user as a JSON serializable dict."""
     answers = (
         Answer.objects.filter(user=user)
         .select_related("question")
@@ -1189,11 +1155,9 @@ def userinfo_download(request):
     created_surveys = Survey.objects.filter(creator=user)
     secretary_surveys = Survey.objects.filter(secretaries=user)
 
-    skipped_question_ids = (
-        SkippedQuestion.objects.filter(user=user)
-        .values_list("question_id", flat=True)
-        .order_by("question_id")
-    )
+    skipped_question_ids = set()
+    for data in SkipSet.objects.filter(user=user).values_list("data", flat=True):
+        skipped_question_ids |= unpack_ids(data)
 
     surveys_dict = {}
     for s in created_surveys:
@@ -1247,8 +1211,31 @@ def userinfo_download(request):
             }
             for a in answers
         ],
-        "skipped_questions": list(skipped_question_ids),
+        "answer_events": [
+            {
+                "question_id": question_id,
+                "kind": kind,
+                "answer": answer,
+                "created_at": created_at.isoformat(),
+            }
+            for question_id, kind, answer, created_at in AnswerEvent.objects.filter(
+                user=user
+            )
+            .order_by("created_at", "pk")
+            .values_list("question_id", "kind", "answer", "created_at")
+        ],
+        "skipped_questions": sorted(skipped_question_ids),
     }
+    return data
+
+
+@login_required
+def userinfo_download(request):
+    """Return all data stored about the current user as JSON."""
+    user = request.user
+    if request.GET.get("async") == "1":
+        return enqueue_job_response(request, "userinfo_download", user=user)
+    data = get_user_data(user)
     response = JsonResponse(
         data,
         json_dumps_params={"indent": 2, "ensure_ascii": False},
@@ -1259,93 +1246,142 @@ def userinfo_download(request):
     return response
 
 
-@login_required
-def user_data_delete(request):
-    """Remove user's answers and questions that have no other answers."""
-    if request.method != "POST":
-        return redirect("survey:userinfo")
-
-    user = request.user
-
-    # Delete all answers by the user
-    answers_qs = Answer.objects.filter(user=user)
-    removed_answers = answers_qs.count()
-    answers_qs.delete()
-    total_answers = removed_answers
-
-    # Delete information about skipped questions
-    SkippedQuestion.objects.filter(user=user).delete()
-
-    removed_questions = 0
-    kept_questions = 0
-
-    # Delete visible questions created by the user that no longer have answers
-    for q in Question.objects.filter(creator=user, visible=True):
-        if not q.answers.exclude(user=user).exists():
-            q.delete()
-            removed_questions += 1
+def delete_user_data(user, dry_run=False):
+    """Remove user's answers and unanswered questions with set-based queries.
+
+    Everything runs in one transaction. With ``dry_run`` the same counts are
+    computed but nothing is deleted. Returns a dict of summary counts.
+    """
+    other_answers = Answer.objects.filter(question=OuterRef("pk")).exclude(user=user)
+    with transaction.atomic():
+        answers_qs = Answer.objects.filter(user=user)
+        questions_qs = Question.objects.filter(creator=user, visible=True)
+        # Questions without answers from other users can be removed
+        removable_questions = questions_qs.filter(~Exists(other_answers))
+        surveys_qs = Survey.objects.filter(creator=user)
+        # A survey is kept if it has questions that are not removed
+        remaining_questions = Question.objects.filter(
+            survey=OuterRef("pk")
+        ).exclude(pk__in=removable_questions.values("pk"))
+        removable_surveys = surveys_qs.filter(~Exists(remaining_questions))
+
+        total_questions = questions_qs.count()
+        total_surveys = surveys_qs.count()
+        if dry_run:
+            removed_answers = answers_qs.count()
+            removed_questions = removable_questions.count()
+            removed_surveys = removable_surveys.count()
+            has_questions = (
+                Question.objects.filter(creator=user)
+                .exclude(pk__in=removable_questions.values("pk"))
+                .exists()
+            )
         else:
-            kept_questions += 1
-    total_questions = removed_questions + kept_questions
-
-    removed_surveys = 0
-    kept_surveys = 0
+            answered_ids = list(answers_qs.values_list("question_id", flat=True))
+            removed_answers = answers_qs.delete()[1].get(Answer._meta.label, 0)
+            SkipSet.objects.filter(user=user).delete()
+            AnswerEvent.objects.filter(user=user).delete()
+            # Finished jobs may hold the user's data; a running deletion
+            # job still stores its summary for the user
+            Job.objects.filter(user=user).exclude(
+                name="user_data_delete", status__in=(Job.QUEUED, Job.RUNNING)
+            ).delete()
+            Participation.objects.filter(user=user).delete()
+            # Removed questions are dropped from other users' skips
+            discard_skips(list(removable_questions.values_list("pk", flat=True)))
+            removed_questions = removable_questions.delete()[1].get(
+                Question._meta.label, 0
+            )
+            removed_surveys = removable_surveys.delete()[1].get(
+                Survey._meta.label, 0
+            )
+            has_questions = Question.objects.filter(creator=user).exists()
+            refresh_question_tallies(answered_ids)
+            bump_catalog_version()
 
-    # Delete surveys created by the user that do not have questions
-    for s in Survey.objects.filter(creator=user):
-        if s.questions.exists():
-            kept_surveys += 1
-        else:
-            s.delete()
-            removed_surveys += 1
-    total_surveys = removed_surveys + kept_surveys
+    return {
+        "removed_answers": removed_answers,
+        "total_answers": removed_answers,
+        "removed_questions": removed_questions,
+        "kept_questions": total_questions - removed_questions,
+        "total_questions": total_questions,
+        "removed_surveys": removed_surveys,
+        "kept_surveys": total_surveys - removed_surveys,
+        "total_surveys": total_surveys,
+        "has_questions": has_questions,
+    }
 
-    # If nothing references the user anymore, remove the account
-    has_questions = Question.objects.filter(creator=user).exists()
 
+def user_data_delete_lines(summary):
+    """Return message lines describing the result of ``delete_user_data``."""
     lines = [
         ngettext(
             "Removed %(removed)d/%(total)d answer.",
             "Removed %(removed)d/%(total)d answers.",
-            total_answers,
+            summary["total_answers"],
         )
-        % {"removed": removed_answers, "total": total_answers},
+        % {"removed": summary["removed_answers"], "total": summary["total_answers"]},
         ngettext(
             "Removed %(removed)d/%(total)d question.",
             "Removed %(removed)d/%(total)d questions.",
-            total_questions,
+            summary["total_questions"],
         )
-        % {"removed": removed_questions, "total": total_questions},
+        % {
+            "removed": summary["removed_questions"],
+            "total": summary["total_questions"],
+        },
         ngettext(
             "Removed %(removed)d/%(total)d survey.",
             "Removed %(removed)d/%(total)d surveys.",
-            total_surveys,
+            summary["total_surveys"],
         )
-        % {"removed": removed_surveys, "total": total_surveys},
+        % {"removed": summary["removed_surveys"], "total": summary["total_surveys"]},
         _("Removed data from skipped questions."),
     ]
 
-    if kept_questions:
+    if summary["kept_questions"]:
         lines.append(
             ngettext(
                 "Could not remove %(count)d question because it already had answers.",
                 "Could not remove %(count)d questions because they already had answers.",
-                kept_questions,
+                summary["kept_questions"],
             )
-            % {"count": kept_questions}
+            % {"count": summary["kept_questions"]}
         )
 
-    if kept_surveys:
+    if summary["kept_surveys"]:
         lines.append(
             ngettext(
                 "Could not remove %(count)d survey because it already had questions.",
                 "Could not remove %(count)d surveys because they already had questions.",
-                kept_surveys,
+                summary["kept_surveys"],
             )
-            % {"count": kept_surveys}
+            % {"count": summary["kept_surveys"]}
         )
+    return lines
+
+
+@login_required
+def user_data_delete(request):
+    """Remove user's answers and questions that have no other answers.
+
+    ``GET ?preview=1`` returns the planned summary as JSON without deleting.
+    """
+    if request.method != "POST":
+        if request.GET.get("preview") == "1":
+            summary = delete_user_data(request.user, dry_run=True)
+            return JsonResponse(
+                {**summary, "messages": user_data_delete_lines(summary)}
+            )
+        return redirect("survey:userinfo")
+
+    user = request.user
+    if request.POST.get("async") == "1":
+        return enqueue_job_response(request, "user_data_delete", user=user)
+    summary = delete_user_data(user)
+    lines = user_data_delete_lines(summary)
 
-    if not has_questions:
+    if not summary["has_questions"]:
         logout(request)
         user.delete()
         lines.append(_("Account removed."))
@@ -1388,7 +1424,7 @@ def answer_edit(request, pk):
     if request.method == "POST":
         form = AnswerForm(request.POST, instance=answer)
         if form.is_valid():
-            form.save()
+            record_answer(request.user, answer.question, form.cleaned_data["answer"])
             if request.headers.get("X-Requested-With") == "XMLHttpRequest":
                 question = answer.question
                 yes_count = question.answers.filter(answer="yes").count()
@@ -1429,7 +1465,8 @@ def answer_delete(request, pk):
         )
         return redirect("survey:survey_detail")
     question = answer.question
-    answer.delete()
+    remove_answer(answer)
+    get_sampler().tally_changed(question)
     if request.headers.get("X-Requested-With") == "XMLHttpRequest":
         yes_count = question.answers.filter(answer="yes").count()
         no_count = question.answers.filter(answer="no").count()
@@ -1480,16 +1517,32 @@ def answer_delete(request, pk):
     return redirect(next_url)
 
 
+# Orderings for result rows, each sorts by the given field, largest first
+RESULT_SORTS = ("agree_low", "yes_low")
+
+
+def get_result_rows(survey, questions, sort=None):
+    """Return result rows with tallies and Wilson intervals for ``questions``.
+
+    Rows are ordered by question id, or by ``sort`` from ``RESULT_SORTS``.
+    """
+    results = get_question_results(survey)
+    data = [
+        {"question": q, "published": q.created_at, **results.get(q.pk, EMPTY_RESULT)}
+        for q in questions.order_by("pk")
+    ]
+    if sort:
+        data.sort(key=lambda row: -row[sort])
+    return data
+
+
 def survey_answers(request):
-    survey = Survey.get_main_survey()
+    survey = get_main_survey(request)
     if survey is None:
         return redirect("survey:survey_create")
     questions = survey.questions.filter(visible=True)
-    data = []
-    total_users = (
-        Answer.objects.filter(question__survey=survey).values("user").distinct().count()
-    )
     question_count = questions.count()
+    total_users, _ = get_participant_counts(survey, question_count)
     question_author_count = questions.values("creator").distinct().count()
     first_question_date = (
         questions.order_by("created_at").values_list("created_at", flat=True).first()
@@ -1498,29 +1551,12 @@ def survey_answers(request):
         questions.order_by("-created_at").values_list("created_at", flat=True).first()
     )
 
-    user_answers = {}
-    if request.user.is_authenticated:
-        user_answers = {
-            a.question_id: a.get_answer_display()
-            for a in Answer.objects.filter(user=request.user, question__survey=survey)
-        }
-
-    for q in questions:
-        yes_count = q.answers.filter(answer="yes").count()
-        no_count = q.answers.filter(answer="no").count()
-        total = yes_count + no_count
-        agree_ratio = round((max(yes_count, no_count) / total) * 100) if total else 0
-        row = {
-            "question": q,
-            "published": q.created_at,
-            "yes": yes_count,
-            "no": no_count,
-            "total": total,
-            "agree_ratio": agree_ratio,
-        }
-        if request.user.is_authenticated:
-            row["my_answer"] = user_answers.get(q.pk)
-        data.append(row)
+    sort = request.GET.get("sort")
+    if sort not in RESULT_SORTS:
+        sort = None
+    results = TABLES["results"].page(
+        survey, request.user, sort=sort, direction="desc" if sort else None
+    )
     yes_label = gettext("Yes")
     no_label = gettext("No")
     no_answers_label = gettext("No answers")
@@ -1529,7 +1565,6 @@ def survey_answers(request):
         "survey/answers.html",
         {
             "survey": survey,
-            "data": data,
             "total_users": total_users,
             "question_count": question_count,
             "question_author_count": question_author_count,
@@ -1537,57 +1572,172 @@ def survey_answers(request):
             "last_question_date": last_question_date,
             "yes_label": yes_label,
             "no_label": no_label,
-        "no_answers_label": no_answers_label,
+            "no_answers_label": no_answers_label,
+            "sort": sort,
+            "results_rows": results.rows,
+            "results_next": results.next,
+            "results_sort": results.sort,
+            "results_direction": results.direction,
         },
     )
 
 
-def survey_answers_wikitext(request):
-    survey = Survey.get_main_survey()
+def _chart_sort(request):
+    sort = request.GET.get("sort")
+    return sort if sort in RESULT_SORTS else None
+
+
+def _chart_etag(request):
+    survey = get_main_survey(request)
+    if survey is None:
+        return None
+    sort = _chart_sort(request) or "id"
+    return f'"chart-{survey.pk}-{survey.data_version}-{sort}"'
+
+
+@condition(etag_func=_chart_etag)
+def survey_chart_data(request):
+    """Return the chart data of the results page as parallel JSON lists."""
+    survey = get_main_survey(request)
+    if survey is None:
+        raise Http404()
+    response = JsonResponse(get_chart_data(survey, _chart_sort(request)))
+    # Browsers revalidate with the ETag, which changes with the data version
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+# Range served when the activity request does not name one, in buckets
+DEFAULT_ACTIVITY_BUCKETS = {DAY: 30, HOUR: 48}
+
+
+def _parse_activity_bound(value):
+    """Parse an ISO date or datetime query value, assuming UTC."""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(value)
+        moment = datetime(day.year, day.month, day.day)
+    if timezone.is_naive(moment):
+        moment = moment.replace(tzinfo=dt_timezone.utc)
+    return moment
+
+
+def survey_activity(request):
+    """Return answer, respondent and question counts per day or hour."""
+    survey = get_main_survey(request)
+    if survey is None:
+        raise Http404()
+    period = request.GET.get("period", DAY)
+    if period not in PERIODS:
+        return JsonResponse({"error": "invalid period"}, status=400)
+    step = PERIODS[period]
+    try:
+        end = request.GET.get("end")
+        if end:
+            end = _parse_activity_bound(end)
+        else:
+            end = bucket_start(timezone.now(), period) + step
+        start = request.GET.get("start")
+        if start:
+            start = _parse_activity_bound(start)
+        else:
+            start = end - step * DEFAULT_ACTIVITY_BUCKETS[period]
+    except ValueError:
+        return JsonResponse({"error": "invalid date"}, status=400)
+    return JsonResponse(
+        {"period": period, "buckets": get_activity(survey, period, start, end)}
+    )
+
+
+def survey_analysis(request):
+    """Show groups of respondents who answer alike."""
+    from .analysis import get_survey_analysis
+
+    survey = get_main_survey(request)
     if survey is None:
         return redirect("survey:survey_create")
-    include_personal = (
-        request.GET.get("include_personal") == "1" and request.user.is_authenticated
+    try:
+        n_groups = int(request.GET.get("groups", 3))
+    except ValueError:
+        n_groups = 3
+    n_groups = min(max(n_groups, 2), 6)
+
+    analysis = get_survey_analysis(survey, n_groups)
+    question_ids = {
+        item["question_id"]
+        for group in analysis["groups"]
+        for key in ("consensus", "divisive")
+        for item in group[key]
+    }
+    questions = Question.objects.in_bulk(question_ids)
+    groups = [
+        {
+            "number": number,
+            "size": group["size"],
+            **{
+                key: [
+                    {**item, "question": questions[item["question_id"]]}
+                    for item in group[key]
+                    if item["question_id"] in questions
+                ]
+                for key in ("consensus", "divisive")
+            },
+        }
+        for number, group in enumerate(analysis["groups"], start=1)
+    ]
+    return render(
+        request,
+        "survey/analysis.html",
+        {
+            "survey": survey,
+            "groups": groups,
+            "n_groups": n_groups,
+            "group_choices": range(2, 7),
+            "user_count": analysis["user_count"],
+            "explained_variance": sum(analysis["explained_variance"]) * 100,
+            "points_data": json.dumps(analysis["points"]),
+        },
     )
 
-    questions = survey.questions.filter(visible=True)
-    data = []
-    total_users = (
-        Answer.objects.filter(question__survey=survey).values("user").distinct().count()
+
+def survey_answers_export(request):
+    """Stream every answer of the survey as a compact columnar file."""
+    from .export import iter_answer_export
+
+    if not request.user.is_superuser:
+        raise Http404()
+    survey = get_main_survey(request)
+    if survey is None:
+        raise Http404()
+    response = StreamingHttpResponse(
+        iter_answer_export(survey), content_type="application/octet-stream"
     )
+    timestamp = timezone.now().strftime("%Y%m%d%H%M%S")
+    response["Content-Disposition"] = (
+        f"attachment; filename=answers_{survey.pk}_{timestamp}.wksa"
+    )
+    return response
+
 
+def build_wikitext_export(survey, user=None, include_personal=False):
+    """Return the survey results as a ``(wiki_text, json_text)`` tuple."""
+    questions = survey.questions.filter(visible=True)
     question_count = questions.count()
-    full_users = (
-        Answer.objects.filter(question__survey=survey)
-        .values("user")
-        .annotate(answered=Count("question", distinct=True))
-        .filter(answered=question_count)
-        .count()
-    )
+    total_users, full_users = get_participant_counts(survey, question_count)
 
     user_answers = {}
     if include_personal:
         user_answers = {
             a.question_id: a.get_answer_display()
-            for a in Answer.objects.filter(user=request.user, question__survey=survey)
+            for a in Answer.objects.filter(user=user, question__survey=survey)
         }
 
-    for q in questions:
-        yes_count = q.answers.filter(answer="yes").count()
-        no_count = q.answers.filter(answer="no").count()
-        total = yes_count + no_count
-        agree_ratio = round((max(yes_count, no_count) / total) * 100) if total else 0
-        row = {
-            "question": q,
-            "published": q.created_at,
-            "yes": yes_count,
-            "no": no_count,
-            "total": total,
-            "agree_ratio": agree_ratio,
-        }
-        if include_personal:
-            row["my_answer"] = user_answers.get(q.pk)
-        data.append(row)
+    data = get_result_rows(survey, questions)
+    if include_personal:
+        for row in data:
+            row["my_answer"] = user_answers.get(row["question"].pk)
 
     yes_label = gettext("Yes")
     no_label = gettext("No")
@@ -1629,6 +1779,30 @@ def survey_answers_wikitext(request):
         ],
     }
     json_text = json.dumps(json_data, indent=2, ensure_ascii=False)
+    return wiki_text, json_text
+
+
+def survey_answers_wikitext(request):
+    survey = get_main_survey(request)
+    if survey is None:
+        return redirect("survey:survey_create")
+    include_personal = (
+        request.GET.get("include_personal") == "1" and request.user.is_authenticated
+    )
+
+    if request.GET.get("async") == "1":
+        return enqueue_job_response(
+            request,
+            "survey_answers_wikitext",
+            user=request.user if request.user.is_authenticated else None,
+            survey_id=survey.pk,
+            include_personal=include_personal,
+            language=request.LANGUAGE_CODE,
+        )
+
+    wiki_text, json_text = build_wikitext_export(
+        survey, request.user, include_personal
+    )
 
     return render(
         request,
@@ -1640,3 +1814,47 @@ def survey_answers_wikitext(request):
             "include_personal": include_personal,
         },
     )
+
+
+def enqueue_job_response(request, name, user=None, **params):
+    """Queue a background job and return a 202 response with its poll URL."""
+    job = enqueue_job(name, user=user, **params)
+    status_url = (
+        reverse("survey:job_status", args=[job.pk])
+        + "?"
+        + urlencode({"token": job.token})
+    )
+    response = JsonResponse(
+        {"job_id": job.pk, "status": job.status, "status_url": status_url},
+        status=202,
+    )
+    response["Location"] = status_url
+    return response
+
+
+def job_status(request, pk):
+    """Return the state and, once finished, the result of a background job."""
+    job = get_object_or_404(Job, pk=pk)
+    owned = job.user_id is not None or job.name in USER_JOBS
+    allowed = (
+        (job.user_id is not None and job.user_id == request.user.pk)
+        or request.user.is_superuser
+        or secrets.compare_digest(request.GET.get("token", ""), job.token)
+    )
+    if owned and not allowed:
+        raise Http404()
+    data = {
+        "job_id": job.pk,
+        "name": job.name,
+        "status": job.status,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at,
+    }
+    if job.status == Job.DONE:
+        data["result"] = job.result
+    elif job.status == Job.FAILED:
+        data["error"] = (
+            job.error if request.user.is_superuser else gettext("The job failed.")
+        )
+    return JsonResponse(data)
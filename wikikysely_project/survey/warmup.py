@@ -0,0 +1,110 @@
+"""Warm-up of a freshly started web worker.
+
+The first requests after a restart pay for imports, building the URL
+resolver, loading translation catalogs, filling the in-process question
+indexes and result caches, compiling templates and reading cold database
+pages. ``warm_up`` does that work up front and returns how long each step
+took. It runs from ``wsgi.py`` when ``SURVEY_WARM_UP`` is set, and from the
+``warm_up`` management command.
+"""
+from importlib import import_module
+import logging
+import time
+
+from django.conf import settings
+from django.urls import get_resolver, reverse
+from django.utils import translation
+
+logger = logging.getLogger(__name__)
+
+# Modules that are otherwise imported lazily by the first request using them
+WARM_MODULES = (
+    "markdown",
+    "numpy",
+    "social_django.views",
+    "social_core.backends.mediawiki",
+    "django.contrib.admin.views.main",
+    "wikikysely_project.survey.views",
+    "wikikysely_project.survey.analysis",
+    "wikikysely_project.survey.export",
+)
+
+# Pages rendered once per language
+WARM_PAGES = (
+    "survey:survey_detail",
+    "survey:survey_answers",
+    "survey:question_add",
+)
+
+
+def import_modules():
+    for name in WARM_MODULES:
+        try:
+            import_module(name)
+        except ImportError:
+            logger.warning("Warm-up could not import %s", name)
+
+
+def build_urls():
+    get_resolver().url_patterns
+    for name in WARM_PAGES:
+        reverse(name)
+
+
+def load_translations():
+    for code, _name in settings.LANGUAGES:
+        with translation.override(code):
+            translation.gettext("Yes")
+
+
+def warm_catalog():
+    from .models import Survey
+    from .permissions import secretary_ids
+    from .sampling import get_sampler
+    from .similarity import question_index
+    from .stats import get_chart_data, get_question_results
+
+    survey = Survey.get_main_survey()
+    if survey is None:
+        return
+    secretary_ids(survey)
+    question_index.warm(survey)
+    get_sampler().pick(survey)
+    get_question_results(survey)
+    get_chart_data(survey)
+
+
+def render_pages():
+    from django.test import Client
+
+    client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+    for code, _name in settings.LANGUAGES:
+        with translation.override(code):
+            paths = [reverse(name) for name in WARM_PAGES]
+        for path in paths:
+            client.get(path)
+
+
+STEPS = (
+    ("imports", import_modules),
+    ("urls", build_urls),
+    ("translations", load_translations),
+    ("catalog", warm_catalog),
+    ("pages", render_pages),
+)
+
+
+def warm_up():
+    """Run the warm-up steps and return ``[(step, seconds)]``.
+
+    A failing step is logged and skipped so a worker always starts.
+    """
+    timings = []
+    for name, step in STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception("Warm-up step %s failed", name)
+        timings.append((name, time.perf_counter() - start))
+    return timings
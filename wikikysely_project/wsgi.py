@@ -4,3 +4,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'wikikysely_project.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.SURVEY_WARM_UP:
+    from wikikysely_project.survey.warmup import warm_up
+
+    warm_up()